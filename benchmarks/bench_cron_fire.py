@@ -0,0 +1,141 @@
+"""
+scheduler fire overhead, time to materialize fires of cron tasks whose argument, worker
+and queue strategies are all UDFs, manager rpc and repository are in memory
+
+    python benchmarks/bench_cron_fire.py --fires 2000 --batch 100
+    python benchmarks/bench_cron_fire.py --udf-cache-size 0  # load UDFs on every fire
+"""
+import argparse
+import asyncio
+import time
+from typing import cast, Dict, Any, List
+
+import dill
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.core.scheduler import WorkerScheduler
+from funtask.providers.lock.multiprocessing_lock import MultiprocessingLock
+from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueueFactory
+
+
+def _func(uuid: str, func: Any = None, payload: int = 0) -> entities.Func:
+    # payload grows pickled bytes like a real UDF with captured state
+    return entities.Func(
+        uuid=cast(entities.FuncUUID, uuid),
+        func=dill.dumps(func) + b'\0' * payload,
+        dependencies=[],
+        parameter_schema=None,
+        description=''
+    )
+
+
+_NO_UDF = _func('no_udf')
+
+
+async def _argument_udf(info_dict: Dict[str, Any]) -> entities.ArgumentStrategy:
+    return entities.ArgumentStrategy(
+        strategy=entities.ArgumentGenerateStrategy.STATIC,
+        static_value=None,
+        argument_queue=None,
+        udf=_NO_UDF,
+        udf_extra=None
+    )
+
+
+async def _worker_udf(info_dict: Dict[str, Any]) -> entities.WorkerStrategy:
+    return entities.WorkerStrategy(
+        strategy=entities.WorkerChooseStrategy.STATIC,
+        static_worker=cast(entities.WorkerUUID, f"worker{hash(info_dict['uuid']) % 8}"),
+        workers=None,
+        worker_tags=None,
+        udf=_NO_UDF,
+        udf_extra=None
+    )
+
+
+async def _queue_udf(info_dict: Dict[str, Any]) -> entities.QueueStrategy:
+    return entities.QueueStrategy(
+        full_strategy=entities.QueueFullStrategy.SEIZE,
+        udf=_NO_UDF,
+        udf_extra=None
+    )
+
+
+def make_cron_task(idx: int, payload: int) -> entities.CronTask:
+    return entities.CronTask(
+        uuid=cast(entities.CronTaskUUID, f'cron{idx}'),
+        timepoints=[],
+        func=_func('func', payload=payload),
+        argument_generate_strategy=entities.ArgumentStrategy(
+            strategy=entities.ArgumentGenerateStrategy.UDF,
+            static_value=None,
+            argument_queue=None,
+            udf=_func('argument_udf', _argument_udf),
+            udf_extra=None
+        ),
+        worker_choose_strategy=entities.WorkerStrategy(
+            strategy=entities.WorkerChooseStrategy.UDF,
+            static_worker=None,
+            workers=None,
+            worker_tags=None,
+            udf=_func('worker_udf', _worker_udf),
+            udf_extra=None
+        ),
+        task_queue_strategy=entities.QueueStrategy(
+            full_strategy=entities.QueueFullStrategy.UDF,
+            udf=_func('queue_udf', _queue_udf),
+            udf_extra=None
+        ),
+        result_as_state=False,
+        timeout=1.,
+        description='',
+        disabled=False
+    )
+
+
+class _Repository:
+    async def add_tasks(self, tasks: List[entities.Task], session=None):
+        ...
+
+    async def update_tasks(self, values: Dict[entities.TaskUUID, Dict[str, Any]], session=None):
+        ...
+
+
+class _ManagerRPC:
+    async def dispatch_fun_tasks(self, dispatches: List[interface.FunTaskDispatch]) -> List[entities.TaskUUID]:
+        return [cast(entities.TaskUUID, 'manager') for _ in dispatches]
+
+    async def get_task_queue_size(self, worker: entities.WorkerUUID) -> int:
+        return 0
+
+
+async def main(fires: int, batch: int, payload: int, udf_cache_size: int):
+    kwargs = {} if udf_cache_size < 0 else {'udf_cache_size': udf_cache_size}
+    scheduler = WorkerScheduler(
+        funtask_manager_rpc=cast(interface.FunTaskManagerRPC, _ManagerRPC()),
+        repository=cast(interface.Repository, _Repository()),
+        cron=cast(interface.Cron, None),
+        argument_queue_factory=MultiprocessingQueueFactory().factory,
+        lock=MultiprocessingLock(),
+        **kwargs
+    )
+    cron_tasks = [make_cron_task(i, payload) for i in range(batch)]
+    # warm up
+    await scheduler._create_cron_sub_tasks(cron_tasks)
+    start = time.perf_counter()
+    for _ in range(fires // batch):
+        await scheduler._create_cron_sub_tasks(cron_tasks)
+    cost = time.perf_counter() - start
+    n = fires // batch * batch
+    print(f"fires: {n}, batch: {batch}, payload: {payload}B, udf cache size: {udf_cache_size}")
+    print(f"total: {cost:.3f}s, per fire: {cost / n * 1e6:.1f}us")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fires', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=100)
+    parser.add_argument('--payload', type=int, default=4096, help='extra bytes of pickled task function')
+    parser.add_argument('--udf-cache-size', type=int, default=-1, help='-1 means scheduler default')
+    args = parser.parse_args()
+    asyncio.run(main(args.fires, args.batch, args.payload, args.udf_cache_size))
@@ -0,0 +1,97 @@
+"""
+latency of dispatch rpc from scheduler side client to a local manager service, with a channel
+per node reused from pool and with a new channel (tcp connect and http2 handshake) per rpc
+
+    python benchmarks/bench_dispatch_rpc.py --rpcs 2000
+    python benchmarks/bench_dispatch_rpc.py --concurrency 16
+    python benchmarks/bench_dispatch_rpc.py --batch 500  # tasks per batch dispatch rpc
+"""
+import argparse
+import asyncio
+import time
+from typing import List, cast, Any
+
+import dill
+from grpclib.server import Server
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.task_worker_manager.manager_rpc_client import ManagerRPCClient, HashRPChooser
+from funtask.task_worker_manager.manager_service import ManagerService
+
+
+class _NoopManager:
+    async def dispatch_fun_task(self, worker_uuid: entities.WorkerUUID, func_task: Any, *args, **kwargs):
+        return cast(entities.TaskUUID, 'task')
+
+    async def dispatch_fun_tasks(self, dispatches: List[interface.TaskDispatch]):
+        return [cast(entities.TaskUUID, 'task')] * len(dispatches)
+
+
+def _func_task(*args, **kwargs):
+    return None
+
+
+def _quantile(values: List[float], q: float) -> float:
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+async def _run(client: ManagerRPCClient, rpcs: int, concurrency: int) -> List[float]:
+    func_task = dill.dumps(_func_task)
+    latencies = []
+
+    async def dispatch_loop(n: int):
+        for i in range(n):
+            start = time.perf_counter()
+            await client.dispatch_fun_task(cast(entities.WorkerUUID, f'worker{i}'), func_task, [], True, -1, None)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(dispatch_loop(rpcs // concurrency) for _ in range(concurrency)))
+    return latencies
+
+
+async def _run_batch(client: ManagerRPCClient, rpcs: int, batch: int) -> float:
+    func_task = dill.dumps(_func_task)
+    dispatches = [
+        interface.FunTaskDispatch(cast(entities.WorkerUUID, f'worker{i}'), func_task, [], True, -1, None)
+        for i in range(rpcs)
+    ]
+    start = time.perf_counter()
+    for i in range(0, rpcs, batch):
+        await client.dispatch_fun_tasks(dispatches[i:i + batch])
+    return time.perf_counter() - start
+
+
+async def main(rpcs: int, concurrency: int, batch: int):
+    server = Server([ManagerService(_NoopManager())])
+    await server.start('127.0.0.1', 0)
+    port = server._server.sockets[0].getsockname()[1]
+    node = entities.TaskWorkerManagerNode(uuid=cast(entities.TaskWorkerManagerNodeUUID, 'node'), host='127.0.0.1',
+                                          port=port)
+    print(f"rpcs: {rpcs}, concurrency: {concurrency}, latency in ms")
+    print(f"{'channel':<10}{'mean':>8}{'p50':>8}{'p99':>8}{'rpc/s':>10}")
+    for name, pooled in (('pooled', True), ('per rpc', False)):
+        chooser = HashRPChooser([node], pooled=pooled)
+        client = ManagerRPCClient(chooser)
+        # warm up, also opens pooled connection
+        await _run(client, concurrency, concurrency)
+        start = time.perf_counter()
+        latencies = sorted(await _run(client, rpcs, concurrency))
+        cost = time.perf_counter() - start
+        mean = sum(latencies) / len(latencies)
+        print(f"{name:<10}{mean * 1e3:>8.3f}{_quantile(latencies, .5) * 1e3:>8.3f}"
+              f"{_quantile(latencies, .99) * 1e3:>8.3f}{len(latencies) / cost:>10.0f}")
+        chooser.close()
+    chooser = HashRPChooser([node])
+    cost = await _run_batch(ManagerRPCClient(chooser), rpcs, batch)
+    print(f"batch of {batch}: {rpcs / cost:.0f} tasks/s")
+    chooser.close()
+    server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rpcs', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--batch', type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.rpcs, args.concurrency, args.batch))
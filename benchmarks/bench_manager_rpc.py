@@ -0,0 +1,89 @@
+"""
+dispatch rpcs per second served by a local manager service while idle status streams are open,
+with queue gets waiting in io threads and with gets polling multiprocessing queues on the rpc loop
+
+    python benchmarks/bench_manager_rpc.py --rpcs 2000
+    python benchmarks/bench_manager_rpc.py --streams 32  # idle status streams
+"""
+import argparse
+import asyncio
+import time
+from typing import cast
+
+import dill
+from grpclib.server import Server
+
+from funtask.core import entities
+from funtask.core.task_worker_manager import FunTaskManager
+from funtask.providers.loggers.std import StdLogger
+from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueue
+from funtask.providers.worker_manager.multiprocessing_manager import MultiprocessingManager
+from funtask.task_worker_manager.manager_rpc_client import ManagerRPCClient, HashRPChooser
+from funtask.task_worker_manager.manager_service import ManagerService
+
+_WORKERS = 16
+
+
+def _func_task(*args, **kwargs):
+    return None
+
+
+async def _bench(rpcs: int, concurrency: int, streams: int, io_thread: bool) -> float:
+    task_queues = {}
+
+    def queue_factory(name: str) -> MultiprocessingQueue:
+        if name not in task_queues:
+            task_queues[name] = MultiprocessingQueue(io_thread)
+        return task_queues[name]
+
+    status_queue = MultiprocessingQueue(io_thread)
+    # no worker is spawned, tasks stay in their queues
+    manager = FunTaskManager(
+        worker_manager=MultiprocessingManager(StdLogger(), queue_factory, queue_factory, status_queue),
+        task_status_queue=status_queue
+    )
+    server = Server([ManagerService(manager)])
+    await server.start('127.0.0.1', 0)
+    port = server._server.sockets[0].getsockname()[1]
+    node = entities.TaskWorkerManagerNode(uuid=cast(entities.TaskWorkerManagerNodeUUID, 'node'), host='127.0.0.1',
+                                          port=port)
+    choosers = [HashRPChooser([node]) for _ in range(streams + 1)]
+    watchers = [asyncio.create_task(ManagerRPCClient(chooser).watch_status().__anext__()) for chooser in choosers[1:]]
+    client = ManagerRPCClient(choosers[0])
+    func_task = dill.dumps(_func_task)
+
+    async def dispatch_loop(n: int):
+        for i in range(n):
+            await client.dispatch_fun_task(cast(entities.WorkerUUID, f'worker{i % _WORKERS}'), func_task, [], True,
+                                           -1, None)
+
+    await dispatch_loop(concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(dispatch_loop(rpcs // concurrency) for _ in range(concurrency)))
+    cost = time.perf_counter() - start
+    for watcher in watchers:
+        watcher.cancel()
+    await asyncio.gather(*watchers, return_exceptions=True)
+    for chooser in choosers:
+        chooser.close()
+    server.close()
+    for q in task_queues.values():
+        # nothing reads task queues, do not wait at exit for feeding them
+        q.q.cancel_join_thread()
+    return rpcs // concurrency * concurrency / cost
+
+
+async def main(rpcs: int, concurrency: int, streams: int):
+    print(f"rpcs: {rpcs}, concurrency: {concurrency}, idle status streams: {streams}")
+    print(f"{'queue get':<12}{'rpc/s':>10}")
+    for name, io_thread in (('io thread', True), ('polling', False)):
+        print(f"{name:<12}{await _bench(rpcs, concurrency, streams, io_thread):>10.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rpcs', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--streams', type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.rpcs, args.concurrency, args.streams))
@@ -0,0 +1,65 @@
+"""
+statuses per second over one status stream from a local manager service to the client, frames
+carry batch size statuses each, batch size 1 is the framing of one status per message
+
+    python benchmarks/bench_status_stream.py --statuses 20000
+    python benchmarks/bench_status_stream.py --content 1024  # bytes of content of each status
+"""
+import argparse
+import asyncio
+import time
+from typing import List, cast
+
+from grpclib.server import Server
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.task_worker_manager.manager_rpc_client import ManagerRPCClient, HashRPChooser
+from funtask.task_worker_manager.manager_service import ManagerService
+
+
+class _StatusSource:
+    """
+    manager whose status queue always holds statuses
+    """
+
+    def __init__(self, content: int):
+        self.status = interface.StatusReport(
+            worker_uuid=cast(entities.WorkerUUID, 'worker'),
+            task_uuid=cast(entities.TaskUUID, 'task'),
+            status=entities.TaskStatus.SUCCESS,
+            content=b'\0' * content,
+            create_timestamp=time.time()
+        )
+
+    async def get_queued_statuses(self, max_size: int, max_delay: float) -> List[interface.StatusReport]:
+        return [self.status] * max_size
+
+
+async def main(statuses: int, content: int):
+    server = Server([ManagerService(_StatusSource(content))])
+    await server.start('127.0.0.1', 0)
+    port = server._server.sockets[0].getsockname()[1]
+    node = entities.TaskWorkerManagerNode(uuid=cast(entities.TaskWorkerManagerNodeUUID, 'node'), host='127.0.0.1',
+                                          port=port)
+    print(f"statuses: {statuses}, content: {content}B")
+    print(f"{'batch':<8}{'statuses/s':>12}")
+    for batch in (1, 16, 256):
+        chooser = HashRPChooser([node])
+        stream = ManagerRPCClient(chooser, status_batch_size=batch).watch_status()
+        await stream.__anext__()
+        start = time.perf_counter()
+        for _ in range(statuses):
+            await stream.__anext__()
+        cost = time.perf_counter() - start
+        print(f"{batch:<8}{statuses / cost:>12.0f}")
+        await stream.aclose()
+        chooser.close()
+    server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--statuses', type=int, default=20000)
+    parser.add_argument('--content', type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(main(args.statuses, args.content))
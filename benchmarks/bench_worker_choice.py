@@ -0,0 +1,89 @@
+"""
+simulation of worker choice strategies, tasks arrive as poisson process and every worker runs
+one task at a time in fifo order, reports task latency (queue wait + run time) of each strategy
+
+    python benchmarks/bench_worker_choice.py --workers 50 --utilization .9
+    python benchmarks/bench_worker_choice.py --service lognormal  # heavy tailed task run time
+"""
+import argparse
+import random
+from collections import deque
+from typing import List, Dict, Callable, Deque, cast
+
+from funtask.core.entities import WorkerUUID
+from funtask.core.scheduler import _least_loaded
+
+Chooser = Callable[[List[WorkerUUID], Dict[WorkerUUID, int]], WorkerUUID]
+
+
+def _random(workers: List[WorkerUUID], loads: Dict[WorkerUUID, int]) -> WorkerUUID:
+    return random.choice(workers)
+
+
+def _least_queued(workers: List[WorkerUUID], loads: Dict[WorkerUUID, int]) -> WorkerUUID:
+    return _least_loaded(workers, loads)
+
+
+def _power_of_two(workers: List[WorkerUUID], loads: Dict[WorkerUUID, int]) -> WorkerUUID:
+    return _least_loaded(random.sample(workers, 2), loads)
+
+
+STRATEGIES: Dict[str, Chooser] = {
+    'random': _random,
+    'least_queued': _least_queued,
+    'power_of_two': _power_of_two
+}
+
+
+def simulate(chooser: Chooser, workers: int, tasks: int, utilization: float, service: str, seed: int) -> List[float]:
+    random.seed(seed)
+    workers_uuid = [cast(WorkerUUID, f'worker{i}') for i in range(workers)]
+    # finish times of unfinished tasks of each worker, last one is when worker gets free
+    finish_times: Dict[WorkerUUID, Deque[float]] = {worker: deque() for worker in workers_uuid}
+    arrival_rate = utilization * workers
+    t = 0.
+    latencies = []
+    for _ in range(tasks):
+        t += random.expovariate(arrival_rate)
+        loads = {}
+        for worker, finishes in finish_times.items():
+            while finishes and finishes[0] <= t:
+                finishes.popleft()
+            loads[worker] = len(finishes)
+        if service == 'lognormal':
+            # mean 1, long tail
+            run_time = random.lognormvariate(-.5, 1.)
+        else:
+            run_time = random.expovariate(1.)
+        worker = chooser(workers_uuid, loads)
+        finishes = finish_times[worker]
+        finish = max(t, finishes[-1] if finishes else t) + run_time
+        finishes.append(finish)
+        latencies.append(finish - t)
+    return latencies
+
+
+def _quantile(values: List[float], q: float) -> float:
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=200000)
+    parser.add_argument('--utilization', type=float, default=.9)
+    parser.add_argument('--service', choices=['exponential', 'lognormal'], default='exponential')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(f"workers: {args.workers}, tasks: {args.tasks}, utilization: {args.utilization}, "
+          f"service: {args.service}, latency in mean run times")
+    print(f"{'strategy':<14}{'mean':>8}{'p50':>8}{'p99':>8}{'p99.9':>8}")
+    for name, chooser in STRATEGIES.items():
+        latencies = sorted(simulate(chooser, args.workers, args.tasks, args.utilization, args.service, args.seed))
+        mean = sum(latencies) / len(latencies)
+        print(f"{name:<14}{mean:>8.2f}{_quantile(latencies, .5):>8.2f}{_quantile(latencies, .99):>8.2f}"
+              f"{_quantile(latencies, .999):>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,12 @@
 import sys
 
 import fire as fire
-from funtask.core import scheduler
 from funtask.webserver import webserver_service
 from funtask.dependency_container import DependencyContainer
 from loguru import logger
 
 from funtask.task_worker_manager.manager_service import ManagerServiceRunner
+from funtask.scheduler.scheduler_service import SchedulerService
 
 logger.remove()
 logger.add(
@@ -61,7 +61,7 @@ class Scheduler:
             'funtask.scheduler.scheduler_service',
             'funtask.core.scheduler'
         ])
-        s = scheduler.Scheduler()
+        s = SchedulerService()
         await s.run()
 
 
@@ -1,8 +1,13 @@
 from typing import Tuple, Any, Dict
+
+import betterproto
 import dill
 
 from funtask import WorkerStatus, TaskStatus
-from funtask.generated import Args, StatusReportTaskStatus, StatusReportWorkerStatus
+from funtask.generated import Args, StatusReport, StatusReportTaskStatus, StatusReportWorkerStatus
+
+# rpc worker status values are core values with prefix
+_WORKER_STATUS_PREFIX = 'WORKER_'
 
 
 def load_args(args: Args) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
@@ -30,13 +35,25 @@ def core_status2rpc_status(core_status: WorkerStatus | TaskStatus | None)\
         -> Dict[str, StatusReportTaskStatus | StatusReportWorkerStatus | None]:
     if core_status is None:
         return {
-            'worker_status': None
+            'worker_status': StatusReportWorkerStatus.HEARTBEAT
         }
-    if isinstance(core_status, WorkerStatus):
+    if isinstance(core_status, TaskStatus):
         return {
             'task_status': StatusReportTaskStatus.from_string(core_status.value)
         }  # type: ignore
     else:
         return {
-            'worker_status': StatusReportWorkerStatus.from_string(core_status.value)
+            'worker_status': StatusReportWorkerStatus.from_string(_WORKER_STATUS_PREFIX + core_status.value)
         }  # type: ignore
+
+
+def rpc_status2core_status(status_report: StatusReport) -> TaskStatus | WorkerStatus | None:
+    """
+    status of rpc status report, None means worker heart beat
+    """
+    field, value = betterproto.which_one_of(status_report, 'status')
+    if field == 'task_status':
+        return TaskStatus(StatusReportTaskStatus(value).name)
+    if field == 'worker_status' and value != StatusReportWorkerStatus.HEARTBEAT:
+        return WorkerStatus(StatusReportWorkerStatus(value).name[len(_WORKER_STATUS_PREFIX):])
+    return None
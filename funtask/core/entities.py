@@ -31,7 +31,8 @@ class TaskWorkerManagerNode:
     port: int
 
 
-@dataclass
+# hashable, leader scheduler keys node state by node
+@dataclass(frozen=True)
 class SchedulerNode:
     uuid: SchedulerNodeUUID
     host: str
@@ -58,7 +59,7 @@ class Task:
 class ArgumentQueue:
     uuid: str
     name: str
-    parameter_schema: 'ParameterSchema'
+    parameter_schema: 'Optional[ParameterSchema]'
 
 
 @unique
@@ -77,7 +78,7 @@ class ArgumentStrategy:
     strategy: ArgumentGenerateStrategy
     static_value: 'Optional[FuncArgument]'
     argument_queue: ArgumentQueue | None
-    udf: 'Func'
+    udf: 'Optional[Func]'
     # part of udf arguments
     udf_extra: Dict[str, Any] | None
 
@@ -87,6 +88,9 @@ class WorkerChooseStrategy(AutoName):
     STATIC = auto()
     RANDOM_FROM_LIST = auto()
     RANDOM_FROM_WORKER_TAGS = auto()
+    # candidates are workers list, or workers of worker tags when list is empty
+    LEAST_QUEUED = auto()
+    POWER_OF_TWO = auto()
     UDF = auto()
 
 
@@ -96,7 +100,7 @@ class WorkerStrategy:
     static_worker: Optional[WorkerUUID]
     workers: Optional[List[WorkerUUID]]
     worker_tags: Optional[List[str]]
-    udf: 'Func'
+    udf: 'Optional[Func]'
     udf_extra: Dict[str, Any] | None
 
 
@@ -115,6 +119,10 @@ class CronTask:
     disabled: bool
     name: str | None = None
     tags: List[str] = field(default_factory=list)
+    # spread fires in [0, spread_window) seconds by uuid, None means follow scheduler config
+    spread_window: float | None = None
+    # increased on every edit of the cron task
+    version: int = 0
 
 
 @dataclass
@@ -160,6 +168,16 @@ class TimeUnit(AutoName):
     MILLISECOND = auto()
 
 
+TIME_UNIT_SECONDS: Dict[TimeUnit, float] = {
+    TimeUnit.MILLISECOND: .001,
+    TimeUnit.SECOND: 1,
+    TimeUnit.MINUTE: 60,
+    TimeUnit.HOUR: 60 * 60,
+    TimeUnit.DAY: 24 * 60 * 60,
+    TimeUnit.WEEK: 7 * 24 * 60 * 60,
+}
+
+
 @dataclass
 class TimePoint:
     unit: TimeUnit
@@ -169,6 +187,10 @@ class TimePoint:
     def __str__(self):
         return f"{self.n}/{self.unit}" + (f"/{self.at}" if self.at is not None else "")
 
+    @property
+    def period(self) -> float:
+        return self.n * TIME_UNIT_SECONDS[self.unit]
+
 
 @unique
 class QueueFullStrategy(AutoName):
@@ -182,7 +204,7 @@ class QueueFullStrategy(AutoName):
 class QueueStrategy:
     max_size = math.inf
     full_strategy: QueueFullStrategy
-    udf: Func
+    udf: Optional[Func]
     udf_extra: Dict[str, Any] | None
 
 
@@ -215,3 +237,10 @@ class Worker:
     status: WorkerStatus
     name: str | None = None
     tags: List[str] = field(default_factory=list)
+    # manager node that forked the worker, rpcs of worker must go there
+    manager_node_uuid: TaskWorkerManagerNodeUUID | None = None
+
+
+# resolve string annotations now that all entities are defined
+for _entity in (Task, ArgumentQueue, ArgumentStrategy, WorkerStrategy, CronTask, Func):
+    _entity.__pydantic_model__.update_forward_refs(**globals())
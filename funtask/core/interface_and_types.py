@@ -4,7 +4,7 @@ from dataclasses import field
 import time
 from datetime import datetime
 from enum import unique, auto
-from typing import Callable, List, Generic, TypeVar, Dict, AsyncIterator, Tuple, Any, Awaitable
+from typing import Callable, List, Generic, TypeVar, Dict, AsyncIterator, Tuple, Any, Awaitable, AsyncIterable
 
 from mypy_extensions import VarArg
 from dataclasses import dataclass
@@ -71,6 +71,13 @@ class Queue(Generic[_T]):
     async def put(self, obj: _T):
         ...
 
+    async def put_batch(self, objs: List[_T]):
+        """
+        put objs in order, queues able to put many in one round trip should override it
+        """
+        for obj in objs:
+            await self.put(obj)
+
     @abstractmethod
     async def get(self, timeout: None | float = None) -> _T:
         """
@@ -78,6 +85,19 @@ class Queue(Generic[_T]):
         """
         ...
 
+    async def get_batch(self, max_size: int, timeout: None | float = None) -> List[_T]:
+        """
+        wait for first obj like get, then take objs already queued up to max size without waiting
+        :return: empty list on timeout
+        """
+        first = await self.get(timeout)
+        if first is None:
+            return []
+        objs = [first]
+        while len(objs) < max_size and not await self.empty():
+            objs.append(await self.get())
+        return objs
+
     @abstractmethod
     async def get_front(self) -> _T | None:
         """
@@ -213,6 +233,84 @@ class StatusReport:
 TaskInput = Tuple[FuncTask, List[str]] | None | FuncTask
 
 
+@dataclass
+class TaskDispatch:
+    worker_uuid: entities.WorkerUUID
+    func_task: TaskInput
+    change_status: bool = False
+    timeout: float | None = None
+    arguments: Tuple[Any, ...] = ()
+    kw_arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class FunTaskDispatch:
+    worker_uuid: entities.WorkerUUID
+    func_task: bytes
+    dependencies: List[str]
+    change_status: bool
+    timeout: float
+    argument: entities.FuncArgument | None
+
+
+@dataclass
+class WorkerLoad:
+    # tasks waiting in task queue of worker
+    queued: int
+    # tasks taken by worker and not finished yet
+    running: int
+    # tasks finished per second recently
+    throughput: float = 0.
+
+    @property
+    def total(self) -> int:
+        return self.queued + self.running
+
+
+@dataclass
+class StatusStreamLag:
+    # statuses received from node and not consumed yet
+    buffered: int
+    # seconds the oldest buffered status has waited
+    lag: float
+    # statuses of node consumed so far
+    delivered: int
+    connected: bool
+
+
+@unique
+class CircuitState(AutoName):
+    # rpcs and worker placement go to node
+    CLOSED = auto()
+    # node failed too often, no worker placement until open timeout passed
+    OPEN = auto()
+    # open timeout passed, one placement probes whether node recovered
+    HALF_OPEN = auto()
+
+
+@dataclass
+class NodeHealth:
+    # seconds, exponentially weighted moving average of rpc latency
+    latency: float
+    # exponentially weighted moving average of rpc failures, 0 to 1
+    error_rate: float
+    requests: int
+    failures: int
+    state: CircuitState
+
+
+@dataclass
+class SchedulerNodeLoad:
+    # seconds of scheduler time per second taken by each cron task of node
+    task_loads: Dict[entities.CronTaskUUID, float]
+    # seconds of scheduler time per second node can spend on cron tasks
+    capacity: float
+
+    @property
+    def utilization(self) -> float:
+        return sum(self.task_loads.values()) / self.capacity if self.capacity > 0 else float('inf')
+
+
 class FunTaskManager:
     @abstractmethod
     async def increase_workers(
@@ -241,6 +339,18 @@ class FunTaskManager:
             *arguments,
             **kwargs
     ) -> entities.TaskUUID:
+        """
+        returned task is QUEUED, no QUEUED status is reported for it
+        """
+        ...
+
+    @abstractmethod
+    async def dispatch_fun_tasks(self, dispatches: List[TaskDispatch]) -> List[entities.TaskUUID | None]:
+        """
+        dispatch tasks in batch, tasks of a worker are put into its queue together, returned tasks are QUEUED
+        and no QUEUED status is reported for them
+        :return: task uuid of each dispatch in order, None if worker of dispatch can not take tasks
+        """
         ...
 
     @abstractmethod
@@ -282,6 +392,31 @@ class FunTaskManager:
     ) -> StatusReport | None:
         ...
 
+    @abstractmethod
+    async def get_queued_statuses(self, max_size: int, max_delay: float) -> List[StatusReport]:
+        """
+        block for first status, then drain queued statuses until max size statuses are taken
+        or max delay seconds passed since first one
+        """
+        ...
+
+    @abstractmethod
+    async def get_worker_load(
+            self,
+            worker_uuid: entities.WorkerUUID
+    ) -> WorkerLoad:
+        """
+        live load of worker, running tasks are counted from dispatches and statuses passed through manager
+        """
+        ...
+
+    @abstractmethod
+    async def get_workers_load_snapshot(self) -> Dict[entities.WorkerUUID, WorkerLoad]:
+        """
+        load of all workers known by this manager
+        """
+        ...
+
 
 class FunTaskManagerRPC:
     @abstractmethod
@@ -297,6 +432,16 @@ class FunTaskManagerRPC:
     ) -> entities.WorkerUUID:
         ...
 
+    @abstractmethod
+    async def get_worker_node(
+            self,
+            worker_uuid: entities.WorkerUUID
+    ) -> entities.TaskWorkerManagerNodeUUID | None:
+        """
+        manager node owning worker, None if unknown
+        """
+        ...
+
     @abstractmethod
     async def dispatch_fun_task(
             self,
@@ -309,6 +454,28 @@ class FunTaskManagerRPC:
     ) -> entities.TaskUUID:
         ...
 
+    @abstractmethod
+    async def dispatch_fun_tasks(
+            self,
+            dispatches: List[FunTaskDispatch]
+    ) -> List[entities.TaskUUID | None]:
+        """
+        dispatch tasks in batch with one request per manager node
+        :return: task uuid in manager of each dispatch in order, None if dispatch failed
+        """
+        ...
+
+    @abstractmethod
+    async def stream_dispatch_fun_tasks(
+            self,
+            batches: AsyncIterable[List[FunTaskDispatch]]
+    ) -> List[entities.TaskUUID | None]:
+        """
+        dispatch batches as they come over one stream per manager node, for continuous submission
+        :return: task uuid in manager of each dispatch of all batches in order, None if dispatch failed
+        """
+        ...
+
     @abstractmethod
     async def stop_task(
             self,
@@ -343,10 +510,52 @@ class FunTaskManagerRPC:
         """
         ...
 
+    @abstractmethod
+    async def watch_status(self, buffer_size: int = 1024) -> AsyncIterator[StatusReport]:
+        """
+        statuses of manager nodes from long-lived streams, reconnected on failure, never ends until closed.
+        at most buffer size statuses of each node wait for consumer, nodes are consumed round robin
+        and the stream of a node stops reading while its buffer is full
+        """
+        ...
+
+    @abstractmethod
+    def get_status_lags(self) -> Dict[Any, StatusStreamLag]:
+        """
+        lag of status streams of current watch_status by manager node uuid
+        """
+        ...
+
+    @abstractmethod
+    def get_nodes_health(self) -> Dict[Any, NodeHealth]:
+        """
+        rpc latency, error rate and circuit state by manager node uuid
+        """
+        ...
+
     @abstractmethod
     async def get_task_queue_size(self, worker: entities.WorkerUUID) -> int:
         ...
 
+    @abstractmethod
+    async def get_workers_load(
+            self,
+            workers: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, WorkerLoad]:
+        """
+        live load of workers, queried with one request per manager node
+        :return: worker uuid -> load, workers whose node failed to answer are missing
+        """
+        ...
+
+    @abstractmethod
+    async def watch_workers_load(self, interval: float) -> AsyncIterator[Dict[entities.WorkerUUID, WorkerLoad]]:
+        """
+        load snapshots of workers published by every manager node every interval seconds,
+        streams of failed nodes are reconnected, never ends until closed
+        """
+        ...
+
 
 class ManagerNodeControl:
     """
@@ -375,6 +584,13 @@ class LeaderSchedulerControl:
     async def is_he_leader(self, uuid: entities.SchedulerNodeUUID) -> bool:
         ...
 
+    @abstractmethod
+    async def watch_leader(self) -> AsyncIterator[entities.SchedulerNode | None]:
+        """
+        current leader, then every change of leader
+        """
+        ...
+
     @abstractmethod
     async def get_all_nodes(self) -> List[entities.SchedulerNode]:
         ...
@@ -394,10 +610,41 @@ class LeaderSchedulerRPC:
     ):
         ...
 
+    @abstractmethod
+    async def assign_tasks_to_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_tasks_uuid: List[entities.CronTaskUUID],
+            start_time: datetime | None = None
+    ):
+        """
+        assign cron tasks to node in one call
+        """
+        ...
+
     @abstractmethod
     async def get_node_task_list(self, node: entities.SchedulerNode) -> List[entities.CronTaskUUID]:
         ...
 
+    @abstractmethod
+    async def get_node_load(self, node: entities.SchedulerNode) -> SchedulerNodeLoad:
+        """
+        measured load of cron tasks on node and its capacity
+        """
+        ...
+
+    @abstractmethod
+    async def invalidate_task_on_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_task_uuid: entities.CronTaskUUID,
+            version: int
+    ):
+        """
+        tell node cron task changed, node reloads it if its cached version is older
+        """
+        ...
+
     @abstractmethod
     async def remove_task_from_node(
             self,
@@ -407,30 +654,100 @@ class LeaderSchedulerRPC:
     ):
         ...
 
+    @abstractmethod
+    async def remove_tasks_from_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_tasks_uuid: List[entities.CronTaskUUID],
+            start_time: datetime | None = None
+    ):
+        """
+        remove cron tasks from node in one call
+        """
+        ...
+
 
 class Cron:
+    """
+    offset delays every fire of a schedule by offset seconds, used to spread fires of the same boundary,
+    providers which can not delay fires raise ValueError for a non zero offset
+    """
+
     @abstractmethod
-    async def every_n_seconds(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_seconds(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
-    async def every_n_minutes(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_minutes(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
-    async def every_n_hours(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_hours(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
-    async def every_n_days(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_days(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
-    async def every_n_weeks(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_weeks(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
-    async def every_n_millisecond(self, name: str, n: int, task: Callable, *args, **kwargs):
+    async def every_n_millisecond(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
         ...
 
     @abstractmethod
@@ -476,10 +793,34 @@ class Repository:
     async def get_all_cron_task(self, session=None) -> List[entities.CronTask]:
         ...
 
+    @abstractmethod
+    async def get_cron_tasks_changed_since(self, since: datetime, session=None) -> List[entities.CronTask]:
+        """
+        cron tasks added or edited at or after since, for incremental refresh of cron task caches
+        """
+        ...
+
+    @abstractmethod
+    async def update_cron_task(
+            self,
+            task_uuid: entities.CronTaskUUID,
+            value: Dict[str, Any],
+            session=None
+    ) -> int:
+        """
+        update columns of cron task and bump its version
+        :return: new version of cron task
+        """
+        ...
+
     @abstractmethod
     async def add_task(self, task: entities.Task, session=None):
         ...
 
+    @abstractmethod
+    async def add_tasks(self, tasks: List[entities.Task], session=None):
+        ...
+
     @abstractmethod
     async def change_task_status(self, task_uuid: entities.TaskUUID, status: entities.TaskStatus, session=None):
         ...
@@ -512,6 +853,13 @@ class Repository:
         """
         ...
 
+    @abstractmethod
+    async def get_workers_changed_since(self, since: datetime, session=None) -> List[entities.Worker]:
+        """
+        workers added or with status or tags changed at or after since, for incremental sync of worker tag index
+        """
+        ...
+
     @abstractmethod
     async def get_worker_from_uuid(self, task_uuid: entities.WorkerUUID, session=None) -> entities.Task:
         ...
@@ -550,16 +898,62 @@ class Repository:
     ):
         ...
 
+    @abstractmethod
+    async def update_tasks(
+            self,
+            values: Dict[entities.TaskUUID, Dict[str, Any]],
+            only_status: List[entities.TaskStatus] | None = None,
+            session=None
+    ):
+        """
+        update many tasks with their own values, tasks with same updated columns are updated in one statement,
+        with only status tasks in other status are left unchanged
+        """
+        ...
+
     @abstractmethod
     async def update_worker_last_heart_beat_time(self, worker_uuid: entities.WorkerUUID, t: datetime, session=None):
         ...
 
+    @abstractmethod
+    async def update_workers_last_heart_beat_time(
+            self,
+            heart_beats: Dict[entities.WorkerUUID, datetime],
+            session=None
+    ):
+        """
+        update last heart beat time of running workers with one executemany statement
+
+        :param heart_beats: worker uuid -> last heart beat time
+        :param session: session for query
+        """
+        ...
+
     @abstractmethod
     async def get_workers_from_tags(
             self,
             tags: List[str],
+            match_all: bool = False,
             session=None
     ) -> List[entities.Worker]:
+        """
+        running workers with any of tags, or with all of them if match_all
+        """
+        ...
+
+    @abstractmethod
+    async def set_worker_tags(self, worker_uuid: entities.WorkerUUID, tags: List[str], session=None):
+        ...
+
+    @abstractmethod
+    async def get_workers_manager_node(
+            self,
+            workers_uuid: List[entities.WorkerUUID],
+            session=None
+    ) -> Dict[entities.WorkerUUID, entities.TaskWorkerManagerNodeUUID]:
+        """
+        manager node owning each worker, workers without known node are missing
+        """
         ...
 
     @abstractmethod
@@ -597,6 +991,27 @@ class WorkerScheduler:
     async def get_all_cron_task(self) -> List[entities.CronTaskUUID]:
         ...
 
+    @abstractmethod
+    async def invalidate_cron_task(self, task_uuid: entities.CronTaskUUID, version: int):
+        """
+        cron task changed to version, reload it if cached one is older
+        """
+        ...
+
+    @abstractmethod
+    async def refresh_cron_tasks(self):
+        """
+        reload cached cron tasks changed since last refresh
+        """
+        ...
+
+    @abstractmethod
+    async def get_node_load(self) -> SchedulerNodeLoad:
+        """
+        load of cron tasks scheduled here, from their fire rate and observed fire cost
+        """
+        ...
+
     @abstractmethod
     async def process_new_status(self, status_report: StatusReport):
         ...
@@ -611,6 +1026,21 @@ class LeaderScheduler:
     async def rebalance(self, rebalance_date: datetime):
         ...
 
+    @abstractmethod
+    async def cron_task_changed(self, task_uuid: entities.CronTaskUUID, version: int):
+        """
+        push invalidation of an edited cron task to scheduler nodes
+        """
+        ...
+
+    @abstractmethod
+    async def update_cron_task(self, task_uuid: entities.CronTaskUUID, value: Dict[str, Any]) -> int:
+        """
+        edit cron task and push invalidation of new version to scheduler nodes
+        :return: new version
+        """
+        ...
+
 
 class NoNodeException(Exception):
     ...
@@ -621,6 +1051,33 @@ class RPCChannelChooser(Generic[_T]):
     def channel_node_changes(self, nodes: List[Any]):
         ...
 
+    @abstractmethod
+    def get_all_nodes(self) -> List[Any]:
+        ...
+
+    @abstractmethod
+    def watch_nodes(self) -> AsyncIterator[List[Any]]:
+        """
+        current nodes, then nodes again on every node change
+        """
+        ...
+
+    @abstractmethod
+    async def get_node_channel(self, node: Any) -> _T:
+        """
+        channel to a specific node, for requests that go to every node
+        """
+        ...
+
+    @abstractmethod
+    async def get_node(self, key: bytes | None = None) -> Any:
+        """
+        choose node for rpc, requests with same key go to same node
+        :param key: choose node depends on key
+        :return: rpc node
+        """
+        ...
+
     @abstractmethod
     async def get_channel(self, key: bytes | None = None) -> _T:
         """
@@ -631,6 +1088,26 @@ class RPCChannelChooser(Generic[_T]):
         """
         ...
 
+    @abstractmethod
+    async def get_placement_node(self) -> Any:
+        """
+        choose node for new state, e.g. new worker, unhealthy nodes are avoided
+        """
+        ...
+
+    @abstractmethod
+    def report(self, node: Any, latency: float, ok: bool):
+        """
+        record result of rpc to node
+        :param latency: seconds rpc took
+        :param ok: rpc succeeded
+        """
+        ...
+
+    @abstractmethod
+    def get_nodes_health(self) -> Dict[Any, NodeHealth]:
+        ...
+
 
 class TimeoutException(Exception):
     ...
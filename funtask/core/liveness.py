@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Set
+
+from funtask.core import entities
+
+
+class WorkerLivenessTable:
+    """
+    in-memory last seen table of workers, heart beats are recorded here and flushed to repository in bulk,
+    liveness queries are served from memory
+
+    liveness is per scheduler node, each node only sees heart beats of the status streams it consumes,
+    so alive timeout should cover several heart beat intervals. workers never seen are unknown, not dead
+    """
+
+    def __init__(self, alive_timeout: timedelta = timedelta(seconds=15)):
+        self.alive_timeout = alive_timeout
+        self.last_seen: Dict[entities.WorkerUUID, datetime] = {}
+        # workers beat since last flush
+        self._dirty: Set[entities.WorkerUUID] = set()
+
+    def beat(self, worker_uuid: entities.WorkerUUID, t: datetime | None = None):
+        t = t or datetime.now()
+        last_seen = self.last_seen.get(worker_uuid)
+        if last_seen is not None and last_seen >= t:
+            return
+        self.last_seen[worker_uuid] = t
+        self._dirty.add(worker_uuid)
+
+    def forget(self, worker_uuid: entities.WorkerUUID):
+        self.last_seen.pop(worker_uuid, None)
+        self._dirty.discard(worker_uuid)
+
+    def retain(self, workers_uuid: Set[entities.WorkerUUID]):
+        """
+        forget workers not in workers uuid, e.g. removed or not running anymore
+        """
+        for worker_uuid in [w for w in self.last_seen if w not in workers_uuid]:
+            self.forget(worker_uuid)
+
+    def is_stale(self, worker_uuid: entities.WorkerUUID, now: datetime | None = None) -> bool:
+        """
+        worker was seen by this node but its heart beats stopped for alive timeout
+        """
+        last_seen = self.last_seen.get(worker_uuid)
+        return last_seen is not None and (now or datetime.now()) - last_seen > self.alive_timeout
+
+    def is_alive(self, worker_uuid: entities.WorkerUUID, now: datetime | None = None) -> bool:
+        last_seen = self.last_seen.get(worker_uuid)
+        if last_seen is None:
+            return False
+        return (now or datetime.now()) - last_seen <= self.alive_timeout
+
+    def alive_workers(self, now: datetime | None = None) -> List[entities.WorkerUUID]:
+        now = now or datetime.now()
+        return [
+            worker_uuid for worker_uuid, last_seen in self.last_seen.items()
+            if now - last_seen <= self.alive_timeout
+        ]
+
+    def drain(self) -> Dict[entities.WorkerUUID, datetime]:
+        """
+        take all heart beats recorded since last drain
+        :return: worker uuid -> latest heart beat time
+        """
+        heart_beats = {worker_uuid: self.last_seen[worker_uuid] for worker_uuid in self._dirty}
+        self._dirty = set()
+        return heart_beats
+
+    def restore(self, heart_beats: Dict[entities.WorkerUUID, datetime]):
+        """
+        put back heart beats which failed to flush, so they are flushed next time
+        """
+        for worker_uuid in heart_beats:
+            if worker_uuid in self.last_seen:
+                self._dirty.add(worker_uuid)
@@ -0,0 +1,118 @@
+import math
+from enum import auto, unique
+from typing import Dict, List, Tuple, TypeVar, Hashable
+
+from funtask.core import entities
+from funtask.utils.enum_utils import AutoName
+
+_Node = TypeVar('_Node', bound=Hashable)
+
+# smoothing factor of observed fire costs
+_COST_ALPHA = .2
+# cost of a fire before it is observed, seconds
+_DEFAULT_FIRE_COST = .001
+
+
+@unique
+class PlacementMode(AutoName):
+    # rendezvous hash of task uuid, every task weights the same
+    HASH = auto()
+    # bin pack tasks weighted by fire rate and observed cost against node capacity
+    COST = auto()
+
+
+def fire_rate(cron_task: entities.CronTask) -> float:
+    """
+    fires per second of all time points of cron task
+    """
+    return sum(1 / time_point.period for time_point in cron_task.timepoints)
+
+
+class TaskCostTable:
+    """
+    moving average of scheduler time spent per fire of each cron task, split into strategy UDF
+    resolution and dispatch (insert and rpc of the batch, shared evenly by its fires)
+    """
+
+    def __init__(self, alpha: float = _COST_ALPHA, default_cost: float = _DEFAULT_FIRE_COST):
+        self.alpha = alpha
+        self.default_cost = default_cost
+        self._udf_costs: Dict[entities.CronTaskUUID, float] = {}
+        self._dispatch_costs: Dict[entities.CronTaskUUID, float] = {}
+
+    def _observe(self, costs: Dict[entities.CronTaskUUID, float], task_uuid: entities.CronTaskUUID, cost: float):
+        last = costs.get(task_uuid)
+        costs[task_uuid] = cost if last is None else last + self.alpha * (cost - last)
+
+    def observe_udf(self, task_uuid: entities.CronTaskUUID, cost: float):
+        self._observe(self._udf_costs, task_uuid, cost)
+
+    def observe_dispatch(self, task_uuid: entities.CronTaskUUID, cost: float):
+        self._observe(self._dispatch_costs, task_uuid, cost)
+
+    def cost(self, task_uuid: entities.CronTaskUUID) -> float:
+        """
+        seconds per fire, default cost if never fired here
+        """
+        udf_cost = self._udf_costs.get(task_uuid)
+        dispatch_cost = self._dispatch_costs.get(task_uuid)
+        if udf_cost is None and dispatch_cost is None:
+            return self.default_cost
+        return (udf_cost or 0.) + (dispatch_cost or 0.)
+
+    def load(self, cron_task: entities.CronTask) -> float:
+        """
+        seconds of scheduler time per second the cron task takes
+        """
+        return fire_rate(cron_task) * self.cost(cron_task.uuid)
+
+    def forget(self, task_uuid: entities.CronTaskUUID):
+        self._udf_costs.pop(task_uuid, None)
+        self._dispatch_costs.pop(task_uuid, None)
+
+
+def bin_pack(
+        placement: Dict[_Node, List[entities.CronTaskUUID]],
+        weights: Dict[entities.CronTaskUUID, float],
+        capacities: Dict[_Node, float]
+) -> Tuple[Dict[_Node, List[entities.CronTaskUUID]], Dict[_Node, List[entities.CronTaskUUID]]]:
+    """
+    move tasks so no node is over its capacity while moving as few as possible, heaviest tasks
+    leave over loaded nodes first and every free task goes to the node with lowest utilization after it
+
+    :param placement: current tasks of nodes, nodes not in capacities are gone and lose all tasks
+    :param weights: load of tasks, tasks without weight count as 0
+    :param capacities: capacity of alive nodes, same unit with weights
+    :return: tasks to remove from and tasks to assign to each node
+    """
+    loads = {node: 0. for node in capacities}
+    removes: Dict[_Node, List[entities.CronTaskUUID]] = {}
+    free: List[Tuple[entities.CronTaskUUID, _Node | None]] = []
+    for node, task_uuids in placement.items():
+        if node not in capacities:
+            free.extend((task_uuid, None) for task_uuid in task_uuids)
+            continue
+        loads[node] = sum(weights.get(task_uuid, 0.) for task_uuid in task_uuids)
+        if loads[node] <= capacities[node]:
+            continue
+        for task_uuid in sorted(task_uuids, key=lambda t: weights.get(t, 0.), reverse=True):
+            if loads[node] <= capacities[node]:
+                break
+            loads[node] -= weights.get(task_uuid, 0.)
+            free.append((task_uuid, node))
+    assigns: Dict[_Node, List[entities.CronTaskUUID]] = {}
+    if not capacities:
+        return removes, assigns
+    for task_uuid, from_node in sorted(free, key=lambda item: weights.get(item[0], 0.), reverse=True):
+        weight = weights.get(task_uuid, 0.)
+        to_node = min(
+            capacities,
+            key=lambda n: (loads[n] + weight) / capacities[n] if capacities[n] > 0 else math.inf
+        )
+        loads[to_node] += weight
+        if to_node == from_node:
+            continue
+        if from_node is not None:
+            removes.setdefault(from_node, []).append(task_uuid)
+        assigns.setdefault(to_node, []).append(task_uuid)
+    return removes, assigns
@@ -1,10 +1,12 @@
 import asyncio
 import random
+import time
 import uuid
+from contextlib import AsyncExitStack
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, cast
+from collections import defaultdict
+from typing import List, Dict, Any, cast, Tuple, TypeVar, Iterable, Callable, Awaitable, Set
 
-import dill
 from dependency_injector.wiring import inject, Provide
 from loguru import logger
 from pydantic.dataclasses import dataclass
@@ -12,7 +14,14 @@ from pydantic.dataclasses import dataclass
 from funtask.core import interface_and_types as interface
 from funtask.core import entities
 from funtask.core.interface_and_types import StatusReport
-from dataclasses import asdict
+from funtask.core.liveness import WorkerLivenessTable
+from funtask.core.udf_cache import UDFCache
+from funtask.core.worker_load import WorkerLoadTable
+from funtask.core.tag_index import WorkerTagIndex, parse_tag_expression
+from funtask.core.placement import PlacementMode, TaskCostTable, bin_pack
+from funtask.utils.hashing import stable_fraction, rendezvous_choose
+from funtask.utils.metrics import Histogram, exponential_bounds
+from dataclasses import asdict, replace
 
 
 def _task_with_point2name(cron_task: entities.CronTask, time_point: entities.TimePoint) -> str:
@@ -24,11 +33,71 @@ def _task_from_name(name: str) -> entities.CronTaskUUID:
 
 
 def _filter_task_uuid_from_names(names: List[str], task_uuid: entities.CronTaskUUID) -> List[str]:
-    return [name for name in names if name.startswith(task_uuid)]
+    return [name for name in names if _task_from_name(name) == task_uuid]
 
 
-def _bytes2func(bytes_func: bytes) -> interface.FuncTask:
-    return dill.loads(bytes_func)
+# incremental refresh queries reach back this much before last refresh
+_CHANGED_SINCE_OVERLAP = timedelta(seconds=5)
+
+
+def _spread_offset(cron_task: entities.CronTask, time_point: entities.TimePoint, default_window: float) -> float:
+    """
+    deterministic offset of cron task fires inside spread window, hashed from cron task uuid
+    so fires of the same boundary are spread evenly, window never exceeds the period
+    """
+    window = cron_task.spread_window if cron_task.spread_window is not None else default_window
+    if not window:
+        return 0.
+    return stable_fraction(cron_task.uuid) * min(window, time_point.period)
+
+
+def _least_loaded(
+        candidates: List[entities.WorkerUUID],
+        loads: Dict[entities.WorkerUUID, int]
+) -> entities.WorkerUUID:
+    """
+    candidate with least load, ties are broken randomly so equal workers share the load
+    """
+    min_load = min(loads[candidate] for candidate in candidates)
+    return random.choice([candidate for candidate in candidates if loads[candidate] == min_load])
+
+
+def _new_sub_task(
+        cron_task: entities.CronTask,
+        status: entities.TaskStatus,
+        argument: entities.FuncArgument | None = None,
+        result: Any = None
+) -> entities.Task:
+    return entities.Task(
+        uuid=cast(entities.TaskUUID, str(uuid.uuid4())),
+        parent_task_uuid=cron_task.uuid,
+        uuid_in_manager=None,
+        status=status,
+        worker_uuid=None,
+        func=cron_task.func,
+        argument=argument,
+        result_as_state=cron_task.result_as_state,
+        timeout=cron_task.timeout,
+        description=cron_task.description,
+        result=result
+    )
+
+
+class _FireContext:
+    """
+    UDF context of a fire, cron task is converted to dict on first use only
+    and each strategy UDF gets its own shallow copy
+    """
+    __slots__ = ('cron_task', '_info_dict')
+
+    def __init__(self, cron_task: entities.CronTask):
+        self.cron_task = cron_task
+        self._info_dict: Dict[str, Any] | None = None
+
+    def info_dict(self) -> Dict[str, Any]:
+        if self._info_dict is None:
+            self._info_dict = asdict(self.cron_task)
+        return dict(self._info_dict)
 
 
 class WorkerScheduler(interface.WorkerScheduler):
@@ -39,16 +108,85 @@ class WorkerScheduler(interface.WorkerScheduler):
             repository: interface.Repository = Provide['repository'],
             cron: interface.Cron = Provide['scheduler.cron'],
             argument_queue_factory: interface.QueueFactory = Provide['scheduler.argument_queue_factory'],
-            lock: interface.DistributeLock = Provide['lock']
+            lock: interface.DistributeLock = Provide['lock'],
+            worker_alive_timeout: timedelta = timedelta(seconds=15),
+            spread_window: float = 0.,
+            udf_cache_size: int = 1024,
+            worker_load_max_age: timedelta = timedelta(seconds=5),
+            node_capacity: float = 1.
     ):
         self.funtask_manager_rpc = funtask_manager_rpc
         self.repository = repository
+        # current snapshot of cron tasks this node is responsible for, fires read strategies from here
         self.task_map: Dict[entities.CronTaskUUID, entities.CronTask] = {}
+        self._cron_tasks_refreshed_time = datetime.now()
         self.cron = cron
         self.argument_queue_factory = argument_queue_factory
         self.lock = lock
+        # fires of current tick wait for batch materialization
+        self._tick_fires: List[entities.CronTaskUUID] = []
+        self.worker_liveness = WorkerLivenessTable(worker_alive_timeout)
+        # default spread window in seconds of cron tasks without their own, 0 means no spreading
+        self.spread_window = spread_window
+        self.udf_cache = UDFCache(udf_cache_size)
+        self.worker_load_table = WorkerLoadTable(worker_load_max_age.total_seconds())
+        # synced from workers changed in repository, status reports received here apply at once
+        self.worker_tag_index = WorkerTagIndex()
+        self._worker_tag_index_synced_time = datetime.now()
+        # observed time spent per fire, weights cron tasks for cost based placement
+        self.task_costs = TaskCostTable()
+        self.node_capacity = node_capacity
+
+    async def flush_heart_beats(self):
+        """
+        write heart beats coalesced in liveness table to repository with one executemany update,
+        heart beats of a failed write are kept for next flush
+        """
+        heart_beats = self.worker_liveness.drain()
+        if not heart_beats:
+            return
+        try:
+            await self.repository.update_workers_last_heart_beat_time(heart_beats)
+        except Exception as e:
+            self.worker_liveness.restore(heart_beats)
+            logger.opt(exception=e).error("flush {n} heart beats failed, retrying on next flush", n=len(heart_beats))
+
+    async def watch_worker_loads(self, interval: timedelta):
+        """
+        keep worker load table updated from load snapshots published by managers,
+        the subscription is opened again after an interval if it fails or ends
+        """
+        while True:
+            try:
+                async for loads in self.funtask_manager_rpc.watch_workers_load(interval.total_seconds()):
+                    self.worker_load_table.update(loads)
+                logger.warning("worker load subscription ended, resubscribing")
+            except Exception as e:
+                logger.opt(exception=e).error("worker load subscription failed, resubscribing")
+            await asyncio.sleep(interval.total_seconds())
+
+    def is_worker_alive(self, worker_uuid: entities.WorkerUUID) -> bool:
+        """
+        liveness seen by this scheduler node only, see WorkerLivenessTable
+        """
+        return self.worker_liveness.is_alive(worker_uuid)
+
+    def get_alive_workers(self) -> List[entities.WorkerUUID]:
+        return self.worker_liveness.alive_workers()
+
+    def _without_stale(self, workers: List[entities.WorkerUUID]) -> List[entities.WorkerUUID]:
+        """
+        drop workers whose heart beats stopped reaching this node, all of them are kept if none is left,
+        as this node may just not have seen heart beats consumed by other nodes
+        """
+        now = datetime.now()
+        alive = [worker for worker in workers if not self.worker_liveness.is_stale(worker, now)]
+        return alive or workers
 
     async def process_new_status(self, status_report: StatusReport):
+        if status_report.task_uuid is None and status_report.status is entities.TaskStatus.ERROR:
+            # worker stop signal is reported as error without task
+            status_report = replace(status_report, status=entities.WorkerStatus.STOPPED)
         if isinstance(status_report.status, entities.TaskStatus):
             assert status_report.task_uuid is not None, ValueError(
                 'task uuid is None in status report'
@@ -67,60 +205,81 @@ class WorkerScheduler(interface.WorkerScheduler):
                         f"can't change status from {task.status} to {task.status}"
                     )
             await self.repository.change_task_status(task_uuid=status_report.task_uuid, status=status_report.status)
-        elif isinstance(status_report.status, entities.WorkerStatus):
+        elif status_report.status is None or isinstance(status_report.status, entities.WorkerStatus):
             assert status_report.worker_uuid is not None, ValueError(
                 "worker uuid should not be none, when status type is WorkerStatus, please report this bug"
             )
-            worker = await self.repository.get_worker_from_uuid(
-                status_report.worker_uuid
-            )
-            # validate status change
-            if worker.status is not entities.WorkerStatus.RUNNING:
-                raise interface.StatusChangeException(
-                    f"worker {worker.uuid} status is {worker.status}, but still heart beat"
-                )
-            await self.repository.update_worker_last_heart_beat_time(status_report.worker_uuid, datetime.now())
+            # heart beats only touch the liveness table, they are flushed in bulk by flush_heart_beats,
+            # and the bulk update skips workers not in RUNNING status
+            if status_report.status in (entities.WorkerStatus.STOPPED, entities.WorkerStatus.DIED):
+                self.worker_liveness.forget(status_report.worker_uuid)
+            else:
+                self.worker_liveness.beat(status_report.worker_uuid, datetime.now())
+            if status_report.status is not None:
+                # statuses are consumed by one scheduler node, others see the change on their next index sync
+                await self.repository.change_worker_status(status_report.worker_uuid, status_report.status)
+                self.worker_tag_index.set_status(status_report.worker_uuid, status_report.status)
 
     async def assign_task(self, task_uuid: entities.TaskUUID):
         task = await self.repository.get_task_from_uuid(task_uuid)
-        assert task.worker_uuid is not None, ValueError(
-            'worker uuid cannot be None'
-        )
-        if isinstance(task.func, entities.FuncUUID):
-            func = await self.repository.get_function_from_uuid(func_uuid=task.func)
-        else:
-            func = task.func
-        task_uuid_in_manager = await self.funtask_manager_rpc.dispatch_fun_task(
-            worker_uuid=task.worker_uuid,
-            func_task=func.func,
-            dependencies=func.dependencies,
-            change_status=task.result_as_state,
-            timeout=task.timeout,
-            argument=task.argument
-        )
-        await self.repository.update_task(task_uuid, {
-            'status': entities.TaskStatus.QUEUED,
-            'uuid_in_manager': task_uuid_in_manager
-        })
+        await self._assign_tasks([task])
 
     async def remove_cron_task(self, task_uuid: entities.CronTaskUUID) -> bool:
+        self.task_map.pop(task_uuid, None)
+        self.task_costs.forget(task_uuid)
+        await self._unschedule_cron_task(task_uuid)
+        return True
+
+    async def _unschedule_cron_task(self, task_uuid: entities.CronTaskUUID):
         all_cron_tasks = await self.cron.get_all()
         target_cron_tasks = _filter_task_uuid_from_names(
             all_cron_tasks, task_uuid)
         [await self.cron.cancel(target_cron_task) for target_cron_task in target_cron_tasks]
-        return True
+
+    async def _apply_cron_task(self, cron_task: entities.CronTask):
+        """
+        replace cached cron task with a newer version, reschedule if its schedule changed
+        """
+        cached = self.task_map.get(cron_task.uuid)
+        # not responsible for it or already up to date
+        if cached is None or cached.version >= cron_task.version:
+            return
+        self.task_map[cron_task.uuid] = cron_task
+        if (cached.timepoints, cached.spread_window, cached.disabled) == \
+                (cron_task.timepoints, cron_task.spread_window, cron_task.disabled):
+            return
+        await self._unschedule_cron_task(cron_task.uuid)
+        if not cron_task.disabled:
+            await self._schedule_cron_task(cron_task)
+
+    async def invalidate_cron_task(self, task_uuid: entities.CronTaskUUID, version: int):
+        cached = self.task_map.get(task_uuid)
+        if cached is None or cached.version >= version:
+            return
+        await self._apply_cron_task(await self.repository.get_cron_task_from_uuid(task_uuid))
+
+    async def refresh_cron_tasks(self):
+        refresh_time = datetime.now()
+        # overlap with last refresh covers clock skew of writers, repeated rows are dropped by version
+        changed = await self.repository.get_cron_tasks_changed_since(
+            self._cron_tasks_refreshed_time - _CHANGED_SINCE_OVERLAP
+        )
+        for cron_task in changed:
+            await self._apply_cron_task(cron_task)
+        self._cron_tasks_refreshed_time = refresh_time
 
     async def _resolve_task_queue_strategy(
             self,
             task_queue_strategy: entities.QueueStrategy,
-            info_dict: Dict[str, Any],
+            context: _FireContext,
             max_depth=10,
-            depth=0
+            depth=0,
+            info_dict: Dict[str, Any] | None = None
     ) -> entities.QueueStrategy:
         """
         resolve queue strategy to no udf strategy
         :param task_queue_strategy: strategy on task queue full
-        :param info_dict: arguments of UDF
+        :param context: context of the fire, UDF arguments are built from it
         :return: strategy with no udf
         """
         if depth > max_depth:
@@ -130,49 +289,55 @@ class WorkerScheduler(interface.WorkerScheduler):
             return task_queue_strategy
         assert task_queue_strategy.udf is not None, ValueError(
             "task UDF strategy must not None")
+        if info_dict is None:
+            info_dict = context.info_dict()
         if task_queue_strategy.udf_extra:
             info_dict.update(task_queue_strategy.udf_extra)
-        udf = _bytes2func(task_queue_strategy.udf.func)
+        udf = self.udf_cache.get(task_queue_strategy.udf)
         new_strategy = await udf(info_dict)
-        return await self._resolve_task_queue_strategy(new_strategy, info_dict, depth=depth + 1)
+        return await self._resolve_task_queue_strategy(new_strategy, context, depth=depth + 1, info_dict=info_dict)
 
     async def _resolve_argument_strategy(
             self,
             argument_strategy: entities.ArgumentStrategy,
-            info_dict: Dict[str, Any],
+            context: _FireContext,
             max_depth=10,
-            depth=0
+            depth=0,
+            info_dict: Dict[str, Any] | None = None
     ) -> entities.ArgumentStrategy:
         """
         resolve argument strategy to no udf strategy
         :param argument_strategy: argument generate strategy
-        :param info_dict: arguments of UDF
+        :param context: context of the fire, UDF arguments are built from it
         :return: strategy with no udf
         """
         if depth > max_depth:
             raise RecursionError(
                 f"max depth of resolve queue strategy {max_depth}")
-        if argument_strategy != entities.ArgumentGenerateStrategy.UDF:
+        if argument_strategy.strategy != entities.ArgumentGenerateStrategy.UDF:
             return argument_strategy
         assert argument_strategy.udf is not None, ValueError(
             "argument UDF strategy must not None")
+        if info_dict is None:
+            info_dict = context.info_dict()
         if argument_strategy.udf_extra:
             info_dict.update(argument_strategy.udf_extra)
-        udf = _bytes2func(argument_strategy.udf.func)
+        udf = self.udf_cache.get(argument_strategy.udf)
         new_strategy = await udf(info_dict)
-        return await self._resolve_argument_strategy(new_strategy, info_dict, depth=depth + 1)
+        return await self._resolve_argument_strategy(new_strategy, context, depth=depth + 1, info_dict=info_dict)
 
     async def _resolve_worker_choose_strategy(
             self,
             worker_choose_strategy: entities.WorkerStrategy,
-            info_dict: Dict[str, Any],
+            context: _FireContext,
             max_depth=10,
-            depth=0
+            depth=0,
+            info_dict: Dict[str, Any] | None = None
     ) -> entities.WorkerStrategy:
         """
         resolve argument strategy to no udf strategy
         :param worker_choose_strategy: worker choose strategy
-        :param info_dict: arguments of UDF
+        :param context: context of the fire, UDF arguments are built from it
         :return: strategy with no udf
         """
         if depth > max_depth:
@@ -182,18 +347,105 @@ class WorkerScheduler(interface.WorkerScheduler):
             return worker_choose_strategy
         assert worker_choose_strategy.udf is not None, ValueError(
             "worker choose UDF strategy must not None")
+        if info_dict is None:
+            info_dict = context.info_dict()
         if worker_choose_strategy.udf_extra:
             info_dict.update(worker_choose_strategy.udf_extra)
-        udf = _bytes2func(worker_choose_strategy.udf.func)
+        udf = self.udf_cache.get(worker_choose_strategy.udf)
         new_strategy = await udf(info_dict)
-        return await self._resolve_worker_choose_strategy(new_strategy, info_dict, depth=depth + 1)
+        return await self._resolve_worker_choose_strategy(new_strategy, context, depth=depth + 1, info_dict=info_dict)
 
-    async def _choose_worker_from_worker_choose_strategy(
+    async def _get_strategy_candidates(
             self,
-            cron_task: entities.CronTask,
             worker_choose_strategy: entities.WorkerStrategy
+    ) -> List[entities.WorkerUUID]:
+        if worker_choose_strategy.workers:
+            return worker_choose_strategy.workers
+        assert worker_choose_strategy.worker_tags is not None, ValueError(
+            "workers or worker tags should not be None")
+        return await self._get_workers_from_tags(worker_choose_strategy.worker_tags)
+
+    async def _get_workers_from_tags(self, worker_tags: List[str]) -> List[entities.WorkerUUID]:
+        """
+        running workers matching tag expression, from tag index once it is loaded, otherwise from repository
+        """
+        if self.worker_tag_index.loaded:
+            return list(self.worker_tag_index.match(worker_tags))
+        workers = set()
+        for clause in parse_tag_expression(worker_tags):
+            workers.update(
+                worker.uuid for worker in await self.repository.get_workers_from_tags(list(clause), match_all=True)
+            )
+        return list(workers)
+
+    async def sync_worker_tag_index(self):
+        """
+        apply workers added or changed since last sync to tag index
+        """
+        sync_time = datetime.now()
+        # overlap with last sync covers clock skew of writers, repeated rows are applied again
+        changed = await self.repository.get_workers_changed_since(
+            self._worker_tag_index_synced_time - _CHANGED_SINCE_OVERLAP
+        )
+        for worker in changed:
+            self.worker_tag_index.add_worker(worker)
+            if worker.status is not entities.WorkerStatus.RUNNING:
+                self.worker_liveness.forget(worker.uuid)
+                self.worker_load_table.forget(worker.uuid)
+        self._worker_tag_index_synced_time = sync_time
+
+    async def refresh_worker_tag_index(self, page_size: int = 1000):
+        """
+        rebuild tag index from repository, reconciles changes whose incremental sync was missed
+        """
+        sync_time = datetime.now()
+        workers: List[entities.Worker] = []
+        cursor = None
+        while (page := await self.repository.get_workers_from_cursor(page_size, cursor)) is not None:
+            page_workers, cursor = page
+            workers.extend(page_workers)
+        self.worker_tag_index.replace_all(workers)
+        self._worker_tag_index_synced_time = sync_time
+        # removed and not running workers leave liveness table, so it does not grow with worker churn
+        self.worker_liveness.retain({
+            worker.uuid for worker in workers if worker.status is entities.WorkerStatus.RUNNING
+        })
+
+    async def _load_workers(
+            self,
+            workers: List[entities.WorkerUUID],
+            loads: Dict[entities.WorkerUUID, int | None]
+    ):
+        """
+        fill load of workers not in loads yet from load table, workers without fresh snapshot are asked
+        from managers, load of unreachable workers is None
+        """
+        missing = []
+        for worker in workers:
+            if worker in loads:
+                continue
+            load = self.worker_load_table.get(worker)
+            if load is None:
+                missing.append(worker)
+            else:
+                loads[worker] = load.total
+        if not missing:
+            return
+        fetched = await self.funtask_manager_rpc.get_workers_load(missing)
+        self.worker_load_table.update(fetched)
+        for worker in missing:
+            load = fetched.get(worker)
+            loads[worker] = None if load is None else load.total
+
+    async def _choose_worker_from_worker_choose_strategy(
+            self,
+            worker_choose_strategy: entities.WorkerStrategy,
+            loads: Dict[entities.WorkerUUID, int | None] | None = None
     ) -> entities.WorkerUUID | None:
-        new_task_uuid = cast(entities.TaskUUID, str(uuid.uuid4()))
+        """
+        choose worker for a fire, None means no worker for the strategy
+        :param loads: known worker loads shared by fires of a batch, chosen worker's load is increased
+        """
         match worker_choose_strategy.strategy:
             case entities.WorkerChooseStrategy.STATIC:
                 assert worker_choose_strategy.static_worker is not None, ValueError(
@@ -202,65 +454,51 @@ class WorkerScheduler(interface.WorkerScheduler):
             case entities.WorkerChooseStrategy.RANDOM_FROM_LIST:
                 assert worker_choose_strategy.workers is not None and len(worker_choose_strategy.workers) != 0, \
                     ValueError("workers must not None")
-                return random.choice(worker_choose_strategy.workers)
+                return random.choice(self._without_stale(worker_choose_strategy.workers))
             case entities.WorkerChooseStrategy.RANDOM_FROM_WORKER_TAGS:
                 assert worker_choose_strategy.worker_tags is not None, ValueError(
                     "worker tags should not be None")
-                workers = await self.repository.get_workers_from_tags(worker_choose_strategy.worker_tags)
+                workers = self._without_stale(await self._get_workers_from_tags(worker_choose_strategy.worker_tags))
                 if workers:
-                    choose_worker: entities.Worker = random.choice(workers)
-                    return choose_worker.uuid
-                else:
-                    await self.repository.add_task(entities.Task(
-                        uuid=new_task_uuid,
-                        parent_task_uuid=cron_task.uuid,
-                        uuid_in_manager=None,
-                        status=entities.TaskStatus.SKIP,
-                        worker_uuid=None,
-                        func=cron_task.func,
-                        argument=None,
-                        result_as_state=cron_task.result_as_state,
-                        timeout=cron_task.timeout,
-                        description=cron_task.description,
-                        result=f"no worker of tag {worker_choose_strategy.worker_tags}"
-                    ))
+                    return random.choice(workers)
+                return None
+            case entities.WorkerChooseStrategy.LEAST_QUEUED | entities.WorkerChooseStrategy.POWER_OF_TWO:
+                loads = {} if loads is None else loads
+                candidates = self._without_stale(await self._get_strategy_candidates(worker_choose_strategy))
+                if worker_choose_strategy.strategy is entities.WorkerChooseStrategy.POWER_OF_TWO:
+                    # only two candidates are sampled, so only their load is needed
+                    candidates = random.sample(candidates, min(len(candidates), 2))
+                await self._load_workers(candidates, loads)
+                candidates = [candidate for candidate in candidates if loads[candidate] is not None]
+                if not candidates:
                     return None
+                worker = _least_loaded(candidates, cast(Dict[entities.WorkerUUID, int], loads))
+                loads[worker] = cast(int, loads[worker]) + 1
+                return worker
+            case _:
+                raise NotImplementedError(
+                    f"not implement strategy {worker_choose_strategy.strategy}")
 
     async def _generate_task_from_argument_strategy(
             self,
             cron_task: entities.CronTask,
             argument_strategy: entities.ArgumentStrategy
-    ) -> entities.TaskUUID | None:
-        new_task_uuid = cast(entities.TaskUUID, str(uuid.uuid4()))
+    ) -> entities.Task | None:
+        """
+        generate sub task of cron task from argument strategy, task is not written to db
+        :return: new sub task, None means drop
+        """
         match argument_strategy.strategy:
             case entities.ArgumentGenerateStrategy.DROP:
-                return
+                return None
             case entities.ArgumentGenerateStrategy.SKIP:
-                await self.repository.add_task(entities.Task(
-                    uuid=new_task_uuid,
-                    parent_task_uuid=cron_task.uuid,
-                    uuid_in_manager=None,
-                    status=entities.TaskStatus.SKIP,
-                    worker_uuid=None,
-                    func=cron_task.func,
-                    argument=None,
-                    result_as_state=cron_task.result_as_state,
-                    timeout=cron_task.timeout,
-                    description=cron_task.description
-                ))
+                return _new_sub_task(cron_task, entities.TaskStatus.SKIP)
             case entities.ArgumentGenerateStrategy.STATIC:
-                await self.repository.add_task(entities.Task(
-                    uuid=new_task_uuid,
-                    parent_task_uuid=cron_task.uuid,
-                    uuid_in_manager=None,
-                    status=entities.TaskStatus.SCHEDULED,
-                    worker_uuid=None,
-                    func=cron_task.func,
-                    argument=cron_task.argument_generate_strategy.static_value,
-                    result_as_state=cron_task.result_as_state,
-                    timeout=cron_task.timeout,
-                    description=cron_task.description
-                ))
+                return _new_sub_task(
+                    cron_task,
+                    entities.TaskStatus.SCHEDULED,
+                    argument=argument_strategy.static_value
+                )
             case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_DROP | \
                  entities.ArgumentGenerateStrategy.FROM_QUEUE_END_SKIP | \
                  entities.ArgumentGenerateStrategy.FROM_QUEUE_END_REPEAT_LATEST:
@@ -273,123 +511,209 @@ class WorkerScheduler(interface.WorkerScheduler):
                 qsize = await argument_queue.qsize()
                 if qsize != 0:
                     argument = await argument_queue.get(0)
-                    await self.repository.add_task(entities.Task(
-                        uuid=new_task_uuid,
-                        parent_task_uuid=cron_task.uuid,
-                        uuid_in_manager=None,
-                        status=entities.TaskStatus.SCHEDULED,
-                        worker_uuid=None,
-                        func=cron_task.func,
-                        argument=argument,
-                        result_as_state=cron_task.result_as_state,
-                        timeout=cron_task.timeout,
-                        description=cron_task.description
-                    ))
-                else:
-                    match argument_strategy.strategy:
-                        case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_DROP:
-                            return
-                        case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_SKIP:
-                            await self.repository.add_task(entities.Task(
-                                uuid=new_task_uuid,
-                                parent_task_uuid=cron_task.uuid,
-                                uuid_in_manager=None,
-                                status=entities.TaskStatus.SKIP,
-                                worker_uuid=None,
-                                func=cron_task.func,
-                                argument=None,
-                                result_as_state=cron_task.result_as_state,
-                                timeout=cron_task.timeout,
-                                description=cron_task.description
-                            ))
-                        case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_REPEAT_LATEST:
-                            try:
-                                argument = await argument_queue.get_front()
-                            except interface.EmptyQueueException:
-                                await self.repository.add_task(entities.Task(
-                                    uuid=new_task_uuid,
-                                    parent_task_uuid=cron_task.uuid,
-                                    uuid_in_manager=None,
-                                    status=entities.TaskStatus.ERROR,
-                                    worker_uuid=None,
-                                    func=cron_task.func,
-                                    argument=None,
-                                    result_as_state=cron_task.result_as_state,
-                                    timeout=cron_task.timeout,
-                                    description=cron_task.description,
-                                    result=f"empty argument queue on {cron_task.argument_generate_strategy.strategy} mod"
-                                ))
-                                return
-                            await self.repository.add_task(entities.Task(
-                                uuid=new_task_uuid,
-                                parent_task_uuid=cron_task.uuid,
-                                uuid_in_manager=None,
-                                status=entities.TaskStatus.SCHEDULED,
-                                worker_uuid=None,
-                                func=cron_task.func,
-                                argument=argument,
-                                result_as_state=cron_task.result_as_state,
-                                timeout=cron_task.timeout,
-                                description=cron_task.description
-                            ))
+                    return _new_sub_task(cron_task, entities.TaskStatus.SCHEDULED, argument=argument)
+                match argument_strategy.strategy:
+                    case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_DROP:
+                        return None
+                    case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_SKIP:
+                        return _new_sub_task(cron_task, entities.TaskStatus.SKIP)
+                    case entities.ArgumentGenerateStrategy.FROM_QUEUE_END_REPEAT_LATEST:
+                        try:
+                            argument = await argument_queue.get_front()
+                        except interface.EmptyQueueException:
+                            return _new_sub_task(
+                                cron_task,
+                                entities.TaskStatus.ERROR,
+                                result=f"empty argument queue on {argument_strategy.strategy} mod"
+                            )
+                        return _new_sub_task(cron_task, entities.TaskStatus.SCHEDULED, argument=argument)
             case _:
                 raise NotImplementedError(
                     f"not implement strategy {argument_strategy.strategy}")
 
-    async def _create_cron_sub_task(self, cron_task: entities.CronTask):
-        # resolve udf strategy
-        argument_strategy = await self._resolve_argument_strategy(
-            cron_task.argument_generate_strategy,
-            asdict(cron_task)
-        )
-        # resolve worker choose strategy
-        worker_choose_strategy: entities.WorkerStrategy = await self._resolve_worker_choose_strategy(
-            cron_task.worker_choose_strategy,
-            asdict(cron_task)
-        )
-        worker: entities.WorkerUUID | None = await self._choose_worker_from_worker_choose_strategy(
-            cron_task,
-            worker_choose_strategy
+    async def _assign_tasks(self, tasks: List[entities.Task], reserved: bool = False):
+        """
+        dispatch scheduled tasks to their workers in batch and mark dispatched tasks as queued,
+        reserved means pending slots were taken under worker lock and are given back for failed dispatches
+        """
+        funcs: Dict[entities.FuncUUID, entities.Func] = {}
+        dispatches: List[interface.FunTaskDispatch] = []
+        for task in tasks:
+            assert task.worker_uuid is not None, ValueError(
+                'worker uuid cannot be None'
+            )
+            if isinstance(task.func, entities.Func):
+                func = task.func
+            elif task.func in funcs:
+                func = funcs[task.func]
+            else:
+                func = funcs[task.func] = await self.repository.get_function_from_uuid(func_uuid=task.func)
+            dispatches.append(interface.FunTaskDispatch(
+                worker_uuid=task.worker_uuid,
+                func_task=func.func,
+                dependencies=func.dependencies,
+                change_status=task.result_as_state,
+                timeout=task.timeout,
+                argument=task.argument
+            ))
+        tasks_uuid_in_manager = await self.funtask_manager_rpc.dispatch_fun_tasks(dispatches)
+        dispatched = {
+            task.uuid: task_uuid_in_manager
+            for task, task_uuid_in_manager in zip(tasks, tasks_uuid_in_manager) if task_uuid_in_manager is not None
+        }
+        for task, task_uuid_in_manager in zip(tasks, tasks_uuid_in_manager):
+            worker_uuid = cast(entities.WorkerUUID, task.worker_uuid)
+            if task_uuid_in_manager is not None and not reserved:
+                self.worker_load_table.add_pending(worker_uuid)
+            elif task_uuid_in_manager is None and reserved:
+                self.worker_load_table.release_pending(worker_uuid)
+        if len(dispatched) != len(tasks):
+            logger.warning("{failed} of {total} tasks failed to dispatch", failed=len(tasks) - len(dispatched),
+                           total=len(tasks))
+        await self.repository.update_tasks({
+            task_uuid: {'uuid_in_manager': task_uuid_in_manager}
+            for task_uuid, task_uuid_in_manager in dispatched.items()
+        })
+        # status reported by worker after dispatch already passed queued and must not be overwritten
+        await self.repository.update_tasks(
+            {task_uuid: {'status': entities.TaskStatus.QUEUED} for task_uuid in dispatched},
+            only_status=[entities.TaskStatus.SCHEDULED, entities.TaskStatus.UNSCHEDULED]
         )
-        if worker is None:
+
+    async def _create_cron_sub_task(self, task_uuid: entities.CronTaskUUID):
+        """
+        fire of a cron task, fires of the same tick are batched and materialized by the first of them,
+        a failed batch is logged with every cron task of it
+        """
+        self._tick_fires.append(task_uuid)
+        if len(self._tick_fires) > 1:
             return
-            # lock worker and check queue status
-        async with self.lock.lock(worker):
-            queue_strategy = await self._resolve_task_queue_strategy(
-                cron_task.task_queue_strategy,
-                asdict(cron_task)
+        # yield once so other fires of this tick join the batch
+        await asyncio.sleep(0)
+        task_uuids, self._tick_fires = self._tick_fires, []
+        # fires see current cached cron task, removed or disabled ones do nothing
+        cron_tasks = [self.task_map.get(task_uuid) for task_uuid in task_uuids]
+        try:
+            await self._create_cron_sub_tasks([
+                cron_task for cron_task in cron_tasks if cron_task is not None and not cron_task.disabled
+            ])
+        except Exception as e:
+            # cron only sees the fire of first task, others of the batch returned already
+            logger.opt(exception=e).error(
+                "fires of {n} cron tasks failed: {task_uuids}",
+                n=len(task_uuids),
+                task_uuids=task_uuids
+            )
+
+    async def _create_cron_sub_tasks(self, cron_tasks: List[entities.CronTask]):
+        """
+        materialize fires of a tick, strategies are resolved per fire, then new tasks are inserted
+        in bulk and dispatched with one batch per manager node
+        """
+        new_tasks: List[entities.Task] = []
+        # cron task, worker and resolved argument strategy of fires which got a worker
+        chosen: List[Tuple[entities.CronTask, entities.WorkerUUID, entities.ArgumentStrategy]] = []
+        contexts: Dict[entities.CronTaskUUID, _FireContext] = {}
+        # load of workers seen by load aware strategies, includes fires of this batch
+        worker_loads: Dict[entities.WorkerUUID, int | None] = {}
+        for cron_task in cron_tasks:
+            start = time.perf_counter()
+            context = contexts[cron_task.uuid] = _FireContext(cron_task)
+            # resolve udf strategy
+            argument_strategy = await self._resolve_argument_strategy(
+                cron_task.argument_generate_strategy,
+                context
             )
-            # generate task write to db
-            new_task_uuid = await self._generate_task_from_argument_strategy(
-                cron_task,
-                argument_strategy
+            # resolve worker choose strategy
+            worker_choose_strategy: entities.WorkerStrategy = await self._resolve_worker_choose_strategy(
+                cron_task.worker_choose_strategy,
+                context
             )
-            # is None means skip or drop task, no need to assign
-            if new_task_uuid is None:
-                return
-            task_queue_size = await self.funtask_manager_rpc.get_task_queue_size(worker)
-            if task_queue_size > cron_task.task_queue_strategy.max_size:
-                await self.assign_task(new_task_uuid)
-            else:
+            worker = await self._choose_worker_from_worker_choose_strategy(worker_choose_strategy, worker_loads)
+            self.task_costs.observe_udf(cron_task.uuid, time.perf_counter() - start)
+            if worker is None:
+                new_tasks.append(_new_sub_task(
+                    cron_task,
+                    entities.TaskStatus.SKIP,
+                    result=f"no available worker for {worker_choose_strategy.strategy}"
+                ))
+                continue
+            chosen.append((cron_task, worker, argument_strategy))
+
+        # lock workers in order and check queue status, accepted tasks take pending slots of their workers
+        # so locks are released before the insert and the dispatch round trip
+        start = time.perf_counter()
+        to_assign: List[entities.Task] = []
+        async with AsyncExitStack() as stack:
+            for worker in sorted(set(worker for _, worker, _ in chosen)):
+                await stack.enter_async_context(self.lock.lock(worker))
+            queue_sizes: Dict[entities.WorkerUUID, int] = {}
+            for cron_task, worker, argument_strategy in chosen:
+                queue_strategy = await self._resolve_task_queue_strategy(
+                    cron_task.task_queue_strategy,
+                    contexts[cron_task.uuid]
+                )
+                new_task = await self._generate_task_from_argument_strategy(
+                    cron_task,
+                    argument_strategy
+                )
+                # is None means drop task
+                if new_task is None:
+                    continue
+                new_tasks.append(new_task)
+                # skip or error task, no need to assign
+                if new_task.status is not entities.TaskStatus.SCHEDULED:
+                    continue
+                new_task.worker_uuid = worker
+                if worker not in queue_sizes:
+                    load = self.worker_load_table.get(worker)
+                    queue_sizes[worker] = load.queued if load is not None else \
+                        await self.funtask_manager_rpc.get_task_queue_size(worker)
+                if queue_sizes[worker] < queue_strategy.max_size:
+                    to_assign.append(new_task)
+                    queue_sizes[worker] += 1
+                    continue
                 match queue_strategy.full_strategy:
                     case entities.QueueFullStrategy.DROP:
                         ...
                     case entities.QueueFullStrategy.SKIP:
-                        await self.repository.change_task_status(
-                            task_uuid=new_task_uuid,
-                            status=entities.TaskStatus.SKIP
-                        )
+                        new_task.status = entities.TaskStatus.SKIP
                     case entities.QueueFullStrategy.SEIZE:
-                        await self.assign_task(new_task_uuid)
+                        to_assign.append(new_task)
+                        queue_sizes[worker] += 1
                     case _:
                         raise NotImplementedError(
                             f"not implemented strategy {queue_strategy.full_strategy}")
+            for task in to_assign:
+                self.worker_load_table.add_pending(cast(entities.WorkerUUID, task.worker_uuid))
+        if new_tasks:
+            await self.repository.add_tasks(new_tasks)
+        if to_assign:
+            await self._assign_tasks(to_assign, reserved=True)
+        dispatch_cost = (time.perf_counter() - start) / max(len(cron_tasks), 1)
+        for cron_task in cron_tasks:
+            self.task_costs.observe_dispatch(cron_task.uuid, dispatch_cost)
+
+    async def get_node_load(self) -> interface.SchedulerNodeLoad:
+        return interface.SchedulerNodeLoad(
+            task_loads={
+                task_uuid: 0. if cron_task.disabled else self.task_costs.load(cron_task)
+                for task_uuid, cron_task in self.task_map.items()
+            },
+            capacity=self.node_capacity
+        )
 
     async def assign_cron_task(self, task_uuid: entities.CronTaskUUID):
         cron_task = await self.repository.get_cron_task_from_uuid(task_uuid)
+        # disabled ones are cached too, so they are scheduled once enabled
+        self.task_map[task_uuid] = cron_task
         if cron_task.disabled:
             return
+        await self._schedule_cron_task(cron_task)
+
+    async def _schedule_cron_task(self, cron_task: entities.CronTask):
         for time_point in cron_task.timepoints:
+            offset = _spread_offset(cron_task, time_point, self.spread_window)
             match time_point.unit:
                 case entities.TimeUnit.WEEK:
                     await self.cron.every_n_weeks(
@@ -397,7 +721,8 @@ class WorkerScheduler(interface.WorkerScheduler):
                         time_point.n,
                         self._create_cron_sub_task,
                         time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
                 case entities.TimeUnit.DAY:
                     await self.cron.every_n_days(
@@ -405,7 +730,8 @@ class WorkerScheduler(interface.WorkerScheduler):
                         time_point.n,
                         self._create_cron_sub_task,
                         time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
                 case entities.TimeUnit.HOUR:
                     await self.cron.every_n_hours(
@@ -413,7 +739,8 @@ class WorkerScheduler(interface.WorkerScheduler):
                         time_point.n,
                         self._create_cron_sub_task,
                         time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
                 case entities.TimeUnit.MINUTE:
                     await self.cron.every_n_minutes(
@@ -421,7 +748,8 @@ class WorkerScheduler(interface.WorkerScheduler):
                         time_point.n,
                         self._create_cron_sub_task,
                         time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
                 case entities.TimeUnit.SECOND:
                     await self.cron.every_n_seconds(
@@ -429,15 +757,16 @@ class WorkerScheduler(interface.WorkerScheduler):
                         time_point.n,
                         self._create_cron_sub_task,
                         time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
                 case entities.TimeUnit.MILLISECOND:
                     await self.cron.every_n_millisecond(
                         _task_with_point2name(cron_task, time_point),
                         time_point.n,
                         self._create_cron_sub_task,
-                        time_point.at,
-                        cron_task
+                        cron_task.uuid,
+                        offset=offset
                     )
 
     async def get_all_cron_task(self) -> List[entities.CronTaskUUID]:
@@ -445,19 +774,64 @@ class WorkerScheduler(interface.WorkerScheduler):
         return list(set(_task_from_name(task) for task in tasks))
 
 
+_NodeTasks = Dict[entities.SchedulerNode, List[entities.CronTaskUUID]]
+_R = TypeVar('_R')
+
+# failover wall time buckets from 1ms to ~33s
+_FAILOVER_BOUNDS = exponential_bounds(.001, 2, 16)
+
+
 class LeaderScheduler(interface.LeaderScheduler):
     @inject
     def __init__(
             self,
             leader_control: interface.LeaderSchedulerControl,
             worker_scheduler_rpc: interface.LeaderSchedulerRPC = Provide['scheduler.worker_scheduler_rpc'],
-            repository: interface.Repository = Provide['repository']
+            repository: interface.Repository = Provide['repository'],
+            placement: PlacementMode = PlacementMode.HASH,
+            node_rpc_timeout: timedelta = timedelta(seconds=3)
     ):
         self.leader_control = leader_control
         self.worker_scheduler_rpc: interface.LeaderSchedulerRPC = worker_scheduler_rpc
         self.nodes: List[entities.SchedulerNode] | None = None
         self.node_responsible_tasks_dict = None
         self.repository = repository
+        self.placement = placement
+        # load reported by nodes at last cost based rebalance
+        self.node_loads: Dict[entities.SchedulerNode, interface.SchedulerNodeLoad] = {}
+        # deadline of each rpc to a scheduler node
+        self.node_rpc_timeout = node_rpc_timeout.total_seconds()
+        # wall time of scheduler_node_change, from listing tasks of nodes until orphans are reassigned
+        self.failover_time = Histogram(_FAILOVER_BOUNDS)
+        # tasks on no node after failed assigns, placed again on next rebalance
+        self._orphans: Set[entities.CronTaskUUID] = set()
+
+    def get_failover_stats(self) -> Dict[str, float]:
+        """
+        failover wall time statistics in seconds
+        """
+        return self.failover_time.snapshot()
+
+    async def _fan_out(
+            self,
+            nodes: Iterable[entities.SchedulerNode],
+            call: Callable[[entities.SchedulerNode], Awaitable[_R]]
+    ) -> Dict[entities.SchedulerNode, _R]:
+        """
+        call nodes concurrently with per node deadline, nodes failed or timed out are left out of result
+        """
+        nodes = list(nodes)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(call(node), self.node_rpc_timeout) for node in nodes),
+            return_exceptions=True
+        )
+        succeeded: Dict[entities.SchedulerNode, _R] = {}
+        for node, result in zip(nodes, results):
+            if isinstance(result, BaseException):
+                logger.opt(exception=result).warning("rpc to scheduler node {node} failed", node=node.uuid)
+                continue
+            succeeded[node] = result
+        return succeeded
 
     async def _load_dependencies_if_not_loaded(self):
         if self.nodes is None:
@@ -469,48 +843,237 @@ class LeaderScheduler(interface.LeaderScheduler):
             self,
             nodes: List[entities.SchedulerNode]
     ) -> Dict[entities.SchedulerNode, List[entities.CronTaskUUID]]:
-        return {
-            node: await self.worker_scheduler_rpc.get_node_task_list(node) for node in nodes
-        }
+        """
+        task lists of nodes answered in time
+        """
+        return await self._fan_out(nodes, self.worker_scheduler_rpc.get_node_task_list)
+
+    @staticmethod
+    def _owner(
+            task_uuid: entities.CronTaskUUID,
+            nodes: Dict[entities.SchedulerNodeUUID, entities.SchedulerNode]
+    ) -> entities.SchedulerNode:
+        return nodes[cast(entities.SchedulerNodeUUID, rendezvous_choose(task_uuid, list(nodes)))]
 
     async def scheduler_node_change(self, scheduler_nodes: List[entities.SchedulerNode]):
-        current_node_responsible_tasks_dict = await self._get_all_node_responsible_tasks(scheduler_nodes)
-        all_tasks = set(task.uuid for task in await self.repository.get_all_cron_task())
+        start = time.perf_counter()
+        all_tasks, current_node_responsible_tasks_dict = await asyncio.gather(
+            self.repository.get_all_cron_task(),
+            self._get_all_node_responsible_tasks(scheduler_nodes)
+        )
+        answered = list(current_node_responsible_tasks_dict)
+        # nodes not answering in time may still run their tasks, keep last known ones to not schedule them twice
+        for node in scheduler_nodes:
+            if node not in current_node_responsible_tasks_dict and self.node_responsible_tasks_dict:
+                current_node_responsible_tasks_dict[node] = self.node_responsible_tasks_dict.get(node, [])
         covered_task = set(
             sum(current_node_responsible_tasks_dict.values(), []))
-        not_assigned_task_uuids = all_tasks - covered_task
-        # give down node's task to other
-        for task_uuid in not_assigned_task_uuids:
-            await self.worker_scheduler_rpc.assign_task_to_node(
-                random.choice(scheduler_nodes),
-                task_uuid
+        not_assigned_task_uuids = set(task.uuid for task in all_tasks) - covered_task
+        # give down node's task to its owner among answered nodes, so next rebalance does not move it again,
+        # tasks of failed assigns are placed once more among nodes which took theirs
+        targets = answered
+        while not_assigned_task_uuids and targets:
+            nodes = {node.uuid: node for node in targets}
+            assigns: _NodeTasks = defaultdict(list)
+            for task_uuid in not_assigned_task_uuids:
+                assigns[self._owner(task_uuid, nodes)].append(task_uuid)
+            assigned = await self._fan_out(
+                assigns,
+                lambda n: self.worker_scheduler_rpc.assign_tasks_to_node(n, assigns[n])
+            )
+            for node in assigned:
+                current_node_responsible_tasks_dict[node] = current_node_responsible_tasks_dict[node] + assigns[node]
+                not_assigned_task_uuids.difference_update(assigns[node])
+            targets = list(assigned) if len(assigned) < len(assigns) else []
+        if not_assigned_task_uuids:
+            logger.error(
+                "{n} cron tasks left unassigned after scheduler node change", n=len(not_assigned_task_uuids)
             )
+        self._orphans = not_assigned_task_uuids
+        self.nodes = scheduler_nodes
         self.node_responsible_tasks_dict = current_node_responsible_tasks_dict
+        failover_time = time.perf_counter() - start
+        self.failover_time.observe(failover_time)
+        logger.info(
+            "scheduler node change handled in {failover_time:.3f}s, {answered}/{nodes} nodes answered",
+            failover_time=failover_time,
+            answered=len(answered),
+            nodes=len(scheduler_nodes)
+        )
+
+    def _hash_moves(self) -> Tuple[_NodeTasks, _NodeTasks]:
+        """
+        move tasks whose rendezvous hash owner is not their current node
+        """
+        assert self.nodes is not None and self.node_responsible_tasks_dict is not None
+        nodes = {node.uuid: node for node in self.nodes}
+        removes: _NodeTasks = defaultdict(list)
+        assigns: _NodeTasks = defaultdict(list)
+        for node, tasks in self.node_responsible_tasks_dict.items():
+            for task_uuid in tasks:
+                owner = self._owner(task_uuid, nodes)
+                if owner != node:
+                    removes[node].append(task_uuid)
+                    assigns[owner].append(task_uuid)
+        return removes, assigns
+
+    async def _cost_moves(self) -> Tuple[_NodeTasks, _NodeTasks]:
+        """
+        bin pack tasks weighted by their measured load into node capacities
+        """
+        assert self.nodes is not None and self.node_responsible_tasks_dict is not None
+        # nodes failed to report are left out of placement, their tasks stay
+        self.node_loads = await self._fan_out(self.nodes, self.worker_scheduler_rpc.get_node_load)
+        for node, node_load in self.node_loads.items():
+            logger.debug("scheduler node {node} utilization {utilization:.2f}", node=node.uuid,
+                         utilization=node_load.utilization)
+        # nodes report what they actually schedule, responsible dict only covers nodes gone since
+        placement = {
+            node: task_uuids for node, task_uuids in self.node_responsible_tasks_dict.items()
+            if node not in self.nodes
+        }
+        weights: Dict[entities.CronTaskUUID, float] = {}
+        for node, node_load in self.node_loads.items():
+            placement[node] = list(node_load.task_loads)
+            weights.update(node_load.task_loads)
+        return bin_pack(
+            placement,
+            weights,
+            {node: node_load.capacity for node, node_load in self.node_loads.items()}
+        )
 
     async def rebalance(self, rebalanced_date: datetime):
+        """
+        move only tasks whose placement changed, cost scales with moved tasks, placement is
+        rendezvous hash or cost based bin packing by placement mode
+        """
         if self.nodes is None or self.node_responsible_tasks_dict is None:
             await self._load_dependencies_if_not_loaded()
         assert self.nodes is not None and self.node_responsible_tasks_dict is not None, ValueError(
             'internal error for nodes or responsible dict should not be none'
         )
-        for node, tasks in self.node_responsible_tasks_dict.items():
-            for task_uuid in tasks:
-                await self.worker_scheduler_rpc.remove_task_from_node(node, task_uuid, rebalanced_date)
-                await self.worker_scheduler_rpc.assign_task_to_node(
-                    random.choice(self.nodes),
-                    task_uuid,
-                    rebalanced_date
-                )
+        if not self.nodes:
+            return
+        if self._orphans:
+            await self._assign_orphans()
+        if self.placement is PlacementMode.COST:
+            removes, assigns = await self._cost_moves()
+        else:
+            removes, assigns = self._hash_moves()
+        if not assigns:
+            return
+        removed = await self._fan_out(
+            removes,
+            lambda n: self.worker_scheduler_rpc.remove_tasks_from_node(n, removes[n], rebalanced_date)
+        )
+        kept = set()
+        for node, task_uuids in removes.items():
+            if node not in removed:
+                # node may still run them, move them next time
+                kept.update(task_uuids)
+                continue
+            moved = set(task_uuids)
+            self.node_responsible_tasks_dict[node] = [
+                task_uuid for task_uuid in self.node_responsible_tasks_dict[node] if task_uuid not in moved
+            ]
+        assigns = {
+            node: [task_uuid for task_uuid in task_uuids if task_uuid not in kept]
+            for node, task_uuids in assigns.items()
+        }
+        assigned = await self._fan_out(
+            (node for node, task_uuids in assigns.items() if task_uuids),
+            lambda n: self.worker_scheduler_rpc.assign_tasks_to_node(n, assigns[n], rebalanced_date)
+        )
+        for node in assigned:
+            self.node_responsible_tasks_dict[node] = self.node_responsible_tasks_dict.get(node, []) + assigns[node]
+        # tasks of failed assigns go back to nodes they were removed from
+        sources = {task_uuid: node for node in removed for task_uuid in removes[node]}
+        returns: _NodeTasks = defaultdict(list)
+        for node, task_uuids in assigns.items():
+            if node in assigned:
+                continue
+            for task_uuid in task_uuids:
+                if task_uuid in sources:
+                    returns[sources[task_uuid]].append(task_uuid)
+                else:
+                    self._orphans.add(task_uuid)
+        returned = await self._fan_out(
+            returns,
+            lambda n: self.worker_scheduler_rpc.assign_tasks_to_node(n, returns[n], rebalanced_date)
+        )
+        for node, task_uuids in returns.items():
+            if node in returned:
+                self.node_responsible_tasks_dict[node] = self.node_responsible_tasks_dict[node] + task_uuids
+            else:
+                self._orphans.update(task_uuids)
+        if self._orphans:
+            logger.warning("{n} cron tasks on no scheduler node, retried on next rebalance", n=len(self._orphans))
+        logger.info(
+            "rebalance moved {moved} cron tasks between {nodes} nodes",
+            moved=sum(len(task_uuids) for task_uuids in assigns.values()),
+            nodes=len(set(removes) | set(assigns))
+        )
+
+    async def _assign_orphans(self):
+        assert self.nodes is not None and self.node_responsible_tasks_dict is not None
+        nodes = {node.uuid: node for node in self.nodes}
+        assigns: _NodeTasks = defaultdict(list)
+        for task_uuid in self._orphans:
+            assigns[self._owner(task_uuid, nodes)].append(task_uuid)
+        assigned = await self._fan_out(
+            assigns,
+            lambda n: self.worker_scheduler_rpc.assign_tasks_to_node(n, assigns[n])
+        )
+        for node in assigned:
+            self.node_responsible_tasks_dict[node] = self.node_responsible_tasks_dict.get(node, []) + assigns[node]
+            self._orphans.difference_update(assigns[node])
+
+    async def cron_task_changed(self, task_uuid: entities.CronTaskUUID, version: int):
+        if self.nodes is None:
+            await self._load_dependencies_if_not_loaded()
+        assert self.nodes is not None, ValueError('internal error for nodes should not be none')
+        # responsible dict may be stale, nodes not holding the task ignore it,
+        # failed nodes pick the change up on their next refresh
+        await self._fan_out(
+            self.nodes,
+            lambda n: self.worker_scheduler_rpc.invalidate_task_on_node(n, task_uuid, version)
+        )
+
+    async def update_cron_task(self, task_uuid: entities.CronTaskUUID, value: Dict[str, Any]) -> int:
+        version = await self.repository.update_cron_task(task_uuid, value)
+        await self.cron_task_changed(task_uuid, version)
+        return version
 
 
 @dataclass
 class LeaderSchedulerConfig:
     rebalanced_frequency: timedelta
+    placement: PlacementMode = PlacementMode.HASH
+    node_rpc_timeout: timedelta = timedelta(seconds=3)
 
 
 @dataclass
 class WorkerSchedulerConfig:
-    ...
+    heart_beat_flush_interval: timedelta = timedelta(seconds=5)
+    worker_alive_timeout: timedelta = timedelta(seconds=15)
+    # spread fires of cron tasks in window by uuid hash to smooth load, seconds, 0 means disable
+    spread_window: float = 0.
+    # max loaded strategy UDFs kept in memory, 0 means load on every fire
+    udf_cache_size: int = 1024
+    # incremental reload of cached cron tasks, catches edits whose invalidation push was lost, None disables it
+    cron_task_refresh_interval: timedelta | None = timedelta(seconds=30)
+    # managers publish worker loads every interval, loads older than max age are asked on demand
+    worker_load_interval: timedelta = timedelta(seconds=1)
+    worker_load_max_age: timedelta = timedelta(seconds=5)
+    # workers added or changed elsewhere show up in tag index after at most sync interval
+    worker_tag_index_sync_interval: timedelta = timedelta(seconds=2)
+    worker_tag_index_refresh_interval: timedelta = timedelta(seconds=60)
+    # seconds per second of scheduling work this node takes under cost based placement
+    node_capacity: float = 1.
+    # statuses received but not processed yet, manager streams are paused while it is full
+    status_buffer_size: int = 1024
+    # wait before the status subscription is opened again after it fails or ends
+    status_resubscribe_interval: timedelta = timedelta(seconds=1)
 
 
 @dataclass
@@ -539,7 +1102,9 @@ class Scheduler:
         self.leader_scheduler = LeaderScheduler(
             leader_control=leader_control,
             worker_scheduler_rpc=leader_scheduler_rpc,
-            repository=repository
+            repository=repository,
+            placement=scheduler_config.leader_scheduler.placement,
+            node_rpc_timeout=scheduler_config.leader_scheduler.node_rpc_timeout
         )
         self.task_manager_rpc = manager_rpc
         self.worker_scheduler = WorkerScheduler(
@@ -547,32 +1112,86 @@ class Scheduler:
             repository=repository,
             cron=cron,
             argument_queue_factory=argument_queue_factory,
-            lock=lock
+            lock=lock,
+            worker_alive_timeout=scheduler_config.worker_scheduler.worker_alive_timeout,
+            spread_window=scheduler_config.worker_scheduler.spread_window,
+            udf_cache_size=scheduler_config.worker_scheduler.udf_cache_size,
+            worker_load_max_age=scheduler_config.worker_scheduler.worker_load_max_age,
+            node_capacity=scheduler_config.worker_scheduler.node_capacity
         )
 
     async def run(self):
         logger.info("scheduler started")
+        worker_load_watcher = asyncio.create_task(
+            self.worker_scheduler.watch_worker_loads(self.scheduler_config.worker_scheduler.worker_load_interval)
+        )
+        status_watcher = asyncio.create_task(self._process_statuses())
         leader_last_rebalanced_time = datetime.now()
-        while True:
-            leader = await self.leader_control.get_leader()
-            if leader is not None and leader.uuid == self.self_node.uuid:
-                # if is leader scheduler and worker schedulers need rebalance
-                if datetime.now() - leader_last_rebalanced_time > self.scheduler_config.leader_scheduler. \
-                        rebalanced_frequency:
-                    leader_last_rebalanced_time = datetime.now()
-                    await self.leader_scheduler.rebalance(
-                        leader_last_rebalanced_time +
-                        self.scheduler_config.leader_scheduler.rebalanced_frequency / 2
-                    )
-                # is worker scheduler
+        last_heart_beat_flush_time = datetime.now()
+        last_cron_task_refresh_time = datetime.now()
+        last_worker_tag_index_sync_time = datetime.now()
+        last_worker_tag_index_refresh_time = datetime.now()
+        try:
+            await self.worker_scheduler.refresh_worker_tag_index()
+            while True:
+                leader = await self.leader_control.get_leader()
+                if leader is not None and leader.uuid == self.self_node.uuid:
+                    # membership is cached by leader control, changes hand tasks of gone nodes over
+                    nodes = await self.leader_control.get_all_nodes()
+                    if set(nodes) != set(self.leader_scheduler.nodes or []):
+                        await self.leader_scheduler.scheduler_node_change(nodes)
+                    # if is leader scheduler and worker schedulers need rebalance
+                    if datetime.now() - leader_last_rebalanced_time > self.scheduler_config.leader_scheduler. \
+                            rebalanced_frequency:
+                        leader_last_rebalanced_time = datetime.now()
+                        await self.leader_scheduler.rebalance(
+                            leader_last_rebalanced_time +
+                            self.scheduler_config.leader_scheduler.rebalanced_frequency / 2
+                        )
                 else:
-                    status_report_iter = await self.task_manager_rpc.get_queued_status(0.01)
-                    i = 0
-                    async for status_report in status_report_iter:
-                        i += 1
-                        if status_report is None or i >= 1000:
-                            break
+                    await self.leader_control.elect_leader(self.self_node.uuid)
+                if datetime.now() - last_heart_beat_flush_time > self.scheduler_config.worker_scheduler. \
+                        heart_beat_flush_interval:
+                    last_heart_beat_flush_time = datetime.now()
+                    await self.worker_scheduler.flush_heart_beats()
+                cron_task_refresh_interval = self.scheduler_config.worker_scheduler.cron_task_refresh_interval
+                if cron_task_refresh_interval is not None and \
+                        datetime.now() - last_cron_task_refresh_time > cron_task_refresh_interval:
+                    last_cron_task_refresh_time = datetime.now()
+                    await self.worker_scheduler.refresh_cron_tasks()
+                if datetime.now() - last_worker_tag_index_refresh_time > self.scheduler_config.worker_scheduler. \
+                        worker_tag_index_refresh_interval:
+                    last_worker_tag_index_refresh_time = last_worker_tag_index_sync_time = datetime.now()
+                    await self.worker_scheduler.refresh_worker_tag_index()
+                elif datetime.now() - last_worker_tag_index_sync_time > self.scheduler_config.worker_scheduler. \
+                        worker_tag_index_sync_interval:
+                    last_worker_tag_index_sync_time = datetime.now()
+                    await self.worker_scheduler.sync_worker_tag_index()
+                await asyncio.sleep(.1)
+        finally:
+            worker_load_watcher.cancel()
+            status_watcher.cancel()
+
+    async def _process_statuses(self):
+        """
+        process statuses as they arrive on the long-lived subscription to manager nodes,
+        the subscription is opened again after an interval if it fails or ends
+        """
+        worker_scheduler_config = self.scheduler_config.worker_scheduler
+        while True:
+            try:
+                async for status_report in self.task_manager_rpc.watch_status(
+                        worker_scheduler_config.status_buffer_size
+                ):
+                    try:
                         await self.worker_scheduler.process_new_status(status_report)
-            else:
-                await self.leader_control.elect_leader(self.self_node.uuid)
-            await asyncio.sleep(.1)
+                    except Exception as e:
+                        logger.opt(exception=e).error(
+                            "process status {status} of task {task_uuid} failed",
+                            status=status_report.status,
+                            task_uuid=status_report.task_uuid
+                        )
+                logger.warning("status subscription ended, resubscribing")
+            except Exception as e:
+                logger.opt(exception=e).error("status subscription failed, resubscribing")
+            await asyncio.sleep(worker_scheduler_config.status_resubscribe_interval.total_seconds())
@@ -0,0 +1,33 @@
+from typing import List, Set
+
+from funtask.core import entities
+from funtask.core.interface_and_types import StatusReport
+
+FINAL_TASK_STATUSES = (
+    entities.TaskStatus.SUCCESS, entities.TaskStatus.ERROR, entities.TaskStatus.SKIP, entities.TaskStatus.DIED
+)
+
+
+def compact_statuses(statuses: List[StatusReport]) -> List[StatusReport]:
+    """
+    drop statuses superseded by a later one of the same window, kept statuses stay in order:
+    an intermediate task status is dropped if a later status of the task follows, final task statuses
+    (with their results) and worker statuses are always kept, a heart beat is dropped if a later heart
+    beat or worker status of the worker follows, as both mark the worker alive
+    """
+    seen_tasks: Set[entities.TaskUUID] = set()
+    seen_workers: Set[entities.WorkerUUID] = set()
+    kept: List[StatusReport] = []
+    for status in reversed(statuses):
+        if isinstance(status.status, entities.TaskStatus):
+            if status.status not in FINAL_TASK_STATUSES and status.task_uuid in seen_tasks:
+                continue
+            seen_tasks.add(status.task_uuid)
+        else:
+            if status.status is None and status.worker_uuid in seen_workers:
+                continue
+            seen_workers.add(status.worker_uuid)
+        kept.append(status)
+    kept.reverse()
+    return kept
+
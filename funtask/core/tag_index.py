@@ -0,0 +1,110 @@
+from typing import Dict, Set, List, FrozenSet, Iterable
+
+from funtask.core import entities
+
+# tags joined by it in one item of worker tags must all match
+TAG_AND = '&'
+
+
+def parse_tag_expression(worker_tags: List[str]) -> List[FrozenSet[str]]:
+    """
+    worker tags are an OR of items, an item is an AND of tags joined by '&',
+    e.g. ['gpu&large', 'cpu'] means (gpu and large) or cpu
+    :return: clauses of tags, a worker matches if it has all tags of any clause
+    """
+    clauses = []
+    for item in worker_tags:
+        clause = frozenset(tag.strip() for tag in item.split(TAG_AND) if tag.strip())
+        if clause:
+            clauses.append(clause)
+    return clauses
+
+
+class WorkerTagIndex:
+    """
+    inverted index from tag to running workers, kept in memory by scheduler and
+    updated incrementally on worker add, remove, status and tag changes
+    """
+
+    def __init__(self):
+        self._tag2workers: Dict[str, Set[entities.WorkerUUID]] = {}
+        self._worker2tags: Dict[entities.WorkerUUID, FrozenSet[str]] = {}
+        self._worker_status: Dict[entities.WorkerUUID, entities.WorkerStatus] = {}
+        self.loaded = False
+
+    def __len__(self):
+        return len(self._worker2tags)
+
+    def __contains__(self, worker_uuid: entities.WorkerUUID) -> bool:
+        return worker_uuid in self._worker2tags
+
+    def _index(self, worker_uuid: entities.WorkerUUID, tags: Iterable[str]):
+        for tag in tags:
+            self._tag2workers.setdefault(tag, set()).add(worker_uuid)
+
+    def _unindex(self, worker_uuid: entities.WorkerUUID, tags: Iterable[str]):
+        for tag in tags:
+            workers = self._tag2workers.get(tag)
+            if workers is None:
+                continue
+            workers.discard(worker_uuid)
+            if not workers:
+                del self._tag2workers[tag]
+
+    def add_worker(self, worker: entities.Worker):
+        self.remove_worker(worker.uuid)
+        self._worker_status[worker.uuid] = worker.status
+        self._worker2tags[worker.uuid] = frozenset(worker.tags)
+        if worker.status is entities.WorkerStatus.RUNNING:
+            self._index(worker.uuid, worker.tags)
+
+    def remove_worker(self, worker_uuid: entities.WorkerUUID):
+        tags = self._worker2tags.pop(worker_uuid, None)
+        status = self._worker_status.pop(worker_uuid, None)
+        if tags is not None and status is entities.WorkerStatus.RUNNING:
+            self._unindex(worker_uuid, tags)
+
+    def set_status(self, worker_uuid: entities.WorkerUUID, status: entities.WorkerStatus):
+        """
+        only running workers are indexed, unknown workers are ignored
+        """
+        old_status = self._worker_status.get(worker_uuid)
+        if old_status is None or old_status is status:
+            return
+        self._worker_status[worker_uuid] = status
+        tags = self._worker2tags[worker_uuid]
+        if status is entities.WorkerStatus.RUNNING:
+            self._index(worker_uuid, tags)
+        elif old_status is entities.WorkerStatus.RUNNING:
+            self._unindex(worker_uuid, tags)
+
+    def set_tags(self, worker_uuid: entities.WorkerUUID, tags: List[str]):
+        old_tags = self._worker2tags.get(worker_uuid)
+        if old_tags is None:
+            return
+        new_tags = frozenset(tags)
+        self._worker2tags[worker_uuid] = new_tags
+        if self._worker_status[worker_uuid] is entities.WorkerStatus.RUNNING:
+            self._unindex(worker_uuid, old_tags - new_tags)
+            self._index(worker_uuid, new_tags - old_tags)
+
+    def match(self, worker_tags: List[str]) -> Set[entities.WorkerUUID]:
+        """
+        running workers matching tag expression, see parse_tag_expression
+        """
+        workers: Set[entities.WorkerUUID] = set()
+        for clause in parse_tag_expression(worker_tags):
+            # intersect from the rarest tag
+            tag_workers = sorted((self._tag2workers.get(tag, set()) for tag in clause), key=len)
+            if not tag_workers[0]:
+                continue
+            workers |= tag_workers[0].intersection(*tag_workers[1:])
+        return workers
+
+    def replace_all(self, workers: List[entities.Worker]):
+        self._tag2workers = {}
+        self._worker2tags = {}
+        self._worker_status = {}
+        for worker in workers:
+            self.add_worker(worker)
+        self.loaded = True
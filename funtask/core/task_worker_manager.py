@@ -1,11 +1,22 @@
+import time
 from uuid import uuid4 as uuid_generator
-from typing import List, TypeVar, Tuple, cast
+from typing import List, TypeVar, Tuple, cast, Dict, Set
+
+from loguru import logger
 
 from funtask.core import entities
 from funtask.core import interface_and_types as interface
+from funtask.core.status_compaction import FINAL_TASK_STATUSES, compact_statuses
+from funtask.utils.metrics import SlidingWindowCounter
 
 _T = TypeVar('_T')
 
+# seconds of finished tasks averaged into throughput
+_THROUGHPUT_WINDOW = 10
+
+# statuses without task after which a worker runs nothing anymore, worker stop signal is reported as ERROR
+_WORKER_GONE_STATUSES = (entities.TaskStatus.ERROR, entities.WorkerStatus.STOPPED, entities.WorkerStatus.DIED)
+
 
 def _split_task_and_dependencies(
         state_generator: interface.TaskInput
@@ -59,10 +70,17 @@ class FunTaskManager(interface.FunTaskManager):
             *,
             worker_manager: interface.WorkerManager,
             # worker_uuid, task_uuid, status, content
-            task_status_queue: interface.Queue[interface.StatusQueueMessage]
+            task_status_queue: interface.Queue[interface.StatusQueueMessage],
+            status_compaction_window: float | None = None
     ):
         self.worker_manager = worker_manager
         self.task_status_queue = task_status_queue
+        # seconds status frames are held at least to collapse superseded statuses, None sends all statuses
+        self.status_compaction_window = status_compaction_window
+        # dispatched tasks of each worker without final status yet
+        self._unfinished_tasks: Dict[entities.WorkerUUID, Set[entities.TaskUUID]] = {}
+        # finished tasks of each worker over recent seconds
+        self._finished_counters: Dict[entities.WorkerUUID, SlidingWindowCounter] = {}
 
     async def increase_workers(
             self,
@@ -84,6 +102,7 @@ class FunTaskManager(interface.FunTaskManager):
             *args,
             **kwargs
         )
+        self._unfinished_tasks.setdefault(uuid, set())
         return uuid
 
     async def dispatch_fun_task(
@@ -97,19 +116,54 @@ class FunTaskManager(interface.FunTaskManager):
     ) -> entities.TaskUUID:
         assert func_task, Exception(f"func_task can't be {func_task}")
         task_queue = await self.worker_manager.get_task_queue(worker_uuid)
-        task_uuid = cast(entities.TaskUUID, uuid_generator())
+        task_uuid = cast(entities.TaskUUID, str(uuid_generator()))
         await task_queue.put(
             interface.TaskQueueMessage(
                 _warp_to_trans_task(task_uuid, func_task, change_status),
                 interface.InnerTaskMeta(arguments, kwargs, timeout)
             )
         )
-        await self.task_status_queue.put(
-            interface.StatusQueueMessage(
-                worker_uuid, task_uuid, entities.TaskStatus.QUEUED, None)
-        )
+        self._unfinished_tasks.setdefault(worker_uuid, set()).add(task_uuid)
         return task_uuid
 
+    async def _dispatch_to_worker(
+            self,
+            worker_uuid: entities.WorkerUUID,
+            dispatches: List[interface.TaskDispatch]
+    ) -> List[entities.TaskUUID]:
+        task_queue = await self.worker_manager.get_task_queue(worker_uuid)
+        tasks_uuid = [cast(entities.TaskUUID, str(uuid_generator())) for _ in dispatches]
+        await task_queue.put_batch([
+            interface.TaskQueueMessage(
+                _warp_to_trans_task(task_uuid, dispatch.func_task, dispatch.change_status),
+                interface.InnerTaskMeta(dispatch.arguments, dispatch.kw_arguments, dispatch.timeout)
+            )
+            for task_uuid, dispatch in zip(tasks_uuid, dispatches)
+        ])
+        self._unfinished_tasks.setdefault(worker_uuid, set()).update(tasks_uuid)
+        return tasks_uuid
+
+    async def dispatch_fun_tasks(
+            self,
+            dispatches: List[interface.TaskDispatch]
+    ) -> List[entities.TaskUUID | None]:
+        worker_dispatches: Dict[entities.WorkerUUID, List[Tuple[int, interface.TaskDispatch]]] = {}
+        for idx, dispatch in enumerate(dispatches):
+            worker_dispatches.setdefault(dispatch.worker_uuid, []).append((idx, dispatch))
+        results: List[entities.TaskUUID | None] = [None] * len(dispatches)
+        for worker_uuid, indexed_dispatches in worker_dispatches.items():
+            try:
+                tasks_uuid = await self._dispatch_to_worker(
+                    worker_uuid,
+                    [dispatch for _, dispatch in indexed_dispatches]
+                )
+            except Exception as e:
+                logger.opt(exception=e).error("dispatch tasks to worker {worker} failed", worker=worker_uuid)
+                continue
+            for (idx, _), task_uuid in zip(indexed_dispatches, tasks_uuid):
+                results[idx] = task_uuid
+        return results
+
     async def generate_worker_state(
             self,
             worker_uuid: entities.WorkerUUID,
@@ -143,12 +197,28 @@ class FunTaskManager(interface.FunTaskManager):
         worker_control_queue = await self.worker_manager.get_control_queue(worker_uuid)
         await self.worker_manager.stop_worker(worker_uuid)
         await worker_control_queue.put(interface.ControlQueueMessage(worker_uuid, interface.TaskControl.KILL))
+        self._forget_worker(worker_uuid)
 
     async def kill_worker(
             self,
             worker_uuid: entities.WorkerUUID
     ):
         await self.worker_manager.kill_worker(worker_uuid)
+        self._forget_worker(worker_uuid)
+        # killed worker reports nothing itself, stopped ones report the stop signal
+        await self.task_status_queue.put(interface.StatusQueueMessage(
+            worker_uuid,
+            None,
+            entities.WorkerStatus.DIED,
+            None
+        ))
+
+    def _forget_worker(self, worker_uuid: entities.WorkerUUID):
+        """
+        drop load counting of a gone worker, its unfinished tasks never report a final status
+        """
+        self._unfinished_tasks.pop(worker_uuid, None)
+        self._finished_counters.pop(worker_uuid, None)
 
     async def get_queued_status(
             self,
@@ -157,6 +227,18 @@ class FunTaskManager(interface.FunTaskManager):
         res = await self.task_status_queue.get(timeout)
         if res is None:
             return None
+        return self._take_status(res)
+
+    def _take_status(self, res: interface.StatusQueueMessage) -> interface.StatusReport:
+        if res.task_uuid is None and res.status in _WORKER_GONE_STATUSES:
+            self._forget_worker(res.worker_uuid)
+        # late statuses of forgotten workers are not counted
+        elif res.status in FINAL_TASK_STATUSES and res.worker_uuid in self._unfinished_tasks:
+            self._unfinished_tasks[res.worker_uuid].discard(res.task_uuid)
+            counter = self._finished_counters.get(res.worker_uuid)
+            if counter is None:
+                counter = self._finished_counters[res.worker_uuid] = SlidingWindowCounter(1., _THROUGHPUT_WINDOW)
+            counter.add(time.monotonic())
         return interface.StatusReport(
             res.worker_uuid,
             res.task_uuid,
@@ -164,3 +246,37 @@ class FunTaskManager(interface.FunTaskManager):
             res.content,
             res.create_timestamp
         )
+
+    async def get_queued_statuses(self, max_size: int, max_delay: float) -> List[interface.StatusReport]:
+        if self.status_compaction_window is not None:
+            max_delay = max(max_delay, self.status_compaction_window)
+        batch = await self.task_status_queue.get_batch(max_size)
+        deadline = time.monotonic() + max_delay
+        while len(batch) < max_size and (remaining := deadline - time.monotonic()) > 0:
+            more = await self.task_status_queue.get_batch(max_size - len(batch), remaining)
+            if not more:
+                break
+            batch.extend(more)
+        statuses = [self._take_status(res) for res in batch]
+        if self.status_compaction_window is not None:
+            return compact_statuses(statuses)
+        return statuses
+
+    async def get_worker_load(
+            self,
+            worker_uuid: entities.WorkerUUID
+    ) -> interface.WorkerLoad:
+        task_queue = await self.worker_manager.get_task_queue(worker_uuid)
+        queued = await task_queue.qsize()
+        unfinished = len(self._unfinished_tasks.get(worker_uuid, ()))
+        counter = self._finished_counters.get(worker_uuid)
+        return interface.WorkerLoad(
+            queued=queued,
+            running=max(unfinished - queued, 0),
+            throughput=sum(counter.counts(time.monotonic())) / _THROUGHPUT_WINDOW if counter else 0.
+        )
+
+    async def get_workers_load_snapshot(self) -> Dict[entities.WorkerUUID, interface.WorkerLoad]:
+        return {
+            worker_uuid: await self.get_worker_load(worker_uuid) for worker_uuid in list(self._unfinished_tasks)
+        }
@@ -0,0 +1,45 @@
+from collections import OrderedDict
+from typing import Tuple, Any
+
+import dill
+
+from funtask.core import entities
+from funtask.utils.hashing import stable_hash
+
+
+class UDFCache:
+    """
+    least recently used cache of loaded UDFs keyed by func uuid and content hash,
+    so a UDF is only unpickled again after its content changed or it was evicted
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._udfs: OrderedDict[Tuple[entities.FuncUUID, int], Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._udfs)
+
+    def get(self, func: entities.Func) -> Any:
+        """
+        load UDF of func, 0 max size means no caching
+        """
+        key = (func.uuid, stable_hash(func.func))
+        udf = self._udfs.get(key)
+        if udf is not None:
+            self._udfs.move_to_end(key)
+            self.hits += 1
+            return udf
+        self.misses += 1
+        udf = dill.loads(func.func)
+        if self.max_size <= 0:
+            return udf
+        self._udfs[key] = udf
+        while len(self._udfs) > self.max_size:
+            self._udfs.popitem(last=False)
+        return udf
+
+    def clear(self):
+        self._udfs.clear()
@@ -0,0 +1,58 @@
+import time
+from typing import Dict
+
+from funtask.core import entities
+from funtask.core import interface_and_types as interface
+
+
+class WorkerLoadTable:
+    """
+    latest load snapshots of workers published by managers, placement and queue checks read here
+    instead of asking managers on every fire, snapshots older than max age are treated as unknown
+    """
+
+    def __init__(self, max_age: float = 5.):
+        self.max_age = max_age
+        self._loads: Dict[entities.WorkerUUID, interface.WorkerLoad] = {}
+        self._update_times: Dict[entities.WorkerUUID, float] = {}
+        # tasks dispatched since latest snapshot of worker
+        self._pending: Dict[entities.WorkerUUID, int] = {}
+
+    def update(self, loads: Dict[entities.WorkerUUID, interface.WorkerLoad], t: float | None = None):
+        t = time.monotonic() if t is None else t
+        for worker_uuid, load in loads.items():
+            self._loads[worker_uuid] = load
+            self._update_times[worker_uuid] = t
+            self._pending.pop(worker_uuid, None)
+
+    def add_pending(self, worker_uuid: entities.WorkerUUID, n: int = 1):
+        if worker_uuid in self._loads:
+            self._pending[worker_uuid] = self._pending.get(worker_uuid, 0) + n
+
+    def release_pending(self, worker_uuid: entities.WorkerUUID, n: int = 1):
+        """
+        give back pending slots of tasks that were never dispatched
+        """
+        pending = self._pending.get(worker_uuid, 0) - n
+        if pending > 0:
+            self._pending[worker_uuid] = pending
+        else:
+            self._pending.pop(worker_uuid, None)
+
+    def get(self, worker_uuid: entities.WorkerUUID, now: float | None = None) -> interface.WorkerLoad | None:
+        """
+        fresh load of worker with tasks dispatched after the snapshot counted as queued, None if unknown or stale
+        """
+        update_time = self._update_times.get(worker_uuid)
+        if update_time is None or (time.monotonic() if now is None else now) - update_time > self.max_age:
+            return None
+        load = self._loads[worker_uuid]
+        pending = self._pending.get(worker_uuid, 0)
+        if not pending:
+            return load
+        return interface.WorkerLoad(queued=load.queued + pending, running=load.running, throughput=load.throughput)
+
+    def forget(self, worker_uuid: entities.WorkerUUID):
+        self._loads.pop(worker_uuid, None)
+        self._update_times.pop(worker_uuid, None)
+        self._pending.pop(worker_uuid, None)
@@ -11,7 +11,15 @@ import betterproto
 
 
 class StatusReportWorkerStatus(betterproto.Enum):
+    """
+    worker values are prefixed, enum values share scope with task status values
+    """
+
     HEARTBEAT = 0
+    WORKER_RUNNING = 1
+    WORKER_STOPPING = 2
+    WORKER_STOPPED = 3
+    WORKER_DIED = 4
 
 
 class StatusReportTaskStatus(betterproto.Enum):
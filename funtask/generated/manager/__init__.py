@@ -4,10 +4,13 @@
 from dataclasses import dataclass
 from typing import (
     TYPE_CHECKING,
+    AsyncIterable,
     AsyncIterator,
     Dict,
+    Iterable,
     List,
     Optional,
+    Union,
 )
 
 import betterproto
@@ -18,6 +21,7 @@ from .. import (
     Args as _Args__,
     Empty as _Empty__,
     StatusReport as _StatusReport__,
+    StatusReportTaskStatus as _StatusReportTaskStatus__,
     Task as _Task__,
     Worker as _Worker__,
 )
@@ -64,7 +68,32 @@ class DispatchFunTaskRequest(betterproto.Message):
 
 @dataclass(eq=False, repr=False)
 class DispatchFunTaskResponse(betterproto.Message):
+    """
+    status of dispatched task, managers report no status for it until it
+    changes
+    """
+
+    task: "_Task__" = betterproto.message_field(1)
+    status: "_StatusReportTaskStatus__" = betterproto.enum_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class DispatchFunTasksRequest(betterproto.Message):
+    requests: List["DispatchFunTaskRequest"] = betterproto.message_field(1)
+
+
+@dataclass(eq=False, repr=False)
+class DispatchFunTaskResult(betterproto.Message):
+    """task is set if dispatched, otherwise error tells why"""
+
     task: "_Task__" = betterproto.message_field(1)
+    error: str = betterproto.string_field(2)
+    status: "_StatusReportTaskStatus__" = betterproto.enum_field(3)
+
+
+@dataclass(eq=False, repr=False)
+class DispatchFunTasksResponse(betterproto.Message):
+    results: List["DispatchFunTaskResult"] = betterproto.message_field(1)
 
 
 @dataclass(eq=False, repr=False)
@@ -88,6 +117,45 @@ class GetQueuedStatusResponse(betterproto.Message):
     status_report: "_StatusReport__" = betterproto.message_field(1)
 
 
+@dataclass(eq=False, repr=False)
+class GetQueuedStatusesRequest(betterproto.Message):
+    """
+    a batch is sent once it has max_batch statuses or max_delay seconds passed
+    since its first status
+    """
+
+    max_batch: int = betterproto.uint32_field(1)
+    max_delay: float = betterproto.float_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class GetQueuedStatusesResponse(betterproto.Message):
+    status_reports: List["_StatusReport__"] = betterproto.message_field(1)
+
+
+@dataclass(eq=False, repr=False)
+class GetWorkersLoadRequest(betterproto.Message):
+    workers_uuid: List[str] = betterproto.string_field(1)
+
+
+@dataclass(eq=False, repr=False)
+class WorkerLoad(betterproto.Message):
+    worker_uuid: str = betterproto.string_field(1)
+    queued: int = betterproto.uint32_field(2)
+    running: int = betterproto.uint32_field(3)
+    throughput: float = betterproto.float_field(4)
+
+
+@dataclass(eq=False, repr=False)
+class GetWorkersLoadResponse(betterproto.Message):
+    loads: List["WorkerLoad"] = betterproto.message_field(1)
+
+
+@dataclass(eq=False, repr=False)
+class WatchWorkersLoadRequest(betterproto.Message):
+    interval: float = betterproto.float_field(1)
+
+
 class TaskWorkerManagerStub(betterproto.ServiceStub):
     async def increase_workers(
         self,
@@ -140,6 +208,45 @@ class TaskWorkerManagerStub(betterproto.ServiceStub):
             metadata=metadata,
         )
 
+    async def dispatch_fun_tasks(
+        self,
+        dispatch_fun_tasks_request: "DispatchFunTasksRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "DispatchFunTasksResponse":
+        return await self._unary_unary(
+            "/manager.TaskWorkerManager/DispatchFunTasks",
+            dispatch_fun_tasks_request,
+            DispatchFunTasksResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
+    async def stream_dispatch_fun_tasks(
+        self,
+        dispatch_fun_tasks_request_iterator: Union[
+            AsyncIterable["DispatchFunTasksRequest"],
+            Iterable["DispatchFunTasksRequest"],
+        ],
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> AsyncIterator["DispatchFunTasksResponse"]:
+        async for response in self._stream_stream(
+            "/manager.TaskWorkerManager/StreamDispatchFunTasks",
+            dispatch_fun_tasks_request_iterator,
+            DispatchFunTasksRequest,
+            DispatchFunTasksResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        ):
+            yield response
+
     async def stop_task(
         self,
         stop_task_request: "StopTaskRequest",
@@ -209,6 +316,59 @@ class TaskWorkerManagerStub(betterproto.ServiceStub):
         ):
             yield response
 
+    async def get_queued_statuses(
+        self,
+        get_queued_statuses_request: "GetQueuedStatusesRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> AsyncIterator["GetQueuedStatusesResponse"]:
+        async for response in self._unary_stream(
+            "/manager.TaskWorkerManager/GetQueuedStatuses",
+            get_queued_statuses_request,
+            GetQueuedStatusesResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        ):
+            yield response
+
+    async def get_workers_load(
+        self,
+        get_workers_load_request: "GetWorkersLoadRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "GetWorkersLoadResponse":
+        return await self._unary_unary(
+            "/manager.TaskWorkerManager/GetWorkersLoad",
+            get_workers_load_request,
+            GetWorkersLoadResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
+    async def watch_workers_load(
+        self,
+        watch_workers_load_request: "WatchWorkersLoadRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> AsyncIterator["GetWorkersLoadResponse"]:
+        async for response in self._unary_stream(
+            "/manager.TaskWorkerManager/WatchWorkersLoad",
+            watch_workers_load_request,
+            GetWorkersLoadResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        ):
+            yield response
+
 
 class TaskWorkerManagerBase(ServiceBase):
     async def increase_workers(
@@ -226,6 +386,17 @@ class TaskWorkerManagerBase(ServiceBase):
     ) -> "DispatchFunTaskResponse":
         raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
 
+    async def dispatch_fun_tasks(
+        self, dispatch_fun_tasks_request: "DispatchFunTasksRequest"
+    ) -> "DispatchFunTasksResponse":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def stream_dispatch_fun_tasks(
+        self,
+        dispatch_fun_tasks_request_iterator: AsyncIterator["DispatchFunTasksRequest"],
+    ) -> AsyncIterator["DispatchFunTasksResponse"]:
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
     async def stop_task(self, stop_task_request: "StopTaskRequest") -> "_Empty__":
         raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
 
@@ -240,6 +411,21 @@ class TaskWorkerManagerBase(ServiceBase):
     ) -> AsyncIterator["GetQueuedStatusResponse"]:
         raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
 
+    async def get_queued_statuses(
+        self, get_queued_statuses_request: "GetQueuedStatusesRequest"
+    ) -> AsyncIterator["GetQueuedStatusesResponse"]:
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def get_workers_load(
+        self, get_workers_load_request: "GetWorkersLoadRequest"
+    ) -> "GetWorkersLoadResponse":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def watch_workers_load(
+        self, watch_workers_load_request: "WatchWorkersLoadRequest"
+    ) -> AsyncIterator["GetWorkersLoadResponse"]:
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
     async def __rpc_increase_workers(
         self,
         stream: "grpclib.server.Stream[IncreaseWorkersRequest, IncreaseWorkersResponse]",
@@ -264,6 +450,25 @@ class TaskWorkerManagerBase(ServiceBase):
         response = await self.dispatch_fun_task(request)
         await stream.send_message(response)
 
+    async def __rpc_dispatch_fun_tasks(
+        self,
+        stream: "grpclib.server.Stream[DispatchFunTasksRequest, DispatchFunTasksResponse]",
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.dispatch_fun_tasks(request)
+        await stream.send_message(response)
+
+    async def __rpc_stream_dispatch_fun_tasks(
+        self,
+        stream: "grpclib.server.Stream[DispatchFunTasksRequest, DispatchFunTasksResponse]",
+    ) -> None:
+        request = stream.__aiter__()
+        await self._call_rpc_handler_server_stream(
+            self.stream_dispatch_fun_tasks,
+            stream,
+            request,
+        )
+
     async def __rpc_stop_task(
         self, stream: "grpclib.server.Stream[StopTaskRequest, _Empty__]"
     ) -> None:
@@ -295,6 +500,36 @@ class TaskWorkerManagerBase(ServiceBase):
             request,
         )
 
+    async def __rpc_get_queued_statuses(
+        self,
+        stream: "grpclib.server.Stream[GetQueuedStatusesRequest, GetQueuedStatusesResponse]",
+    ) -> None:
+        request = await stream.recv_message()
+        await self._call_rpc_handler_server_stream(
+            self.get_queued_statuses,
+            stream,
+            request,
+        )
+
+    async def __rpc_get_workers_load(
+        self,
+        stream: "grpclib.server.Stream[GetWorkersLoadRequest, GetWorkersLoadResponse]",
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.get_workers_load(request)
+        await stream.send_message(response)
+
+    async def __rpc_watch_workers_load(
+        self,
+        stream: "grpclib.server.Stream[WatchWorkersLoadRequest, GetWorkersLoadResponse]",
+    ) -> None:
+        request = await stream.recv_message()
+        await self._call_rpc_handler_server_stream(
+            self.watch_workers_load,
+            stream,
+            request,
+        )
+
     def __mapping__(self) -> Dict[str, grpclib.const.Handler]:
         return {
             "/manager.TaskWorkerManager/IncreaseWorkers": grpclib.const.Handler(
@@ -315,6 +550,18 @@ class TaskWorkerManagerBase(ServiceBase):
                 DispatchFunTaskRequest,
                 DispatchFunTaskResponse,
             ),
+            "/manager.TaskWorkerManager/DispatchFunTasks": grpclib.const.Handler(
+                self.__rpc_dispatch_fun_tasks,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                DispatchFunTasksRequest,
+                DispatchFunTasksResponse,
+            ),
+            "/manager.TaskWorkerManager/StreamDispatchFunTasks": grpclib.const.Handler(
+                self.__rpc_stream_dispatch_fun_tasks,
+                grpclib.const.Cardinality.STREAM_STREAM,
+                DispatchFunTasksRequest,
+                DispatchFunTasksResponse,
+            ),
             "/manager.TaskWorkerManager/StopTask": grpclib.const.Handler(
                 self.__rpc_stop_task,
                 grpclib.const.Cardinality.UNARY_UNARY,
@@ -339,4 +586,22 @@ class TaskWorkerManagerBase(ServiceBase):
                 _Empty__,
                 GetQueuedStatusResponse,
             ),
+            "/manager.TaskWorkerManager/GetQueuedStatuses": grpclib.const.Handler(
+                self.__rpc_get_queued_statuses,
+                grpclib.const.Cardinality.UNARY_STREAM,
+                GetQueuedStatusesRequest,
+                GetQueuedStatusesResponse,
+            ),
+            "/manager.TaskWorkerManager/GetWorkersLoad": grpclib.const.Handler(
+                self.__rpc_get_workers_load,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                GetWorkersLoadRequest,
+                GetWorkersLoadResponse,
+            ),
+            "/manager.TaskWorkerManager/WatchWorkersLoad": grpclib.const.Handler(
+                self.__rpc_watch_workers_load,
+                grpclib.const.Cardinality.UNARY_STREAM,
+                WatchWorkersLoadRequest,
+                GetWorkersLoadResponse,
+            ),
         }
@@ -39,6 +39,36 @@ class RemoveTaskRequest(betterproto.Message):
     start_ms_timestamp: int = betterproto.uint64_field(2)
 
 
+@dataclass(eq=False, repr=False)
+class AssignTasksRequest(betterproto.Message):
+    cron_tasks_uuid: List[str] = betterproto.string_field(1)
+    start_ms_timestamp: int = betterproto.uint64_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class RemoveTasksRequest(betterproto.Message):
+    cron_tasks_uuid: List[str] = betterproto.string_field(1)
+    start_ms_timestamp: int = betterproto.uint64_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class CronTaskLoad(betterproto.Message):
+    cron_task_uuid: str = betterproto.string_field(1)
+    load: float = betterproto.double_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class GetNodeLoadResponse(betterproto.Message):
+    task_loads: List["CronTaskLoad"] = betterproto.message_field(1)
+    capacity: float = betterproto.double_field(2)
+
+
+@dataclass(eq=False, repr=False)
+class InvalidateTaskRequest(betterproto.Message):
+    cron_task_uuid: str = betterproto.string_field(1)
+    version: int = betterproto.uint64_field(2)
+
+
 class LeaderSchedulerStub(betterproto.ServiceStub):
     async def assign_task(
         self,
@@ -91,6 +121,74 @@ class LeaderSchedulerStub(betterproto.ServiceStub):
             metadata=metadata,
         )
 
+    async def invalidate_task(
+        self,
+        invalidate_task_request: "InvalidateTaskRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "_Empty__":
+        return await self._unary_unary(
+            "/scheduler.LeaderScheduler/InvalidateTask",
+            invalidate_task_request,
+            _Empty__,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
+    async def assign_tasks(
+        self,
+        assign_tasks_request: "AssignTasksRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "_Empty__":
+        return await self._unary_unary(
+            "/scheduler.LeaderScheduler/AssignTasks",
+            assign_tasks_request,
+            _Empty__,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
+    async def remove_tasks(
+        self,
+        remove_tasks_request: "RemoveTasksRequest",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "_Empty__":
+        return await self._unary_unary(
+            "/scheduler.LeaderScheduler/RemoveTasks",
+            remove_tasks_request,
+            _Empty__,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
+    async def get_node_load(
+        self,
+        empty: "_Empty__",
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional["Deadline"] = None,
+        metadata: Optional["MetadataLike"] = None
+    ) -> "GetNodeLoadResponse":
+        return await self._unary_unary(
+            "/scheduler.LeaderScheduler/GetNodeLoad",
+            empty,
+            GetNodeLoadResponse,
+            timeout=timeout,
+            deadline=deadline,
+            metadata=metadata,
+        )
+
 
 class LeaderSchedulerBase(ServiceBase):
     async def assign_task(self, assign_task_request: "AssignTaskRequest") -> "_Empty__":
@@ -102,6 +200,24 @@ class LeaderSchedulerBase(ServiceBase):
     async def remove_task(self, remove_task_request: "RemoveTaskRequest") -> "_Empty__":
         raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
 
+    async def invalidate_task(
+        self, invalidate_task_request: "InvalidateTaskRequest"
+    ) -> "_Empty__":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def assign_tasks(
+        self, assign_tasks_request: "AssignTasksRequest"
+    ) -> "_Empty__":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def remove_tasks(
+        self, remove_tasks_request: "RemoveTasksRequest"
+    ) -> "_Empty__":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
+    async def get_node_load(self, empty: "_Empty__") -> "GetNodeLoadResponse":
+        raise grpclib.GRPCError(grpclib.const.Status.UNIMPLEMENTED)
+
     async def __rpc_assign_task(
         self, stream: "grpclib.server.Stream[AssignTaskRequest, _Empty__]"
     ) -> None:
@@ -123,6 +239,34 @@ class LeaderSchedulerBase(ServiceBase):
         response = await self.remove_task(request)
         await stream.send_message(response)
 
+    async def __rpc_invalidate_task(
+        self, stream: "grpclib.server.Stream[InvalidateTaskRequest, _Empty__]"
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.invalidate_task(request)
+        await stream.send_message(response)
+
+    async def __rpc_assign_tasks(
+        self, stream: "grpclib.server.Stream[AssignTasksRequest, _Empty__]"
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.assign_tasks(request)
+        await stream.send_message(response)
+
+    async def __rpc_remove_tasks(
+        self, stream: "grpclib.server.Stream[RemoveTasksRequest, _Empty__]"
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.remove_tasks(request)
+        await stream.send_message(response)
+
+    async def __rpc_get_node_load(
+        self, stream: "grpclib.server.Stream[_Empty__, GetNodeLoadResponse]"
+    ) -> None:
+        request = await stream.recv_message()
+        response = await self.get_node_load(request)
+        await stream.send_message(response)
+
     def __mapping__(self) -> Dict[str, grpclib.const.Handler]:
         return {
             "/scheduler.LeaderScheduler/AssignTask": grpclib.const.Handler(
@@ -143,4 +287,28 @@ class LeaderSchedulerBase(ServiceBase):
                 RemoveTaskRequest,
                 _Empty__,
             ),
+            "/scheduler.LeaderScheduler/InvalidateTask": grpclib.const.Handler(
+                self.__rpc_invalidate_task,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                InvalidateTaskRequest,
+                _Empty__,
+            ),
+            "/scheduler.LeaderScheduler/AssignTasks": grpclib.const.Handler(
+                self.__rpc_assign_tasks,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                AssignTasksRequest,
+                _Empty__,
+            ),
+            "/scheduler.LeaderScheduler/RemoveTasks": grpclib.const.Handler(
+                self.__rpc_remove_tasks,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                RemoveTasksRequest,
+                _Empty__,
+            ),
+            "/scheduler.LeaderScheduler/GetNodeLoad": grpclib.const.Handler(
+                self.__rpc_get_node_load,
+                grpclib.const.Cardinality.UNARY_UNARY,
+                _Empty__,
+                GetNodeLoadResponse,
+            ),
         }
@@ -0,0 +1,408 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from datetime import datetime, timedelta
+from typing import List, Callable, Dict, Any, Tuple, Set
+
+from loguru import logger
+
+from funtask.core import interface_and_types as interface, entities
+from funtask.utils.metrics import Histogram, exponential_bounds, SlidingWindowCounter
+
+_MS = entities.TIME_UNIT_SECONDS[entities.TimeUnit.MILLISECOND]
+
+# fire lateness buckets from 0.1ms to ~3.3s
+_LATENESS_BOUNDS = exponential_bounds(.0001, 2, 16)
+
+
+def _parse_at(unit: entities.TimeUnit, at: str) -> float:
+    """
+    parse `at` into seconds from the start of unit, same format with schedule lib
+    minute: ':SS', hour: 'MM:SS' or ':MM', day and week: 'HH:MM:SS' or 'HH:MM'
+    """
+    parts = at.split(':')
+    try:
+        match unit:
+            case entities.TimeUnit.MINUTE if len(parts) == 2 and parts[0] == '':
+                return int(parts[1])
+            case entities.TimeUnit.HOUR if len(parts) == 2 and parts[0] == '':
+                return int(parts[1]) * 60
+            case entities.TimeUnit.HOUR if len(parts) == 2:
+                return int(parts[0]) * 60 + int(parts[1])
+            case entities.TimeUnit.DAY | entities.TimeUnit.WEEK if len(parts) in (2, 3):
+                hour, minute, second = (int(part) for part in (parts + ['0'])[:3])
+                return hour * 60 * 60 + minute * 60 + second
+    except ValueError:
+        pass
+    raise ValueError(f"invalid at '{at}' for time unit {unit}")
+
+
+def _first_run_time(unit: entities.TimeUnit, n: int, at: str | None, now: datetime) -> datetime:
+    """
+    wall clock time of the first run, `at` aligns runs inside the unit boundary,
+    a passed `at` moves to the next unit, so a week run keeps its weekday
+    """
+    if at is None:
+        return now + timedelta(seconds=n * entities.TIME_UNIT_SECONDS[unit])
+    offset = _parse_at(unit, at)
+    match unit:
+        case entities.TimeUnit.MINUTE:
+            boundary = now.replace(second=0, microsecond=0)
+            step = timedelta(minutes=1)
+        case entities.TimeUnit.HOUR:
+            boundary = now.replace(minute=0, second=0, microsecond=0)
+            step = timedelta(hours=1)
+        case entities.TimeUnit.DAY:
+            boundary = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            step = timedelta(days=1)
+        case _:
+            boundary = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            step = timedelta(weeks=1)
+    run_time = boundary + timedelta(seconds=offset)
+    while run_time <= now:
+        run_time += step
+    return run_time
+
+
+class _Job:
+    __slots__ = (
+        'name', 'period', 'deadline', 'task', 'args', 'kwargs', 'cancelled', 'bucket', 'run_time', 'offset', 'queued'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            period: float,
+            deadline: float,
+            task: Callable,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any],
+            bucket: '_MsBucket | None' = None,
+            run_time: datetime | None = None,
+            offset: float = 0.
+    ):
+        self.name = name
+        self.period = period
+        # deadline in event loop time (monotonic)
+        self.deadline = deadline
+        self.task = task
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        # millisecond jobs are fired by their bucket
+        self.bucket = bucket
+        # wall clock time of next run of jobs aligned to local time of day, deadline follows it
+        self.run_time = run_time
+        self.offset = offset
+        # in heap, a job popped for its fire is not
+        self.queued = False
+
+
+class _MsBucket:
+    """
+    millisecond jobs with the same period and phase, fired together by one heap entry
+    """
+    __slots__ = ('key', 'n', 'tick', 'deadline', 'jobs', 'cancelled', 'queued')
+
+    def __init__(self, key: Tuple[int, int], n: int, tick: int, deadline: float):
+        self.key = key
+        self.n = n
+        # index of next fire on millisecond grid from anchor
+        self.tick = tick
+        self.deadline = deadline
+        self.jobs: Dict[str, _Job] = {}
+        self.cancelled = False
+        self.queued = False
+
+
+class HeapCron(interface.Cron):
+    """
+    cron running inside the event loop, jobs are kept in a min heap of deadlines
+    and a single loop timer sleeps until the earliest one, add and cancel are O(log n)
+
+    millisecond jobs are grouped by (period, phase) on a millisecond grid anchored to the monotonic
+    clock, each tick only touches buckets that are due and deadlines never accumulate drift
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, _Job | _MsBucket]] = []
+        self._jobs: Dict[str, _Job] = {}
+        self._ms_buckets: Dict[Tuple[int, int], _MsBucket] = {}
+        self._ms_anchor: float | None = None
+        self._seq = itertools.count()
+        # heap entries of cancelled jobs, removed lazily
+        self._stale = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._running_tasks: Set[asyncio.Task] = set()
+        # loop timers may run up to clock resolution early
+        self._resolution = time.get_clock_info('monotonic').resolution
+        self.fire_lateness = Histogram(_LATENESS_BOUNDS)
+        # fires per second over last minute, shows load spikes on unit boundaries
+        self.fire_load = SlidingWindowCounter(1., 60)
+
+    def _push(self, entry: _Job | _MsBucket):
+        entry.queued = True
+        heapq.heappush(self._heap, (entry.deadline, next(self._seq), entry))
+
+    def _arm_timer(self):
+        loop = asyncio.get_running_loop()
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        if not self._heap:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            return
+        deadline = self._heap[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(deadline, self._on_timer)
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def _on_done(self, task: asyncio.Task):
+        self._running_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.opt(exception=task.exception()).error("cron job {name} failed", name=task.get_name())
+
+    def _fire(self, job: _Job):
+        try:
+            res = job.task(*job.args, **job.kwargs)
+        except Exception as e:
+            logger.opt(exception=e).error("cron job {name} failed", name=job.name)
+            return
+        if asyncio.iscoroutine(res):
+            task = asyncio.get_running_loop().create_task(res, name=job.name)
+            self._running_tasks.add(task)
+            task.add_done_callback(self._on_done)
+
+    def _advance_bucket(self, bucket: _MsBucket, now: float):
+        assert self._ms_anchor is not None
+        current_tick = math.floor((now - self._ms_anchor) / _MS)
+        # skip ticks missed by a blocked loop, keep the phase, a bucket fired early still moves one period
+        bucket.tick += (max((current_tick - bucket.tick) // bucket.n, 0) + 1) * bucket.n
+        bucket.deadline = self._ms_anchor + bucket.tick * _MS
+
+    def _advance_job(self, job: _Job, now: float):
+        if job.run_time is not None:
+            # day and week runs follow local time of day, so they stay aligned over dst and clock changes
+            wall_now = datetime.now()
+            step = timedelta(seconds=job.period)
+            job.run_time += step
+            while job.run_time <= wall_now:
+                job.run_time += step
+            job.deadline = now + (job.run_time - wall_now).total_seconds() + job.offset
+            return
+        # keep the original phase, missed runs are skipped instead of fired in burst,
+        # a job fired early still moves one period
+        missed = max((now - job.deadline) // job.period, 0)
+        job.deadline += (missed + 1) * job.period
+
+    def _on_timer(self):
+        self._timer = None
+        now = asyncio.get_running_loop().time()
+        while self._heap and self._heap[0][0] <= now + self._resolution:
+            _, _, entry = heapq.heappop(self._heap)
+            entry.queued = False
+            if entry.cancelled:
+                self._stale -= 1
+                continue
+            lateness = max(now - entry.deadline, 0.)
+            if isinstance(entry, _MsBucket):
+                self.fire_load.add(now, len(entry.jobs))
+                for job in list(entry.jobs.values()):
+                    self.fire_lateness.observe(lateness)
+                    self._fire(job)
+                if entry.cancelled:
+                    continue
+                self._advance_bucket(entry, now)
+            else:
+                self.fire_load.add(now)
+                self.fire_lateness.observe(lateness)
+                self._fire(entry)
+                if entry.cancelled:
+                    continue
+                self._advance_job(entry, now)
+            self._push(entry)
+        self._arm_timer()
+
+    async def _schedule(
+            self,
+            name: str,
+            unit: entities.TimeUnit,
+            n: int,
+            at: str | None,
+            task: Callable,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any],
+            offset: float
+    ):
+        assert n > 0, ValueError(f"n should > 0, got {n}")
+        await self.cancel(name)
+        now = datetime.now()
+        run_time = _first_run_time(unit, n, at, now)
+        job = _Job(
+            name=name,
+            period=n * entities.TIME_UNIT_SECONDS[unit],
+            deadline=asyncio.get_running_loop().time() + (run_time - now).total_seconds() + offset,
+            task=task,
+            args=args,
+            kwargs=kwargs,
+            run_time=run_time if at is not None and unit in (entities.TimeUnit.DAY, entities.TimeUnit.WEEK) else None,
+            offset=offset
+        )
+        self._jobs[name] = job
+        self._push(job)
+        self._arm_timer()
+
+    async def _schedule_ms(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            args: Tuple[Any, ...],
+            kwargs: Dict[str, Any],
+            offset: float
+    ):
+        assert n > 0, ValueError(f"n should > 0, got {n}")
+        await self.cancel(name)
+        now = asyncio.get_running_loop().time()
+        if self._ms_anchor is None:
+            self._ms_anchor = now
+        current_tick = math.ceil((now - self._ms_anchor) / _MS) + round(offset / _MS)
+        key = (n, current_tick % n)
+        bucket = self._ms_buckets.get(key)
+        if bucket is None:
+            tick = current_tick + n
+            bucket = _MsBucket(key, n, tick, self._ms_anchor + tick * _MS)
+            self._ms_buckets[key] = bucket
+            self._push(bucket)
+        job = _Job(
+            name=name,
+            period=n * _MS,
+            deadline=bucket.deadline,
+            task=task,
+            args=args,
+            kwargs=kwargs,
+            bucket=bucket
+        )
+        bucket.jobs[name] = job
+        self._jobs[name] = job
+        self._arm_timer()
+
+    def get_fire_stats(self) -> Dict[str, float]:
+        """
+        fire accuracy statistics, lateness of fires against deadline in seconds
+        """
+        return self.fire_lateness.snapshot()
+
+    def get_load_profile(self) -> Dict[str, float | List[int]]:
+        """
+        fires per second over the last minute, with mean and peak
+        """
+        return self.fire_load.snapshot(asyncio.get_running_loop().time())
+
+    async def get_all(self) -> List[str]:
+        return list(self._jobs.keys())
+
+    async def every_n_seconds(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        if at is not None:
+            raise ValueError('at is not supported by every_n_seconds')
+        await self._schedule(name, entities.TimeUnit.SECOND, n, at, task, args, kwargs, offset)
+
+    async def every_n_minutes(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        await self._schedule(name, entities.TimeUnit.MINUTE, n, at, task, args, kwargs, offset)
+
+    async def every_n_hours(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        await self._schedule(name, entities.TimeUnit.HOUR, n, at, task, args, kwargs, offset)
+
+    async def every_n_days(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        await self._schedule(name, entities.TimeUnit.DAY, n, at, task, args, kwargs, offset)
+
+    async def every_n_weeks(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        await self._schedule(name, entities.TimeUnit.WEEK, n, at, task, args, kwargs, offset)
+
+    async def every_n_millisecond(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        await self._schedule_ms(name, n, task, args, kwargs, offset)
+
+    async def cancel(self, name: str):
+        job = self._jobs.pop(name, None)
+        if job is None:
+            return
+        job.cancelled = True
+        entry: _Job | _MsBucket = job
+        if job.bucket is not None:
+            bucket = entry = job.bucket
+            bucket.jobs.pop(name, None)
+            if bucket.jobs:
+                return
+            bucket.cancelled = True
+            self._ms_buckets.pop(bucket.key, None)
+        if not entry.queued:
+            # popped for its fire, it is dropped instead of pushed back
+            return
+        self._stale += 1
+        if self._stale > len(self._heap) // 2:
+            self._compact()
+        self._arm_timer()
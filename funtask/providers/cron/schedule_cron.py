@@ -1,15 +1,23 @@
 import time
-from typing import List, Callable, Dict, Any
+from typing import List, Callable, Dict, Any, Set
 import schedule
 from multiprocessing import Process
 
 from funtask.core import interface_and_types as interface
 
 
+def _reject_offset(offset: float):
+    # jobs run in the forked scheduler process, which has no event loop of the caller to delay fires on
+    if offset:
+        raise ValueError('offset is not supported by SchedulerCron, use HeapCron to spread fires')
+
+
 class SchedulerCron(interface.Cron):
     def __init__(self):
         self.scheduler = schedule.Scheduler()
         self.ms_tasks: Dict[str, (int, Callable, List[Any], Dict[str, Any])] = {}
+        # period -> names of millisecond tasks with this period
+        self.ms_periods: Dict[int, Set[str]] = {}
         self._keep_run = True
         process = Process(target=self._run)
         process.start()
@@ -18,8 +26,12 @@ class SchedulerCron(interface.Cron):
         self._keep_run = False
 
     def _check_and_run(self, ms: int):
-        for run_ms, fun, args, kwargs in self.ms_tasks.values():
-            if ms % run_ms:
+        # only tasks whose period divides current ms are due, others are never visited
+        for period, names in list(self.ms_periods.items()):
+            if ms % period:
+                continue
+            for name in list(names):
+                _, fun, args, kwargs = self.ms_tasks[name]
                 fun(*args, **kwargs)
 
     def _run(self):
@@ -42,37 +54,102 @@ class SchedulerCron(interface.Cron):
         tasks = self.scheduler.get_jobs()
         return [str(list(task.tags)[0]) for task in tasks] + list(self.ms_tasks.keys())
 
-    async def every_n_seconds(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_seconds(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         task = self.scheduler.every(n).second.at(at).do(task, *args, **kwargs)
         task.tag(name)
 
-    async def every_n_minutes(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_minutes(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         task = self.scheduler.every(n).minute.at(at).do(task, *args, **kwargs)
         task.tag(name)
 
-    async def every_n_hours(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_hours(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         task = self.scheduler.every(n).hour.at(at).do(task, *args, **kwargs)
         task.tag(name)
 
-    async def every_n_days(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_days(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         task = self.scheduler.every(n).day.at(at).do(task, *args, **kwargs)
         task.tag(name)
 
-    async def every_n_weeks(self, name: str, n: int, task: Callable, at: str | None = None, *args, **kwargs):
+    async def every_n_weeks(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            at: str | None = None,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         task = self.scheduler.every(n).week.at(at).do(task, *args, **kwargs)
         task.tag(name)
 
-    async def every_n_millisecond(self, name: str, n: int, task: Callable, *args, **kwargs):
+    async def every_n_millisecond(
+            self,
+            name: str,
+            n: int,
+            task: Callable,
+            *args,
+            offset: float = 0.,
+            **kwargs
+    ):
+        _reject_offset(offset)
         await self.cancel(name)
         self.ms_tasks[name] = (n, task, args, kwargs)
+        self.ms_periods.setdefault(n, set()).add(name)
 
     async def cancel(self, name: str):
         for job in self.scheduler.get_jobs(name):
             self.scheduler.cancel_job(job)
 
-        self.ms_tasks.pop(name, None)
+        ms_task = self.ms_tasks.pop(name, None)
+        if ms_task is not None:
+            names = self.ms_periods[ms_task[0]]
+            names.discard(name)
+            if not names:
+                self.ms_periods.pop(ms_task[0])
@@ -1,9 +1,12 @@
+import math
 from datetime import datetime
 from typing import List, Dict, Any, AsyncIterator, Tuple, Type, TypeVar
 
+import dill
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker, selectinload
-from sqlalchemy.sql import select, update
+from sqlalchemy.sql import select, update, delete, bindparam, and_, or_
+from sqlalchemy.sql import func as sql_func
 from contextlib import asynccontextmanager
 from funtask.providers.db.sql import model
 
@@ -13,6 +16,58 @@ from funtask.providers.db.sql.model import EntityConvertable
 _T = TypeVar('_T')
 
 
+def _task2model(task: entities.Task) -> model.Task:
+    return model.Task(
+        uuid=task.uuid,
+        uuid_in_manager=task.uuid_in_manager,
+        parent_task_uuid=task.parent_task_uuid,
+        status=model.TaskStatus(task.status.value),
+        # resolved in the insert, so bulk inserts need no lookup per task
+        worker_id=None if task.worker_uuid is None else select(model.Worker.id).where(
+            model.Worker.uuid == task.worker_uuid
+        ).scalar_subquery(),
+        func_id=select(model.Function.id).where(
+            model.Function.uuid == (task.func.uuid if isinstance(task.func, entities.Func) else task.func)
+        ).scalar_subquery(),
+        argument=dill.dumps(task.argument),
+        result_as_state=task.result_as_state,
+        timeout=task.timeout,
+        description=task.description,
+        result='' if task.result is None else str(task.result)
+    )
+
+
+def _timepoints2column(timepoints: List[entities.TimePoint]) -> List[Dict[str, Any]]:
+    return [{'unit': timepoint.unit.value, 'n': timepoint.n, 'at': timepoint.at} for timepoint in timepoints]
+
+
+def _max_size2column(max_size: float) -> int:
+    return -1 if math.isinf(max_size) else int(max_size)
+
+
+# relationships read by to_entity, async sessions can not load them lazily
+_TASK_LOAD_OPTIONS = (
+    selectinload(model.Task.worker),
+    selectinload(model.Task.func)
+)
+_CRON_TASK_LOAD_OPTIONS = (
+    selectinload(model.CronTask.func).selectinload(model.Function.parameter_schema),
+    selectinload(model.CronTask.argument_static_value),
+    selectinload(model.CronTask.argument_queue).selectinload(model.Queue.parameter_schema),
+    selectinload(model.CronTask.argument_udf).selectinload(model.Function.parameter_schema),
+    selectinload(model.CronTask.static_worker),
+    selectinload(model.CronTask.worker_choose_udf).selectinload(model.Function.parameter_schema),
+    selectinload(model.CronTask.task_queue_udf).selectinload(model.Function.parameter_schema),
+    selectinload(model.CronTask.tags)
+)
+
+
+def _task_value2column(value: Any) -> Any:
+    if isinstance(value, entities.TaskStatus):
+        return model.TaskStatus(value.value)
+    return value
+
+
 class Repository(interface.Repository):
     def __init__(
             self,
@@ -76,10 +131,10 @@ class Repository(interface.Repository):
         async with self._ensure_session(session) as session:
             session: AsyncSession
             query = select(t.id).where(t.uuid == uuid)
-            result = await session.execute(query)
-            if not result:
+            result = (await session.execute(query)).scalar_one_or_none()
+            if result is None:
                 raise interface.RecordNotFoundException(f'record uuid: {uuid} of type: {t} not found')
-            return result[0]
+            return result
 
     async def get_workers_from_cursor(
             self,
@@ -103,6 +158,18 @@ class Repository(interface.Repository):
             next_cursor = max(result.id for result in result_models)
             return [worker_model.to_entity() for worker_model in result_models], next_cursor
 
+    async def get_workers_changed_since(
+            self,
+            since: datetime,
+            session: AsyncSession | None = None
+    ) -> List[entities.Worker]:
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            result: List[Tuple[model.Worker]] = (await session.execute(
+                select(model.Worker).options(selectinload(model.Worker.tags)).where(model.Worker.update_time >= since)
+            )).all()
+            return [worker[0].to_entity() for worker in result]
+
     async def get_function_from_uuid(
             self,
             func_uuid: entities.FuncUUID,
@@ -115,36 +182,80 @@ class Repository(interface.Repository):
 
     async def get_task_from_uuid(self, task_uuid: entities.TaskUUID,
                                  session: AsyncSession | None = None) -> entities.Task:
-        return await self._get_entity_from_uuid(
-            model.Task,
-            task_uuid, session
-        )
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            task = (await session.execute(
+                select(model.Task).options(*_TASK_LOAD_OPTIONS).where(model.Task.uuid == task_uuid)
+            )).scalar_one_or_none()
+            if task is None:
+                raise interface.RecordNotFoundException(f'task {task_uuid} not found')
+            return task.to_entity()
 
     async def get_cron_task_from_uuid(
             self,
             task_uuid: entities.CronTaskUUID,
             session: AsyncSession | None = None
     ) -> entities.CronTask:
-        return await self._get_entity_from_uuid(
-            model.CronTask,
-            task_uuid, session
-        )
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            cron_task = (await session.execute(
+                select(model.CronTask).options(*_CRON_TASK_LOAD_OPTIONS).where(model.CronTask.uuid == task_uuid)
+            )).scalar_one_or_none()
+            if cron_task is None:
+                raise interface.RecordNotFoundException(f'cron task {task_uuid} not found')
+            return cron_task.to_entity()
 
     async def get_all_cron_task(self, session: AsyncSession | None = None) -> List[entities.CronTask]:
         async with self._ensure_session(session) as session:
             result: List[Tuple[model.CronTask]] = (await session.execute(
-                select(model.CronTask)
+                select(model.CronTask).options(*_CRON_TASK_LOAD_OPTIONS)
             )).all()
             return [cronTask[0].to_entity() for cronTask in result]
 
+    async def get_cron_tasks_changed_since(
+            self,
+            since: datetime,
+            session: AsyncSession | None = None
+    ) -> List[entities.CronTask]:
+        async with self._ensure_session(session) as session:
+            result: List[Tuple[model.CronTask]] = (await session.execute(
+                select(model.CronTask).options(*_CRON_TASK_LOAD_OPTIONS).where(model.CronTask.update_time >= since)
+            )).all()
+            return [cron_task[0].to_entity() for cron_task in result]
+
+    async def update_cron_task(
+            self,
+            task_uuid: entities.CronTaskUUID,
+            value: Dict[str, Any],
+            session: AsyncSession | None = None
+    ) -> int:
+        if 'timepoints' in value:
+            value = {**value, 'timepoints': _timepoints2column(value['timepoints'])}
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            result = await session.execute(
+                update(model.CronTask).where(model.CronTask.uuid == task_uuid).values(
+                    **value,
+                    version=model.CronTask.version + 1,
+                    update_time=datetime.now()
+                )
+            )
+            if result.rowcount == 0:
+                raise interface.RecordNotFoundException(f"cron task {task_uuid} not found")
+            # no RETURNING on mysql, read back in the same transaction
+            return (await session.execute(
+                select(model.CronTask.version).where(model.CronTask.uuid == task_uuid)
+            )).scalar_one()
+
     async def add_task(self, task: entities.Task, session: AsyncSession | None = None):
         async with self._ensure_session(session) as session:
             session: AsyncSession
-            session.add(model.Task(
-                uuid=task.uuid,
-                uuid_in_manager=task.uuid_in_manager,
-                parent_task_uuid=task.parent_task_uuid
-            ))
+            session.add(_task2model(task))
+
+    async def add_tasks(self, tasks: List[entities.Task], session: AsyncSession | None = None):
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            session.add_all([_task2model(task) for task in tasks])
 
     async def change_task_status(
             self, task_uuid: entities.TaskUUID, status: entities.TaskStatus, session: AsyncSession | None = None):
@@ -176,8 +287,34 @@ class Repository(interface.Repository):
                 uuid=worker.uuid,
                 status=worker.status.value,
                 name=worker.name,
-                last_heart_beat=datetime.now()
+                last_heart_beat=datetime.now(),
+                manager_node_uuid=worker.manager_node_uuid,
+                update_time=datetime.now()
             ))
+            session.add_all([
+                model.Tag(tag=tag, related_uuid=worker.uuid, tag_type=model.TagType.Worker)
+                for tag in set(worker.tags)
+            ])
+
+    async def set_worker_tags(
+            self,
+            worker_uuid: entities.WorkerUUID,
+            tags: List[str],
+            session: AsyncSession | None = None
+    ):
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            await session.execute(delete(model.Tag).where(
+                model.Tag.tag_type == model.TagType.Worker,
+                model.Tag.related_uuid == worker_uuid
+            ))
+            session.add_all([
+                model.Tag(tag=tag, related_uuid=worker_uuid, tag_type=model.TagType.Worker)
+                for tag in set(tags)
+            ])
+            await session.execute(
+                update(model.Worker).where(model.Worker.uuid == worker_uuid).values(update_time=datetime.now())
+            )
 
     async def get_worker_from_uuid(self, task_uuid: entities.WorkerUUID,
                                    session: AsyncSession | None = None) -> entities.Task:
@@ -195,69 +332,69 @@ class Repository(interface.Repository):
             session: AsyncSession
             worker = await self._get_model_from_uuid(model.Worker, worker_uuid, session)
             worker.status = status.value
+            worker.update_time = datetime.now()
 
     async def add_cron_task(self, task: entities.CronTask, session: AsyncSession | None = None):
         async with self._ensure_session(session) as session:
             session: AsyncSession
-            static_value_id = task.argument_generate_strategy.static_value.uuid and await self._model_uuid2id(
-                model.Argument,
-                task.argument_generate_strategy.static_value.uuid,
-                session
-            )
-            queue_id = task.argument_generate_strategy.argument_queue and await self._model_uuid2id(
-                model.Function,
-                task.argument_generate_strategy.argument_queue.uuid,
-                session
-            )
-            arg_gen_udf_id = task.argument_generate_strategy.udf and await self._model_uuid2id(
-                model.Function,
-                task.argument_generate_strategy.udf.uuid,
-                session
-            )
-            func_id = await self._model_uuid2id(model.Function, task.func.uuid, session)
-
-            static_worker_id = task.worker_choose_strategy.static_worker and await self._model_uuid2id(
-                model.Worker,
-                task.worker_choose_strategy.static_worker,
-                session
-            )
 
-            worker_choose_udf_id = task.worker_choose_strategy.udf and await self._model_uuid2id(
-                model.Function,
-                task.worker_choose_strategy.udf.uuid,
-                session
-            )
-
-            task_queue_udf_id = task.task_queue_strategy.udf and await self._model_uuid2id(
-                model.Function,
-                task.task_queue_strategy.udf.uuid,
-                session
-            )
+            async def optional_id(t: Type[_T], uuid: str | None) -> int | None:
+                return None if uuid is None else await self._model_uuid2id(t, uuid, session)
 
+            argument_strategy = task.argument_generate_strategy
+            worker_strategy = task.worker_choose_strategy
+            queue_strategy = task.task_queue_strategy
             session.add(model.CronTask(
                 uuid=task.uuid,
                 name=task.name,
-                function_id=func_id,
-                argument_generate_strategy=task.argument_generate_strategy.strategy.value,
-                argument_generate_strategy_static_value_id=static_value_id,
-                argument_generate_strategy_args_queue_id=queue_id,
-                argument_generate_strategy_udf_id=arg_gen_udf_id,
-                argument_generate_strategy_udf_extra=task.argument_generate_strategy.udf_extra,
-                worker_choose_strategy=task.worker_choose_strategy.strategy.value,
-                worker_choose_strategy_static_worker_id=static_worker_id,
-                worker_choose_strategy_worker_uuid_list=task.worker_choose_strategy.workers,
-                worker_choose_strategy_worker_tags=task.worker_choose_strategy.worker_tags,
-                worker_choose_strategy_udf_id=worker_choose_udf_id,
-                worker_choose_strategy_udf_extra=task.worker_choose_strategy.udf_extra,
-                task_queue_strategy=task.task_queue_strategy.full_strategy.value,
-                task_queue_max_size=task.task_queue_strategy.max_size,
-                task_queue_strategy_udf_id=task_queue_udf_id,
-                task_queue_strategy_udf_extra=task.task_queue_strategy.udf_extra,
+                function_id=await self._model_uuid2id(
+                    model.Function,
+                    task.func.uuid if isinstance(task.func, entities.Func) else task.func,
+                    session
+                ),
+                argument_generate_strategy=argument_strategy.strategy.value,
+                argument_generate_strategy_static_value_id=await optional_id(
+                    model.Argument,
+                    argument_strategy.static_value and argument_strategy.static_value.uuid
+                ),
+                argument_generate_strategy_args_queue_id=await optional_id(
+                    model.Queue,
+                    argument_strategy.argument_queue and argument_strategy.argument_queue.uuid
+                ),
+                argument_generate_strategy_udf_id=await optional_id(
+                    model.Function,
+                    argument_strategy.udf and argument_strategy.udf.uuid
+                ),
+                argument_generate_strategy_udf_extra=argument_strategy.udf_extra,
+                worker_choose_strategy=worker_strategy.strategy.value,
+                worker_choose_strategy_static_worker_id=await optional_id(model.Worker, worker_strategy.static_worker),
+                worker_choose_strategy_worker_uuid_list=worker_strategy.workers,
+                worker_choose_strategy_worker_tags=worker_strategy.worker_tags,
+                worker_choose_strategy_udf_id=await optional_id(
+                    model.Function,
+                    worker_strategy.udf and worker_strategy.udf.uuid
+                ),
+                worker_choose_strategy_udf_extra=worker_strategy.udf_extra,
+                task_queue_strategy=queue_strategy.full_strategy.value,
+                task_queue_max_size=_max_size2column(queue_strategy.max_size),
+                task_queue_strategy_udf_id=await optional_id(
+                    model.Function,
+                    queue_strategy.udf and queue_strategy.udf.uuid
+                ),
+                task_queue_strategy_udf_extra=queue_strategy.udf_extra,
                 result_as_status=task.result_as_state,
                 timeout=task.timeout,
                 description=task.description,
-                disabled=task.disabled
+                disabled=task.disabled,
+                spread_window=task.spread_window,
+                timepoints=_timepoints2column(task.timepoints),
+                version=task.version,
+                update_time=datetime.now()
             ))
+            session.add_all([
+                model.Tag(tag=tag, related_uuid=task.uuid, tag_type=model.TagType.CronTask)
+                for tag in set(task.tags)
+            ])
 
     async def add_func_parameter_schema(
             self,
@@ -288,33 +425,112 @@ class Repository(interface.Repository):
                 update(model.Task).where(model.Task.uuid == task_uuid).values(**value)
             )
 
+    async def update_tasks(
+            self,
+            values: Dict[entities.TaskUUID, Dict[str, Any]],
+            only_status: List[entities.TaskStatus] | None = None,
+            session: AsyncSession | None = None
+    ):
+        # executemany needs same parameters, so group tasks by updated columns
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for task_uuid, value in values.items():
+            params = {f'b_{k}': _task_value2column(v) for k, v in value.items()}
+            params['b_uuid'] = task_uuid
+            groups.setdefault(tuple(sorted(value.keys())), []).append(params)
+        task_table = model.Task.__table__
+        condition = task_table.c.uuid == bindparam('b_uuid')
+        if only_status is not None:
+            # expanding in_ can not be executed many, so compare with each status
+            condition = and_(condition, or_(*(task_table.c.status == _task_value2column(status)
+                                              for status in only_status)))
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            for columns, params in groups.items():
+                await session.execute(
+                    task_table.update().where(condition).values(
+                        {column: bindparam(f'b_{column}') for column in columns}
+                    ),
+                    params
+                )
+
     async def update_worker_last_heart_beat_time(
             self, worker_uuid: entities.WorkerUUID, t: datetime, session: AsyncSession | None = None):
         async with self._ensure_session(session) as session:
             session: AsyncSession
-            res: Tuple[model.Worker] = await session.execute(
-                select(model.Worker).where(model.Worker.uuid == worker_uuid)
+            res = await session.execute(
+                update(model.Worker).where(model.Worker.uuid == worker_uuid).values(last_heart_beat=t)
             )
-            if not res:
+            if not res.rowcount:
                 raise interface.RecordNotFoundException(f'worker {worker_uuid} not found')
-            worker = res[0]
-            worker.last_heart_beat = t
+
+    async def update_workers_last_heart_beat_time(
+            self,
+            heart_beats: Dict[entities.WorkerUUID, datetime],
+            session: AsyncSession | None = None
+    ):
+        if not heart_beats:
+            return
+        worker_table = model.Worker.__table__
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            await session.execute(
+                worker_table.update().where(
+                    worker_table.c.uuid == bindparam('b_uuid')
+                ).where(
+                    worker_table.c.status == model.WorkerStatus.RUNNING
+                ).values(last_heart_beat=bindparam('b_last_heart_beat')),
+                [
+                    {'b_uuid': worker_uuid, 'b_last_heart_beat': t}
+                    for worker_uuid, t in heart_beats.items()
+                ]
+            )
 
     async def get_workers_from_tags(
             self,
             tags: List[str],
+            match_all: bool = False,
             session: AsyncSession | None = None
     ) -> List[entities.Worker]:
+        tags = list(set(tags))
+        if not tags:
+            return []
+        # served by unique index on (tag_type, tag, related_uuid)
+        tagged_uuids = select(model.Tag.related_uuid).where(
+            model.Tag.tag_type == model.TagType.Worker,
+            model.Tag.tag.in_(tags)
+        )
+        if match_all:
+            tagged_uuids = tagged_uuids.group_by(model.Tag.related_uuid).having(
+                sql_func.count(model.Tag.tag) == len(tags)
+            )
         async with self._ensure_session(session) as session:
             session: AsyncSession
-            workers = await session.execute(select(model.Worker).join(
-                model.Tag, model.Worker.uuid == model.Tag.related_uuid
+            workers = await session.execute(select(model.Worker).options(
+                selectinload(model.Worker.tags)
             ).where(
-                model.Tag.tag_type == 'worker'
+                model.Worker.status == model.WorkerStatus.RUNNING,
+                model.Worker.uuid.in_(tagged_uuids)
             ))
             workers: List[Tuple[model.Worker]]
             return [worker[0].to_entity() for worker in workers]
 
+    async def get_workers_manager_node(
+            self,
+            workers_uuid: List[entities.WorkerUUID],
+            session: AsyncSession | None = None
+    ) -> Dict[entities.WorkerUUID, entities.TaskWorkerManagerNodeUUID]:
+        if not workers_uuid:
+            return {}
+        async with self._ensure_session(session) as session:
+            session: AsyncSession
+            rows = await session.execute(
+                select(model.Worker.uuid, model.Worker.manager_node_uuid).where(
+                    model.Worker.uuid.in_(workers_uuid),
+                    model.Worker.manager_node_uuid.is_not(None)
+                )
+            )
+            return {worker_uuid: node_uuid for worker_uuid, node_uuid in rows}
+
     async def drop_model_schema(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(model.Base.metadata.drop_all)
@@ -1,8 +1,11 @@
+import math
 from abc import abstractmethod
 from enum import auto, unique
 from typing import List, cast, Generic, TypeVar, Protocol, Any, Optional
+
+import dill
 from sqlalchemy import Column, Integer, String, ForeignKey, Enum, VARBINARY, Boolean, Float, BigInteger, JSON, \
-    TIMESTAMP, UniqueConstraint
+    TIMESTAMP, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship, Mapped
 
 from funtask.core import entities
@@ -39,6 +42,9 @@ class TaskStatus(AutoName):
 
 _T = TypeVar('_T')
 
+# sqlite only autoincrements INTEGER primary keys
+_BIG_INTEGER_ID = BigInteger().with_variant(Integer(), 'sqlite')
+
 
 class EntityConvertable(Generic[_T]):
     @abstractmethod
@@ -50,6 +56,10 @@ class WithUUID(Protocol):
     uuid: Any
 
 
+def _optional_entity(convertable: 'EntityConvertable[_T] | None') -> _T | None:
+    return None if convertable is None else convertable.to_entity()
+
+
 class Worker(Base, EntityConvertable[entities.Worker]):
     __tablename__ = 'worker'
 
@@ -58,6 +68,9 @@ class Worker(Base, EntityConvertable[entities.Worker]):
     status = Column(Enum(WorkerStatus), nullable=False)
     name = Column(String(64), nullable=True)
     last_heart_beat = Column(TIMESTAMP(), nullable=False)
+    manager_node_uuid = Column(String(36), nullable=True)
+    # set on add, status and tag changes, schedulers sync their worker tag index from it
+    update_time = Column(TIMESTAMP(), nullable=False, index=True)
     tags: Mapped[List['Tag']] = relationship(
         'Tag',
         primaryjoin='Worker.uuid == foreign(Tag.related_uuid)',
@@ -69,7 +82,8 @@ class Worker(Base, EntityConvertable[entities.Worker]):
             uuid=cast(entities.WorkerUUID, self.uuid),
             status=entities.WorkerStatus(self.status.value),
             name=self.name,
-            tags=[tag.tag for tag in self.tags]
+            tags=[tag.tag for tag in self.tags],
+            manager_node_uuid=cast(entities.TaskWorkerManagerNodeUUID | None, self.manager_node_uuid)
         )
 
 
@@ -88,7 +102,7 @@ class ParameterSchema(Base, EntityConvertable[entities.ParameterSchema]):
 
 class Function(Base, EntityConvertable[entities.Func]):
     __tablename__ = 'function'
-    id = Column(BigInteger, primary_key=True,
+    id = Column(_BIG_INTEGER_ID, primary_key=True,
                 autoincrement=True, nullable=False)
     uuid = Column(String(36), nullable=False, unique=True)
     parameter_schema_id = Column(
@@ -127,22 +141,28 @@ class Function(Base, EntityConvertable[entities.Func]):
 class Argument(Base, EntityConvertable[entities.FuncArgument]):
     __tablename__ = 'argument'
 
-    id = Column(BigInteger, primary_key=True, autoincrement=True, nullable=False)
+    id = Column(_BIG_INTEGER_ID, primary_key=True, autoincrement=True, nullable=False)
     uuid = Column(String(36), nullable=False, unique=True)
     name = Column(String(32), nullable=True)
+    # dill dumped (args, kwargs)
     argument = Column(VARBINARY(1024), nullable=False)
 
     def to_entity(self) -> _T:
-        pass
+        args, kwargs = dill.loads(self.argument)
+        return entities.FuncArgument(
+            uuid=cast(entities.FuncArgumentUUID, self.uuid),
+            args=args,
+            kwargs=kwargs
+        )
 
 
 class Task(Base, EntityConvertable[entities.Task]):
     __tablename__ = 'task'
 
-    id = Column(BigInteger, primary_key=True,
+    id = Column(_BIG_INTEGER_ID, primary_key=True,
                 autoincrement=True, nullable=False)
     uuid = Column(String(36), nullable=False, unique=True)
-    uuid_in_manager = Column(String(36), nullable=False)
+    uuid_in_manager = Column(String(36), nullable=True)
     parent_task_uuid = Column(String(36), nullable=True)
     parent_task_type = Column(Enum(ParentTaskType), nullable=True)
     worker_id = Column(Integer(), ForeignKey('worker.id'), nullable=True)
@@ -150,6 +170,7 @@ class Task(Base, EntityConvertable[entities.Task]):
     status = Column(Enum(TaskStatus), nullable=False)
     func_id = Column(BigInteger(), ForeignKey('function.id'), nullable=False)
     func: Function = relationship('Function', backref="ref_tasks")
+    # dill dumped FuncArgument or None
     argument = Column(VARBINARY(1024), nullable=False)
     result_as_state = Column(Boolean(), nullable=False)
     timeout = Column(Float(), nullable=True)
@@ -157,7 +178,19 @@ class Task(Base, EntityConvertable[entities.Task]):
     result = Column(String(1024), nullable=False)
 
     def to_entity(self) -> _T:
-        pass
+        return entities.Task(
+            uuid=cast(entities.TaskUUID, self.uuid),
+            parent_task_uuid=self.parent_task_uuid,
+            uuid_in_manager=self.uuid_in_manager,
+            status=entities.TaskStatus(self.status.value),
+            worker_uuid=None if self.worker is None else cast(entities.WorkerUUID, self.worker.uuid),
+            func=cast(entities.FuncUUID, self.func.uuid),
+            argument=dill.loads(self.argument),
+            result_as_state=self.result_as_state,
+            timeout=self.timeout,
+            description=self.description or '',
+            result=self.result or None
+        )
 
 
 @unique
@@ -171,11 +204,20 @@ class ArgumentStrategy(AutoName):
     UDF = auto()
 
 
-class Queue(Base):
+class Queue(Base, EntityConvertable[entities.ArgumentQueue]):
     __tablename__ = 'queue'
     id = Column(Integer(), primary_key=True, autoincrement=True, nullable=False)
     uuid = Column(String(36), nullable=False, unique=True)
     name = Column(String(64), nullable=False)  # type: ignore
+    parameter_schema_id = Column(Integer(), ForeignKey('parameter_schema.id'), nullable=True)
+    parameter_schema: ParameterSchema | None = relationship('ParameterSchema')
+
+    def to_entity(self) -> _T:
+        return entities.ArgumentQueue(
+            uuid=self.uuid,
+            name=self.name,
+            parameter_schema=None if self.parameter_schema is None else self.parameter_schema.to_entity()
+        )
 
 
 @unique
@@ -183,6 +225,8 @@ class WorkerChooseStrategy(AutoName):
     STATIC = auto()
     RANDOM_FROM_LIST = auto()
     RANDOM_FROM_WORKER_TAGS = auto()
+    LEAST_QUEUED = auto()
+    POWER_OF_TWO = auto()
     UDF = auto()
 
 
@@ -208,7 +252,11 @@ class Tag(Base):
     related_uuid = Column(String(36), nullable=False)
     tag_type = Column(Enum(TagType), nullable=False)
 
-    uniq = UniqueConstraint(tag, related_uuid)
+    __table_args__ = (
+        # also serves lookup of uuids by tag
+        UniqueConstraint(tag_type, tag, related_uuid, name='uq_tag_type_tag_related_uuid'),
+        Index('ix_tag_related_uuid', related_uuid)
+    )
 
     worker: Mapped[Optional[Worker]] = relationship(
         'Worker',
@@ -222,7 +270,7 @@ class CronTask(Base, EntityConvertable[entities.CronTask]):
     __tablename__ = 'cron_task'
     id = Column(Integer, primary_key=True, autoincrement=True, nullable=False)
     uuid = Column(String(36), nullable=False, unique=True)
-    name = Column(String(64), nullable=False)
+    name = Column(String(64), nullable=True)
     function_id = Column(
         BigInteger(),
         ForeignKey('function.id'),
@@ -230,7 +278,10 @@ class CronTask(Base, EntityConvertable[entities.CronTask]):
     )
     argument_generate_strategy = Column(Enum(ArgumentStrategy), nullable=False)
     argument_generate_strategy_static_value_id = Column(
-        BigInteger(), nullable=True)
+        BigInteger(),
+        ForeignKey('argument.id'),
+        nullable=True
+    )
     argument_generate_strategy_args_queue_id = Column(
         Integer(),
         ForeignKey('queue.id'),
@@ -262,6 +313,7 @@ class CronTask(Base, EntityConvertable[entities.CronTask]):
     )
     worker_choose_strategy_udf_extra = Column(JSON(), nullable=True)
     task_queue_strategy = Column(Enum(QueueFullStrategy), nullable=False)
+    # -1 means unbounded
     task_queue_max_size = Column(BigInteger(), nullable=False)
     task_queue_strategy_udf_id = Column(
         BigInteger(),
@@ -273,11 +325,95 @@ class CronTask(Base, EntityConvertable[entities.CronTask]):
     timeout = Column(Float(), nullable=True)
     description = Column(String(256), nullable=True)
     disabled = Column(Boolean(), nullable=False)
+    spread_window = Column(Float(), nullable=True)
+    # list of {unit, n, at} of every time point
+    timepoints = Column(JSON(), nullable=False)
+    # bumped on every edit, caches compare versions to drop stale snapshots
+    version = Column(BigInteger(), nullable=False, default=0)
+    update_time = Column(TIMESTAMP(), nullable=False, index=True)
     func: Function = relationship(
         'Function',
         foreign_keys=[function_id],
         backref="ref_corn_tasks"
     )
+    argument_static_value: Argument | None = relationship('Argument')
+    argument_queue: Queue | None = relationship('Queue')
+    argument_udf: Function | None = relationship('Function', foreign_keys=[argument_generate_strategy_udf_id])
+    static_worker: Worker | None = relationship('Worker')
+    worker_choose_udf: Function | None = relationship('Function', foreign_keys=[worker_choose_strategy_udf_id])
+    task_queue_udf: Function | None = relationship('Function', foreign_keys=[task_queue_strategy_udf_id])
+    tags: Mapped[List[Tag]] = relationship(
+        'Tag',
+        primaryjoin='CronTask.uuid == foreign(Tag.related_uuid)',
+        viewonly=True
+    )
 
     def to_entity(self) -> _T:
-        pass
+        task_queue_strategy = entities.QueueStrategy(
+            full_strategy=entities.QueueFullStrategy(self.task_queue_strategy.value),
+            udf=_optional_entity(self.task_queue_udf),
+            udf_extra=self.task_queue_strategy_udf_extra
+        )
+        task_queue_strategy.max_size = math.inf if self.task_queue_max_size < 0 else self.task_queue_max_size
+        return entities.CronTask(
+            uuid=cast(entities.CronTaskUUID, self.uuid),
+            timepoints=[
+                entities.TimePoint(unit=entities.TimeUnit(timepoint['unit']), n=timepoint['n'], at=timepoint['at'])
+                for timepoint in self.timepoints
+            ],
+            func=self.func.to_entity(),
+            argument_generate_strategy=entities.ArgumentStrategy(
+                strategy=entities.ArgumentGenerateStrategy(self.argument_generate_strategy.value),
+                static_value=_optional_entity(self.argument_static_value),
+                argument_queue=_optional_entity(self.argument_queue),
+                udf=_optional_entity(self.argument_udf),
+                udf_extra=self.argument_generate_strategy_udf_extra
+            ),
+            worker_choose_strategy=entities.WorkerStrategy(
+                strategy=entities.WorkerChooseStrategy(self.worker_choose_strategy.value),
+                static_worker=None if self.static_worker is None else cast(
+                    entities.WorkerUUID, self.static_worker.uuid
+                ),
+                workers=self.worker_choose_strategy_worker_uuid_list,
+                worker_tags=self.worker_choose_strategy_worker_tags,
+                udf=_optional_entity(self.worker_choose_udf),
+                udf_extra=self.worker_choose_strategy_udf_extra
+            ),
+            task_queue_strategy=task_queue_strategy,
+            result_as_state=self.result_as_status,
+            timeout=self.timeout,
+            description=self.description or '',
+            disabled=self.disabled,
+            name=self.name,
+            tags=[tag.tag for tag in self.tags],
+            spread_window=self.spread_window,
+            version=self.version
+        )
+
+
+class SchedulerNode(Base, EntityConvertable[entities.SchedulerNode]):
+    __tablename__ = 'scheduler_node'
+    id = Column(Integer(), primary_key=True, autoincrement=True, nullable=False)
+    uuid = Column(String(36), nullable=False, unique=True)
+    cluster_id = Column(String(64), nullable=False, index=True)
+    host = Column(String(256), nullable=False)
+    port = Column(Integer(), nullable=False)
+    # node is a member of cluster until its membership expires
+    expire_time = Column(TIMESTAMP(), nullable=False)
+
+    def to_entity(self) -> _T:
+        return entities.SchedulerNode(
+            uuid=cast(entities.SchedulerNodeUUID, self.uuid),
+            host=self.host,
+            port=self.port
+        )
+
+
+class LeaderLease(Base):
+    __tablename__ = 'leader_lease'
+    id = Column(Integer(), primary_key=True, autoincrement=True, nullable=False)
+    cluster_id = Column(String(64), nullable=False, unique=True)
+    holder_uuid = Column(String(36), nullable=False)
+    # increased on every change of holder, fences off stale leaders
+    term = Column(BigInteger(), nullable=False)
+    expire_time = Column(TIMESTAMP(), nullable=False)
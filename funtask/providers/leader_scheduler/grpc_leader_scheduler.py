@@ -17,7 +17,10 @@ def _gen_stub(node: entities.SchedulerNode) -> scheduler_rpc.LeaderSchedulerStub
     return scheduler_rpc.LeaderSchedulerStub(channel)
 
 
-def _datetime2ms_timestamp(t: datetime) -> int:
+def _datetime2ms_timestamp(t: datetime | None) -> int:
+    # 0 means start now
+    if t is None:
+        return 0
     return int(t.timestamp() * 1000)
 
 
@@ -34,11 +37,33 @@ class GRPCLeaderScheduler(interface.LeaderSchedulerRPC):
             _datetime2ms_timestamp(start_time)
         ))
 
+    async def assign_tasks_to_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_tasks_uuid: List[entities.CronTaskUUID],
+            start_time: datetime | None = None
+    ):
+        stub = _gen_stub(node)
+        await stub.assign_tasks(scheduler_rpc.AssignTasksRequest(
+            cron_tasks_uuid,
+            _datetime2ms_timestamp(start_time)
+        ))
+
     async def get_node_task_list(self, node: entities.SchedulerNode) -> List[entities.CronTaskUUID]:
         stub = _gen_stub(node)
         resp = await stub.get_task_list(rpc_types.Empty())
         return cast(List[entities.CronTaskUUID], resp.cron_tasks_uuid)
 
+    async def get_node_load(self, node: entities.SchedulerNode) -> interface.SchedulerNodeLoad:
+        stub = _gen_stub(node)
+        resp = await stub.get_node_load(rpc_types.Empty())
+        return interface.SchedulerNodeLoad(
+            task_loads={
+                cast(entities.CronTaskUUID, task_load.cron_task_uuid): task_load.load for task_load in resp.task_loads
+            },
+            capacity=resp.capacity
+        )
+
     async def remove_task_from_node(
             self,
             node: entities.SchedulerNode,
@@ -50,3 +75,27 @@ class GRPCLeaderScheduler(interface.LeaderSchedulerRPC):
             cron_task_uuid,
             _datetime2ms_timestamp(start_time)
         ))
+
+    async def remove_tasks_from_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_tasks_uuid: List[entities.CronTaskUUID],
+            start_time: datetime | None = None
+    ):
+        stub = _gen_stub(node)
+        await stub.remove_tasks(scheduler_rpc.RemoveTasksRequest(
+            cron_tasks_uuid,
+            _datetime2ms_timestamp(start_time)
+        ))
+
+    async def invalidate_task_on_node(
+            self,
+            node: entities.SchedulerNode,
+            cron_task_uuid: entities.CronTaskUUID,
+            version: int
+    ):
+        stub = _gen_stub(node)
+        await stub.invalidate_task(scheduler_rpc.InvalidateTaskRequest(
+            cron_task_uuid,
+            version
+        ))
@@ -1,4 +1,5 @@
-from typing import List, cast
+import asyncio
+from typing import List, AsyncIterator, cast
 
 from funtask.core import interface_and_types as interface, entities
 
@@ -19,8 +20,13 @@ class MultiprocessingSchedulerControl(interface.LeaderSchedulerControl):
     async def is_he_leader(self, uuid: entities.SchedulerNodeUUID) -> bool:
         return uuid == self.leader_node.uuid
 
+    async def watch_leader(self) -> AsyncIterator[entities.SchedulerNode | None]:
+        yield self.leader_node
+        # static leader never changes
+        await asyncio.Event().wait()
+
     async def get_all_nodes(self) -> List[entities.SchedulerNode]:
-        ...
+        return [self.leader_node]
 
     async def get_cluster_id(self) -> entities.ClusterUUID:
         return cast(entities.ClusterUUID, 'multiprocessing')
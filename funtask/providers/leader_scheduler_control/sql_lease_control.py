@@ -0,0 +1,231 @@
+import asyncio
+from contextlib import suppress
+from datetime import datetime, timedelta
+from typing import List, Dict, AsyncIterator, cast
+
+from loguru import logger
+from sqlalchemy import case, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import select, update
+
+from funtask.core import interface_and_types as interface, entities
+from funtask.providers.db.sql import model
+from funtask.providers.db.sql.infrastructure import Repository
+
+# shortest sleep of lease keeper, avoids busy loop around lease expiry
+_MIN_WAKE = .01
+
+
+class SQLLeaseSchedulerControl(interface.LeaderSchedulerControl):
+    """
+    leader election by a lease row in SQL repository, leader renews it every renew interval and
+    other nodes take it over once it expired, so failover takes at most about one lease ttl.
+    nodes keep their membership rows alive the same way
+
+    leader, lease and members are cached by a background keeper between renewals, so reads of
+    leader status do not hit database. lease times come from node clocks, ttl should be well above
+    clock skew between nodes
+    """
+
+    def __init__(
+            self,
+            repository: Repository,
+            node: entities.SchedulerNode,
+            cluster_id: str = 'default',
+            lease_ttl: timedelta = timedelta(seconds=10),
+            renew_interval: timedelta | None = None
+    ):
+        self.repository = repository
+        self.node = node
+        self.cluster_id = cast(entities.ClusterUUID, cluster_id)
+        self.lease_ttl = lease_ttl
+        self.renew_interval = renew_interval or lease_ttl / 3
+        self.term = 0
+        self._leader: entities.SchedulerNode | None = None
+        self._lease_expire_time = datetime.min
+        self._nodes: Dict[entities.SchedulerNodeUUID, entities.SchedulerNode] = {}
+        self._synced = False
+        self._keeper: asyncio.Task | None = None
+        self._stopped = False
+        self._watchers: List[asyncio.Queue] = []
+
+    def _lease_valid(self, now: datetime) -> bool:
+        return self._leader is not None and now < self._lease_expire_time
+
+    def _ensure_keeper(self):
+        if self._stopped:
+            return
+        if self._keeper is None or self._keeper.done():
+            self._keeper = asyncio.create_task(self._keep())
+
+    async def _keep(self):
+        while True:
+            try:
+                await self._sync()
+            except Exception as e:
+                logger.opt(exception=e).warning("lease keeping of scheduler node {node} failed", node=self.node.uuid)
+            now = datetime.now()
+            wake = self.renew_interval
+            if self._leader is not None and self._leader.uuid != self.node.uuid:
+                # follower wakes when lease would expire to take it over at once
+                wake = min(wake, self._lease_expire_time - now)
+            await asyncio.sleep(max(wake.total_seconds(), _MIN_WAKE))
+
+    async def stop(self):
+        """
+        stop renewing, lease and membership expire after ttl
+        """
+        self._stopped = True
+        if self._keeper is None:
+            return
+        keeper, self._keeper = self._keeper, None
+        keeper.cancel()
+        with suppress(asyncio.CancelledError):
+            await keeper
+
+    async def _sync(self):
+        async with self.repository.session_ctx() as session:
+            await self._heart_beat(session)
+        await self._acquire_or_renew()
+
+    async def _heart_beat(self, session: AsyncSession):
+        now = datetime.now()
+        result = await session.execute(
+            update(model.SchedulerNode)
+            .where(model.SchedulerNode.uuid == self.node.uuid)
+            .values(
+                cluster_id=self.cluster_id,
+                host=self.node.host,
+                port=self.node.port,
+                expire_time=now + self.lease_ttl
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            session.add(model.SchedulerNode(
+                uuid=self.node.uuid,
+                cluster_id=self.cluster_id,
+                host=self.node.host,
+                port=self.node.port,
+                expire_time=now + self.lease_ttl
+            ))
+            await session.flush()
+        members = (await session.execute(
+            select(model.SchedulerNode).where(
+                model.SchedulerNode.cluster_id == self.cluster_id,
+                model.SchedulerNode.expire_time > now
+            ).order_by(model.SchedulerNode.uuid)
+        )).scalars().all()
+        self._nodes = {member.uuid: member.to_entity() for member in members}
+
+    async def _acquire_or_renew(self):
+        # expire time counts from before the write, cached lease never outlives the stored one
+        now = datetime.now()
+        expire_time = now + self.lease_ttl
+        try:
+            async with self.repository.session_ctx() as session:
+                session: AsyncSession
+                # take over expired lease or renew own one, term is set first as MySQL applies SET in order
+                await session.execute(
+                    update(model.LeaderLease)
+                    .where(
+                        model.LeaderLease.cluster_id == self.cluster_id,
+                        or_(
+                            model.LeaderLease.holder_uuid == self.node.uuid,
+                            model.LeaderLease.expire_time <= now
+                        )
+                    )
+                    .ordered_values(
+                        (model.LeaderLease.term, case(
+                            (model.LeaderLease.holder_uuid == self.node.uuid, model.LeaderLease.term),
+                            else_=model.LeaderLease.term + 1
+                        )),
+                        (model.LeaderLease.holder_uuid, self.node.uuid),
+                        (model.LeaderLease.expire_time, expire_time)
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                lease: model.LeaderLease | None = (await session.execute(
+                    select(model.LeaderLease).where(model.LeaderLease.cluster_id == self.cluster_id)
+                )).scalar_one_or_none()
+                if lease is None:
+                    lease = model.LeaderLease(
+                        cluster_id=self.cluster_id,
+                        holder_uuid=self.node.uuid,
+                        term=1,
+                        expire_time=expire_time
+                    )
+                    session.add(lease)
+                    await session.flush()
+        except IntegrityError:
+            # another node created the lease first
+            self._synced = False
+            return
+        self._set_lease(lease)
+
+    def _set_lease(self, lease: model.LeaderLease):
+        last_leader = self._leader
+        if lease.holder_uuid == self.node.uuid:
+            self._leader = self.node
+        else:
+            # leader not yet seen in membership is known by uuid only
+            self._leader = self._nodes.get(
+                cast(entities.SchedulerNodeUUID, lease.holder_uuid),
+                entities.SchedulerNode(uuid=cast(entities.SchedulerNodeUUID, lease.holder_uuid), host='', port=0)
+            )
+        self._lease_expire_time = lease.expire_time
+        self.term = lease.term
+        self._synced = True
+        if last_leader != self._leader:
+            logger.info(
+                "scheduler leader changed to {leader} in term {term}",
+                leader=self._leader.uuid,
+                term=self.term
+            )
+            for watcher in self._watchers:
+                watcher.put_nowait(self._leader)
+
+    async def _ensure_synced(self):
+        self._ensure_keeper()
+        if not self._synced and not self._stopped:
+            await self._sync()
+
+    async def get_leader(self) -> entities.SchedulerNode | None:
+        await self._ensure_synced()
+        if not self._lease_valid(datetime.now()):
+            return None
+        return self._leader
+
+    async def elect_leader(self, uuid: entities.SchedulerNodeUUID) -> bool:
+        """
+        only node itself can be elected, database is only touched once cached lease expired
+        """
+        if uuid != self.node.uuid:
+            return False
+        await self._ensure_synced()
+        if not self._lease_valid(datetime.now()):
+            await self._acquire_or_renew()
+        return await self.is_he_leader(uuid)
+
+    async def is_he_leader(self, uuid: entities.SchedulerNodeUUID) -> bool:
+        leader = await self.get_leader()
+        return leader is not None and leader.uuid == uuid
+
+    async def watch_leader(self) -> AsyncIterator[entities.SchedulerNode | None]:
+        await self._ensure_synced()
+        queue: asyncio.Queue[entities.SchedulerNode | None] = asyncio.Queue()
+        self._watchers.append(queue)
+        try:
+            yield await self.get_leader()
+            while True:
+                yield await queue.get()
+        finally:
+            self._watchers.remove(queue)
+
+    async def get_all_nodes(self) -> List[entities.SchedulerNode]:
+        await self._ensure_synced()
+        return list(self._nodes.values())
+
+    async def get_cluster_id(self) -> entities.ClusterUUID:
+        return self.cluster_id
@@ -1,11 +1,14 @@
+from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from funtask.core import interface_and_types as interface
 
 
 class MultiprocessingLock(interface.DistributeLock):
+    @asynccontextmanager
     async def lock(self, name: str, timeout: float | None = None) -> AsyncIterator[None]:
         yield
 
+    @asynccontextmanager
     async def try_lock(self, name: str) -> AsyncIterator[bool]:
         yield True
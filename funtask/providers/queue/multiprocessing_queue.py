@@ -1,14 +1,36 @@
 import asyncio
+import os
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import Queue as MltQueue
 from queue import Empty
-from typing import Dict, Generic
+from typing import Dict, Generic, List, Deque
 
 import dill
 
 from funtask.core.interface_and_types import Queue, _T, BreakRef
 from funtask.providers.queue.common import NeverBreak
 
+# threads waiting on queues, so blocking gets stay off the event loop
+_IO_THREADS = 64
+# seconds a waiting thread blocks before it checks break flag again
+_IO_POLL = .05
+# longest seconds a get holds a thread before giving it back to the pool
+_IO_SLICE = 1.
+
+_io_executor: ThreadPoolExecutor | None = None
+_io_executor_pid = 0
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor, _io_executor_pid
+    # threads of parent are gone in forked worker processes, every process gets its own pool
+    if _io_executor is None or _io_executor_pid != os.getpid():
+        _io_executor = ThreadPoolExecutor(_IO_THREADS, thread_name_prefix='queue-io')
+        _io_executor_pid = os.getpid()
+    return _io_executor
+
 
 class MultiprocessingQueueFactory:
     def __init__(self):
@@ -23,15 +45,64 @@ class MultiprocessingQueueFactory:
 
 
 class MultiprocessingQueue(Queue, Generic[_T]):
-    def __init__(self):
+    def __init__(self, io_thread: bool = True):
         self.q = MltQueue()
         self.type = 'multiprocessing'
         self.config = {}
+        # wait for items in io threads, otherwise poll on event loop, only for comparison in benchmarks
+        self.io_thread = io_thread
+        # items taken by io thread for a get cancelled meanwhile, served before queue
+        self._stash: Deque[bytes] = deque()
+        self._stash_pid = os.getpid()
+
+    def _local_stash(self) -> Deque[bytes]:
+        # items stashed by parent are served by parent, a forked worker process starts with an empty stash
+        if self._stash_pid != os.getpid():
+            self._stash = deque()
+            self._stash_pid = os.getpid()
+        return self._stash
 
     async def get_front(self) -> _T | None:
         raise NotImplementedError('multiprocessing queue not support get front')
 
+    def _wait_and_get(self, break_ref: BreakRef, until: float) -> bytes | None:
+        while (wait := min(_IO_POLL, until - time.monotonic())) > 0:
+            try:
+                return self.q.get(timeout=wait)
+            except Empty:
+                if break_ref.if_break_now():
+                    return None
+        return None
+
+    def _stash_taken(self, get: asyncio.Future):
+        if not get.cancelled() and get.exception() is None and get.result() is not None:
+            self._local_stash().append(get.result())
+
+    async def _thread_watch_and_get(self, break_ref: BreakRef, timeout: None | float = None) -> _T | None:
+        deadline = time.monotonic() + timeout if timeout else None
+        loop = asyncio.get_running_loop()
+        while not self._local_stash():
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return None
+            # waits are sliced so waiters beyond pool size get threads in turn
+            until = now + _IO_SLICE if deadline is None else min(deadline, now + _IO_SLICE)
+            get = loop.run_in_executor(_get_io_executor(), self._wait_and_get, break_ref, until)
+            try:
+                data = await asyncio.shield(get)
+            except asyncio.CancelledError:
+                # thread can not be interrupted, keep what it takes for next get
+                get.add_done_callback(self._stash_taken)
+                raise
+            if data is not None:
+                return dill.loads(data)
+            if break_ref.if_break_now():
+                return None
+        return dill.loads(self._local_stash().popleft())
+
     async def watch_and_get(self, break_ref: BreakRef, timeout: None | float = None) -> _T | None:
+        if self.io_thread:
+            return await self._thread_watch_and_get(break_ref, timeout)
         start_time = time.time()
         while True:
             if timeout and time.time() - start_time >= timeout:
@@ -49,8 +120,22 @@ class MultiprocessingQueue(Queue, Generic[_T]):
     async def get(self, timeout: None | float = None) -> _T | None:
         return await self.watch_and_get(NeverBreak(), timeout)
 
+    async def get_batch(self, max_size: int, timeout: None | float = None) -> List[_T]:
+        first = await self.get(timeout)
+        if first is None:
+            return []
+        objs = [first]
+        stash = self._local_stash()
+        while len(objs) < max_size:
+            try:
+                data = stash.popleft() if stash else self.q.get_nowait()
+            except Empty:
+                break
+            objs.append(dill.loads(data))
+        return objs
+
     async def qsize(self) -> int:
-        return self.q.qsize()
+        return self.q.qsize() + len(self._local_stash())
 
     async def empty(self) -> bool:
-        return self.q.empty()
+        return not self._local_stash() and self.q.empty()
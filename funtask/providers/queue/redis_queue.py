@@ -1,6 +1,6 @@
 import asyncio
 import time
-from typing import Generic, TypeVar
+from typing import Generic, TypeVar, List
 
 import dill
 
@@ -33,7 +33,11 @@ class RedisQueue(Queue, Generic[_T]):
         return kv_redis
 
     async def put(self, obj: _T):
-        await self.r.sadd(dill.dumps(obj))
+        await self.r.sadd(self.qid, dill.dumps(obj))
+
+    async def put_batch(self, objs: List[_T]):
+        if objs:
+            await self.r.sadd(self.qid, *(dill.dumps(obj) for obj in objs))
 
     async def get(self, timeout: None | float = None) -> _T | None:
         return await self.watch_and_get(NeverBreak(), timeout)
@@ -43,7 +47,7 @@ class RedisQueue(Queue, Generic[_T]):
         while True:
             if timeout and time.time() - start_time >= timeout:
                 return None
-            content = self.r.spop(self.qid)
+            content = await self.r.spop(self.qid)
             if break_ref.if_break_now():
                 return None
             if content is None:
@@ -55,4 +59,4 @@ class RedisQueue(Queue, Generic[_T]):
         return await self.r.scard(self.qid)
 
     async def empty(self) -> bool:
-        return not self.qsize()
+        return not await self.qsize()
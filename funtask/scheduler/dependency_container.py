@@ -1,14 +1,19 @@
+from datetime import timedelta
+
 from dependency_injector import containers, providers
 
 from funtask.providers.leader_scheduler.grpc_leader_scheduler import GRPCLeaderScheduler
 from funtask.providers.leader_scheduler_control.multiprocessing_control import MultiprocessingSchedulerControl
+from funtask.providers.leader_scheduler_control.sql_lease_control import SQLLeaseSchedulerControl
 from funtask.scheduler.scheduler_service import SchedulerService
 from funtask.core import entities
 from funtask.providers.cron.schedule_cron import SchedulerCron
+from funtask.providers.cron.heap_cron import HeapCron
 from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueueFactory
 from funtask.providers.lock.multiprocessing_lock import MultiprocessingLock
 from funtask.providers.db.sql import infrastructure
 from funtask.task_worker_manager import manager_rpc_client
+from funtask.task_worker_manager.worker_directory import WorkerDirectory
 
 
 class SchedulerContainer(containers.DeclarativeContainer):
@@ -19,24 +24,34 @@ class SchedulerContainer(containers.DeclarativeContainer):
         host=config.curr_node.host,
         port=config.curr_node.port
     )
+    repository = providers.Singleton(
+        infrastructure.Repository,
+        uri=config.sql.uri
+    )
     manager_rpc = providers.Singleton(
         manager_rpc_client.ManagerRPCClient,
         rpc_chooser=providers.Selector(
             config.rpc_chooser.type,
             hash=providers.Singleton(
                 manager_rpc_client.HashRPChooser,
-                nodes=[]
+                nodes=providers.Factory(
+                    manager_rpc_client.nodes_generator,
+                    config.task_worker_manager_nodes
+                )
             )
+        ),
+        worker_directory=providers.Singleton(
+            WorkerDirectory,
+            repository=repository
         )
     )
-    repository = providers.Singleton(
-        infrastructure.Repository,
-        uri=config.sql.uri
-    )
     cron = providers.Selector(
         config.cron_scheduler.type,
         schedule=providers.Factory(
             SchedulerCron
+        ),
+        heap=providers.Singleton(
+            HeapCron
         )
     )
     argument_queue_factory = providers.Selector(
@@ -62,6 +77,13 @@ class SchedulerContainer(containers.DeclarativeContainer):
                 host=config.control.leader_node.host,
                 uuid=config.control.leader_node.uuid,
             )
+        ),
+        sql_lease=providers.Singleton(
+            SQLLeaseSchedulerControl,
+            repository=repository,
+            node=node,
+            cluster_id=config.control.cluster_id,
+            lease_ttl=providers.Factory(timedelta, seconds=config.control.lease_ttl)
         )
     )
     scheduler = providers.Singleton(
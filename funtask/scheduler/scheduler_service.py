@@ -1,3 +1,72 @@
+from typing import cast
+
+from grpclib.server import Server
+from loguru import logger
+
+from funtask.core import interface_and_types as interface, entities
 from funtask.core.scheduler import Scheduler
+from funtask.generated import Empty
+from funtask.generated.scheduler import LeaderSchedulerBase, AssignTaskRequest, GetTaskListResponse, \
+    RemoveTaskRequest, AssignTasksRequest, RemoveTasksRequest, GetNodeLoadResponse, CronTaskLoad, \
+    InvalidateTaskRequest
+
+
+class SchedulerRPCService(LeaderSchedulerBase):
+    """
+    rpcs of leader scheduler to worker scheduler of this node, start time of requests is not used,
+    assigned tasks are scheduled at once
+    """
+
+    def __init__(self, worker_scheduler: interface.WorkerScheduler):
+        self.worker_scheduler = worker_scheduler
+
+    async def assign_task(self, assign_task_request: "AssignTaskRequest") -> "Empty":
+        await self.worker_scheduler.assign_cron_task(cast(entities.CronTaskUUID, assign_task_request.cron_task_uuid))
+        return Empty()
+
+    async def get_task_list(self, empty: "Empty") -> "GetTaskListResponse":
+        return GetTaskListResponse(await self.worker_scheduler.get_all_cron_task())
+
+    async def remove_task(self, remove_task_request: "RemoveTaskRequest") -> "Empty":
+        await self.worker_scheduler.remove_cron_task(cast(entities.CronTaskUUID, remove_task_request.cron_task_uuid))
+        return Empty()
+
+    async def invalidate_task(self, invalidate_task_request: "InvalidateTaskRequest") -> "Empty":
+        await self.worker_scheduler.invalidate_cron_task(
+            cast(entities.CronTaskUUID, invalidate_task_request.cron_task_uuid),
+            invalidate_task_request.version
+        )
+        return Empty()
+
+    async def assign_tasks(self, assign_tasks_request: "AssignTasksRequest") -> "Empty":
+        for cron_task_uuid in assign_tasks_request.cron_tasks_uuid:
+            await self.worker_scheduler.assign_cron_task(cast(entities.CronTaskUUID, cron_task_uuid))
+        return Empty()
+
+    async def remove_tasks(self, remove_tasks_request: "RemoveTasksRequest") -> "Empty":
+        for cron_task_uuid in remove_tasks_request.cron_tasks_uuid:
+            await self.worker_scheduler.remove_cron_task(cast(entities.CronTaskUUID, cron_task_uuid))
+        return Empty()
+
+    async def get_node_load(self, empty: "Empty") -> "GetNodeLoadResponse":
+        load = await self.worker_scheduler.get_node_load()
+        return GetNodeLoadResponse(
+            [CronTaskLoad(task_uuid, task_load) for task_uuid, task_load in load.task_loads.items()],
+            load.capacity
+        )
+
 
-SchedulerService = Scheduler
+class SchedulerService(Scheduler):
+    async def run(self):
+        server = Server([SchedulerRPCService(self.worker_scheduler)])
+        logger.opt(colors=True).info(
+            "starting grpc service <cyan>{address}:{port}</cyan>",
+            address=self.self_node.host,
+            port=self.self_node.port
+        )
+        await server.start(self.self_node.host, self.self_node.port)
+        try:
+            await super().run()
+        finally:
+            server.close()
+            await server.wait_closed()
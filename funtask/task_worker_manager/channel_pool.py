@@ -0,0 +1,87 @@
+import time
+from typing import Dict, Tuple, Any, List
+
+from grpclib.client import Channel
+
+# channels are keyed by node address, a node moved to another address gets a new channel
+_NodeKey = Tuple[Any, str, int]
+
+
+def _node_key(node: Any) -> _NodeKey:
+    return node.uuid, node.host, node.port
+
+
+def _open_streams(channel: Channel) -> int:
+    protocol = channel._protocol
+    if protocol is None:
+        return 0
+    return len(protocol.processor.streams)
+
+
+def _connection_lost(channel: Channel) -> bool:
+    # never connected channel is healthy, it connects on first request
+    return channel._protocol is not None and not channel._connected
+
+
+class _PooledChannel:
+    __slots__ = ('channel', 'last_used')
+
+    def __init__(self, channel: Channel):
+        self.channel = channel
+        self.last_used = time.monotonic()
+
+
+class ChannelPool:
+    """
+    one reusable channel per node, requests to a node share its http2 connection.
+    channels whose connection is lost are replaced on next use, channels idle for idle timeout
+    without open streams are closed by sweeps that run at most every health check interval
+    """
+
+    def __init__(self, idle_timeout: float = 300., health_check_interval: float = 30.):
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._channels: Dict[_NodeKey, _PooledChannel] = {}
+        self._last_sweep = time.monotonic()
+
+    def __len__(self):
+        return len(self._channels)
+
+    def get(self, node: Any) -> Channel:
+        now = time.monotonic()
+        if now - self._last_sweep >= self.health_check_interval:
+            self.sweep(now)
+        key = _node_key(node)
+        pooled = self._channels.get(key)
+        if pooled is None or _connection_lost(pooled.channel):
+            if pooled is not None:
+                pooled.channel.close()
+            pooled = self._channels[key] = _PooledChannel(Channel(host=node.host, port=node.port))
+        pooled.last_used = now
+        return pooled.channel
+
+    def sweep(self, now: float | None = None):
+        """
+        close channels with lost connection and idle channels without open streams
+        """
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        for key, pooled in list(self._channels.items()):
+            idle = now - pooled.last_used >= self.idle_timeout and not _open_streams(pooled.channel)
+            if idle or _connection_lost(pooled.channel):
+                del self._channels[key]
+                pooled.channel.close()
+
+    def retain(self, nodes: List[Any]):
+        """
+        close channels of nodes not in nodes
+        """
+        keys = {_node_key(node) for node in nodes}
+        for key in list(self._channels):
+            if key not in keys:
+                self._channels.pop(key).channel.close()
+
+    def close(self):
+        for pooled in self._channels.values():
+            pooled.channel.close()
+        self._channels = {}
@@ -44,5 +44,6 @@ class TaskWorkerManagerContainer(containers.DeclarativeContainer):
                 task_status_queue=task_status_queue
             )
         ),
-        task_status_queue=task_status_queue
+        task_status_queue=task_status_queue,
+        status_compaction_window=config.manager.status_compaction_window
     )
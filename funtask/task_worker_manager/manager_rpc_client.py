@@ -1,11 +1,41 @@
-from typing import List, cast, AsyncIterator
+import asyncio
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from collections import deque
+from typing import List, cast, AsyncIterator, Dict, Any, Tuple, AsyncIterable, TypeVar, Callable, Awaitable, \
+    Deque
 from uuid import uuid4
 from grpclib.client import Channel
+from loguru import logger
 
 from funtask.generated import manager as task_worker_manager_rpc
 from funtask import generated as types
 from funtask.core import interface_and_types as interface, entities
 from funtask.core.interface_and_types import StatusReport, NoNodeException
+from funtask.common.grpc import rpc_status2core_status
+from funtask.utils.hashing import HashRing
+from funtask.task_worker_manager.channel_pool import ChannelPool
+from funtask.task_worker_manager.node_health import NodeHealthTracker
+from funtask.task_worker_manager.status_fan_in import StatusFanIn
+from funtask.task_worker_manager.worker_directory import WorkerDirectory
+
+
+# reconnect delay of status streams, doubled on every failure in a row
+_STATUS_RECONNECT_MIN_DELAY = .1
+_STATUS_RECONNECT_MAX_DELAY = 5.
+
+
+_T = TypeVar('_T')
+
+
+def nodes_generator(nodes: List[Dict[str, str | int]]) -> List[entities.TaskWorkerManagerNode]:
+    return [entities.TaskWorkerManagerNode(
+        uuid=cast(entities.TaskWorkerManagerNodeUUID, node['uuid']),
+        host=node['host'],
+        port=node['port']
+    ) for node in nodes]
 
 
 def bytes_uuid() -> bytes:
@@ -21,84 +51,546 @@ async def get_rpc(
 
 
 class HashRPChooser(interface.RPCChannelChooser[Channel]):
-    def __init__(self, nodes: List[entities.TaskWorkerManagerNode | entities.SchedulerNode]):
+    def __init__(
+            self,
+            nodes: List[entities.TaskWorkerManagerNode | entities.SchedulerNode],
+            pooled: bool = True,
+            idle_timeout: float = 300.,
+            health_check_interval: float = 30.,
+            vnodes: int = 64,
+            failure_threshold: float = .5,
+            open_timeout: float = 10.
+    ):
+        self.vnodes = vnodes
+        self.health = NodeHealthTracker(failure_threshold=failure_threshold, open_timeout=open_timeout)
+        self._node_watchers: List[asyncio.Queue] = []
+        self._set_nodes(nodes)
+        # without pool every rpc opens a new connection, only for comparison in benchmarks
+        self.channel_pool = ChannelPool(idle_timeout, health_check_interval) if pooled else None
+
+    def _set_nodes(self, nodes: List[entities.TaskWorkerManagerNode | entities.SchedulerNode]):
         self.nodes = nodes
+        self._uuid2node = {node.uuid: node for node in nodes}
+        self._ring = HashRing([node.uuid for node in nodes], self.vnodes)
+        self.health.retain(self._uuid2node)
+        for watcher in self._node_watchers:
+            watcher.put_nowait(list(nodes))
 
     def channel_node_changes(self, nodes: List[entities.TaskWorkerManagerNode | entities.SchedulerNode]):
-        self.nodes = nodes
+        self._set_nodes(nodes)
+        if self.channel_pool is not None:
+            self.channel_pool.retain(nodes)
 
-    async def get_channel(self, key: bytes | None = None) -> Channel:
+    def close(self):
+        if self.channel_pool is not None:
+            self.channel_pool.close()
+
+    async def get_node(self, key: bytes | None = None) -> entities.TaskWorkerManagerNode | entities.SchedulerNode:
+        if not len(self.nodes):
+            raise NoNodeException('no rpc node for channel')
+
+        if key is None:
+            return random.choice(self.nodes)
+        return self._uuid2node[self._ring.get(key)]
+
+    async def get_placement_node(self) -> entities.TaskWorkerManagerNode | entities.SchedulerNode:
+        """
+        half open node gets a probe first, otherwise the faster of two random closed nodes,
+        new state is shed with NoNodeException while every node is open
+        """
         if not len(self.nodes):
             raise NoNodeException('no rpc node for channel')
+        now = time.monotonic()
+        closed = []
+        for node in random.sample(self.nodes, len(self.nodes)):
+            state = self.health.state(node.uuid, now)
+            if state is interface.CircuitState.CLOSED:
+                closed.append(node)
+            elif state is interface.CircuitState.HALF_OPEN and self.health.allow(node.uuid, now):
+                return node
+        if not closed:
+            raise NoNodeException('no healthy rpc node for channel')
+        return min(closed[:2], key=lambda node: self.health.latency(node.uuid))
+
+    def report(self, node: entities.TaskWorkerManagerNode | entities.SchedulerNode, latency: float, ok: bool):
+        self.health.record(node.uuid, latency, ok)
+
+    def get_nodes_health(self) -> Dict[Any, interface.NodeHealth]:
+        return self.health.health()
+
+    def get_all_nodes(self) -> List[entities.TaskWorkerManagerNode | entities.SchedulerNode]:
+        return list(self.nodes)
+
+    async def watch_nodes(self) -> AsyncIterator[List[entities.TaskWorkerManagerNode | entities.SchedulerNode]]:
+        queue: asyncio.Queue[List[entities.TaskWorkerManagerNode | entities.SchedulerNode]] = asyncio.Queue()
+        self._node_watchers.append(queue)
+        try:
+            yield self.get_all_nodes()
+            while True:
+                yield await queue.get()
+        finally:
+            self._node_watchers.remove(queue)
+
+    async def get_node_channel(self, node: entities.TaskWorkerManagerNode | entities.SchedulerNode) -> Channel:
+        if self.channel_pool is None:
+            return Channel(host=node.host, port=node.port)
+        return self.channel_pool.get(node)
+
+    async def get_channel(self, key: bytes | None = None) -> Channel:
+        node = await self.get_node(key)
+        return await self.get_node_channel(node)
+
+
+def _rpc_loads2loads(
+        res: task_worker_manager_rpc.GetWorkersLoadResponse
+) -> Dict[entities.WorkerUUID, interface.WorkerLoad]:
+    return {
+        cast(entities.WorkerUUID, load.worker_uuid): interface.WorkerLoad(load.queued, load.running, load.throughput)
+        for load in res.loads
+    }
+
+
+def _rpc_status2status(status_report: types.StatusReport) -> StatusReport:
+    return StatusReport(
+        task_uuid=cast(entities.TaskUUID, status_report.task_uuid),
+        worker_uuid=cast(entities.WorkerUUID, status_report.worker_uuid),
+        status=rpc_status2core_status(status_report),
+        content=status_report.serialized_content,
+        create_timestamp=status_report.create_timestamp
+    )
 
-        node_idx = hash(key) % len(self.nodes)
-        node = self.nodes[node_idx]
-        return Channel(host=node.host, port=node.port)
+
+def _dispatch_request(dispatch: interface.FunTaskDispatch) -> task_worker_manager_rpc.DispatchFunTaskRequest:
+    argument = dispatch.argument
+    return task_worker_manager_rpc.DispatchFunTaskRequest(
+        dispatch.worker_uuid,
+        dispatch.func_task,
+        dispatch.dependencies,
+        dispatch.change_status,
+        dispatch.timeout,
+        argument and types.Args(
+            argument.args,
+            [types.KwArgs(k, v) for k, v in argument.kwargs]
+        )
+    )
+
+
+def _dispatch_result2task_uuid(
+        dispatch: interface.FunTaskDispatch,
+        result: task_worker_manager_rpc.DispatchFunTaskResult
+) -> entities.TaskUUID | None:
+    if result.error:
+        logger.error(
+            "dispatch task to worker {worker} failed: {error}",
+            worker=dispatch.worker_uuid,
+            error=result.error
+        )
+        return None
+    return cast(entities.TaskUUID, result.task.uuid)
+
+
+async def _iter_queue(queue: 'asyncio.Queue[_T | None]') -> AsyncIterator[_T]:
+    while (item := await queue.get()) is not None:
+        yield item
 
 
 class ManagerRPCClient(interface.FunTaskManagerRPC):
-    def __init__(self, rpc_chooser: interface.RPCChannelChooser[Channel]):
+    def __init__(
+            self,
+            rpc_chooser: interface.RPCChannelChooser[Channel],
+            worker_directory: WorkerDirectory | None = None,
+            status_batch_size: int = 256,
+            status_batch_delay: float = .005
+    ):
         self.rpc_chooser = rpc_chooser
+        self.worker_directory = worker_directory or WorkerDirectory()
+        # frames of status streams carry up to batch size statuses, delay bounds how long managers fill them
+        self.status_batch_size = status_batch_size
+        self.status_batch_delay = status_batch_delay
+        # fan in of current watch_status, source of stream lags
+        self._status_fan_in: StatusFanIn | None = None
+
+    async def _worker_nodes(
+            self,
+            workers_uuid: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, entities.TaskWorkerManagerNode]:
+        """
+        owning node of each worker from directory, workers of unknown or gone nodes fall back to hash of worker uuid
+        """
+        located = await self.worker_directory.get_many(workers_uuid)
+        nodes = {node.uuid: node for node in self.rpc_chooser.get_all_nodes()}
+        worker_nodes = {}
+        for worker_uuid in workers_uuid:
+            node = nodes.get(located.get(worker_uuid))
+            if node is None:
+                node = await self.rpc_chooser.get_node(worker_uuid.encode())
+            worker_nodes[worker_uuid] = node
+        return worker_nodes
+
+    @asynccontextmanager
+    async def _track(self, node: entities.TaskWorkerManagerNode):
+        """
+        report latency and result of rpcs in context to chooser
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.rpc_chooser.report(node, time.perf_counter() - start, False)
+            raise
+        self.rpc_chooser.report(node, time.perf_counter() - start, True)
+
+    async def _worker_rpc(
+            self,
+            worker_uuid: entities.WorkerUUID
+    ) -> Tuple[entities.TaskWorkerManagerNode, task_worker_manager_rpc.TaskWorkerManagerStub]:
+        node = (await self._worker_nodes([worker_uuid]))[worker_uuid]
+        return node, task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
+
+    async def get_worker_node(self, worker_uuid: entities.WorkerUUID) -> entities.TaskWorkerManagerNodeUUID | None:
+        return await self.worker_directory.get(worker_uuid)
+
+    async def _new_worker_rpc(self) -> Tuple[entities.TaskWorkerManagerNode, task_worker_manager_rpc.TaskWorkerManagerStub]:
+        node = await self.rpc_chooser.get_placement_node()
+        return node, task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
 
     async def increase_workers(self, number: int | None = None) -> List[entities.WorkerUUID]:
-        rpc = await get_rpc(self.rpc_chooser, bytes_uuid())
-        res = await rpc.increase_workers(task_worker_manager_rpc.IncreaseWorkersRequest(number))
-        return [cast(entities.WorkerUUID, worker.uuid) for worker in res.workers]
+        node, rpc = await self._new_worker_rpc()
+        async with self._track(node):
+            res = await rpc.increase_workers(task_worker_manager_rpc.IncreaseWorkersRequest(number))
+        workers_uuid = [cast(entities.WorkerUUID, worker.uuid) for worker in res.workers]
+        for worker_uuid in workers_uuid:
+            self.worker_directory.set(worker_uuid, node.uuid)
+        return workers_uuid
 
     async def increase_worker(self) -> entities.WorkerUUID:
-        rpc = await get_rpc(self.rpc_chooser, bytes_uuid())
-        res = await rpc.increase_worker(task_worker_manager_rpc.IncreaseWorkerRequest())
-        return cast(entities.WorkerUUID, res.worker.uuid)
+        node, rpc = await self._new_worker_rpc()
+        async with self._track(node):
+            res = await rpc.increase_worker(task_worker_manager_rpc.IncreaseWorkerRequest())
+        worker_uuid = cast(entities.WorkerUUID, res.worker.uuid)
+        self.worker_directory.set(worker_uuid, node.uuid)
+        return worker_uuid
 
     async def dispatch_fun_task(self, worker_uuid: entities.WorkerUUID, func_task: bytes, dependencies: List[str],
                                 change_status: bool, timeout: float,
                                 argument: entities.FuncArgument | None) -> entities.TaskUUID:
-        rpc = await get_rpc(self.rpc_chooser, worker_uuid.encode())
-        res = await rpc.dispatch_fun_task(task_worker_manager_rpc.DispatchFunTaskRequest(
-            worker_uuid,
-            func_task,
-            dependencies,
-            change_status,
-            timeout,
-            argument and types.Args(
-                argument.args,
-                [types.KwArgs(k, v) for k, v in argument.kwargs]
-            )
-        ))
+        node, rpc = await self._worker_rpc(worker_uuid)
+        async with self._track(node):
+            res = await rpc.dispatch_fun_task(_dispatch_request(interface.FunTaskDispatch(
+                worker_uuid,
+                func_task,
+                dependencies,
+                change_status,
+                timeout,
+                argument
+            )))
         return cast(entities.TaskUUID, res.task.uuid)
 
+    async def _dispatch_to_node(
+            self,
+            node: entities.TaskWorkerManagerNode,
+            dispatches: List[Tuple[int, interface.FunTaskDispatch]]
+    ) -> List[Tuple[int, entities.TaskUUID | None]]:
+        rpc = task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
+        try:
+            async with self._track(node):
+                res = await rpc.dispatch_fun_tasks(task_worker_manager_rpc.DispatchFunTasksRequest(
+                    [_dispatch_request(dispatch) for _, dispatch in dispatches]
+                ))
+        except Exception as e:
+            logger.opt(exception=e).error("dispatch tasks to node {node} failed", node=node.uuid)
+            return [(idx, None) for idx, _ in dispatches]
+        return [
+            (idx, _dispatch_result2task_uuid(dispatch, result))
+            for (idx, dispatch), result in zip(dispatches, res.results)
+        ]
+
+    async def dispatch_fun_tasks(
+            self,
+            dispatches: List[interface.FunTaskDispatch]
+    ) -> List[entities.TaskUUID | None]:
+        worker_nodes = await self._worker_nodes(list({dispatch.worker_uuid for dispatch in dispatches}))
+        nodes: Dict[Any, entities.TaskWorkerManagerNode] = {}
+        node_dispatches: Dict[Any, List[Tuple[int, interface.FunTaskDispatch]]] = {}
+        for idx, dispatch in enumerate(dispatches):
+            node = worker_nodes[dispatch.worker_uuid]
+            nodes[node.uuid] = node
+            node_dispatches.setdefault(node.uuid, []).append((idx, dispatch))
+        results: List[entities.TaskUUID | None] = [None] * len(dispatches)
+        for node_results in await asyncio.gather(*(
+                self._dispatch_to_node(nodes[node_uuid], each_node_dispatches)
+                for node_uuid, each_node_dispatches in node_dispatches.items()
+        )):
+            for idx, task_uuid in node_results:
+                results[idx] = task_uuid
+        return results
+
+    @staticmethod
+    async def _stream_dispatch_to_node(
+            rpc: task_worker_manager_rpc.TaskWorkerManagerStub,
+            requests: 'asyncio.Queue[task_worker_manager_rpc.DispatchFunTasksRequest | None]',
+            dispatches: Deque[Tuple[int, interface.FunTaskDispatch]],
+            results: Dict[int, entities.TaskUUID | None]
+    ):
+        # node answers every batch in order, answered dispatches are dropped at once
+        async for res in rpc.stream_dispatch_fun_tasks(_iter_queue(requests)):
+            for result in res.results:
+                idx, dispatch = dispatches.popleft()
+                results[idx] = _dispatch_result2task_uuid(dispatch, result)
+
+    async def stream_dispatch_fun_tasks(
+            self,
+            batches: AsyncIterable[List[interface.FunTaskDispatch]]
+    ) -> List[entities.TaskUUID | None]:
+        # requests of each node stream, None closes it
+        node_requests: Dict[Any, asyncio.Queue[task_worker_manager_rpc.DispatchFunTasksRequest | None]] = {}
+        node_calls: Dict[Any, asyncio.Task] = {}
+        node_dispatches: Dict[Any, Deque[Tuple[int, interface.FunTaskDispatch]]] = {}
+        results: Dict[int, entities.TaskUUID | None] = {}
+        n = 0
+        try:
+            async for batch in batches:
+                worker_nodes = await self._worker_nodes(list({dispatch.worker_uuid for dispatch in batch}))
+                batch_requests: Dict[Any, List[task_worker_manager_rpc.DispatchFunTaskRequest]] = {}
+                for dispatch in batch:
+                    node = worker_nodes[dispatch.worker_uuid]
+                    if node.uuid not in node_calls:
+                        rpc = task_worker_manager_rpc.TaskWorkerManagerStub(
+                            await self.rpc_chooser.get_node_channel(node)
+                        )
+                        requests = node_requests[node.uuid] = asyncio.Queue()
+                        node_dispatches[node.uuid] = deque()
+                        node_calls[node.uuid] = asyncio.create_task(self._stream_dispatch_to_node(
+                            rpc, requests, node_dispatches[node.uuid], results
+                        ))
+                    batch_requests.setdefault(node.uuid, []).append(_dispatch_request(dispatch))
+                    node_dispatches[node.uuid].append((n, dispatch))
+                    n += 1
+                for node_uuid, requests in batch_requests.items():
+                    node_requests[node_uuid].put_nowait(task_worker_manager_rpc.DispatchFunTasksRequest(requests))
+        except BaseException:
+            # batches failed, node streams are abandoned rather than left running
+            for call in node_calls.values():
+                call.cancel()
+            await asyncio.gather(*node_calls.values(), return_exceptions=True)
+            raise
+        for requests in node_requests.values():
+            requests.put_nowait(None)
+        for node_uuid, call in node_calls.items():
+            try:
+                await call
+            except Exception as e:
+                logger.opt(exception=e).error("dispatch task stream to node {node} failed", node=node_uuid)
+        return [results.get(idx) for idx in range(n)]
+
     async def stop_task(self, worker_uuid: entities.WorkerUUID, task_uuid: entities.TaskUUID):
-        rpc = await get_rpc(self.rpc_chooser, (worker_uuid + task_uuid).encode())
-        await rpc.stop_task(task_worker_manager_rpc.StopTaskRequest(
-            worker_uuid,
-            task_uuid
-        ))
+        node, rpc = await self._worker_rpc(worker_uuid)
+        async with self._track(node):
+            await rpc.stop_task(task_worker_manager_rpc.StopTaskRequest(
+                worker_uuid,
+                task_uuid
+            ))
 
     async def stop_worker(self, worker_uuid: entities.WorkerUUID):
-        rpc = await get_rpc(self.rpc_chooser, worker_uuid.encode())
-        await rpc.stop_worker(task_worker_manager_rpc.StopWorkerRequest(
-            worker_uuid
-        ))
+        node, rpc = await self._worker_rpc(worker_uuid)
+        async with self._track(node):
+            await rpc.stop_worker(task_worker_manager_rpc.StopWorkerRequest(
+                worker_uuid
+            ))
+        self.worker_directory.invalidate(worker_uuid)
 
     async def kill_worker(self, worker_uuid: entities.WorkerUUID):
-        rpc = await get_rpc(self.rpc_chooser, worker_uuid.encode())
-        await rpc.kill_worker(task_worker_manager_rpc.KillWorkerRequest(worker_uuid))
+        node, rpc = await self._worker_rpc(worker_uuid)
+        async with self._track(node):
+            await rpc.kill_worker(task_worker_manager_rpc.KillWorkerRequest(worker_uuid))
+        self.worker_directory.invalidate(worker_uuid)
+
+    async def _stream_node_status(
+            self,
+            node: entities.TaskWorkerManagerNode,
+            fan_in: StatusFanIn,
+            timeout: float | None = None
+    ) -> int:
+        """
+        read status stream of node into fan in until it ends
+        :return: number of statuses read
+        """
+        n = 0
+        rpc = task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
+        fan_in.set_connected(node.uuid, True)
+        request = task_worker_manager_rpc.GetQueuedStatusesRequest(self.status_batch_size, self.status_batch_delay)
+        try:
+            async for res in rpc.get_queued_statuses(request, timeout=timeout):
+                n += len(res.status_reports)
+                for status_report in res.status_reports:
+                    # blocks while buffer of node is full, stream is not read and http2 flow control holds the server
+                    await fan_in.put(node.uuid, _rpc_status2status(status_report))
+        finally:
+            fan_in.set_connected(node.uuid, False)
+        return n
+
+    async def _poll_node_status(self, node: entities.TaskWorkerManagerNode, fan_in: StatusFanIn, timeout: float):
+        try:
+            await self._stream_node_status(node, fan_in, timeout)
+        except Exception:
+            # deadline of poll ends the stream
+            ...
 
     async def get_queued_status(self, timeout: None | float = None) -> AsyncIterator[StatusReport]:
-        rpc = await get_rpc(self.rpc_chooser, bytes_uuid())
+        fan_in = StatusFanIn(sys.maxsize)
+        nodes = self.rpc_chooser.get_all_nodes()
+        for node in nodes:
+            fan_in.add_node(node.uuid)
+        polls = asyncio.gather(*(self._poll_node_status(node, fan_in, timeout) for node in nodes))
+        try:
+            while True:
+                get = asyncio.ensure_future(fan_in.get())
+                await asyncio.wait({get, polls}, return_when=asyncio.FIRST_COMPLETED)
+                if get.done():
+                    yield get.result()
+                    continue
+                get.cancel()
+                while (status := fan_in.get_nowait()) is not None:
+                    yield status
+                break
+        finally:
+            polls.cancel()
+        yield None
+
+    async def _watch_node_status(
+            self,
+            node: entities.TaskWorkerManagerNode,
+            fan_in: StatusFanIn,
+            stopped: asyncio.Event
+    ):
+        backoff = _STATUS_RECONNECT_MIN_DELAY
+        while not stopped.is_set():
+            try:
+                if await self._stream_node_status(node, fan_in):
+                    backoff = _STATUS_RECONNECT_MIN_DELAY
+            except Exception as e:
+                logger.opt(exception=e).warning("status stream of node {node} failed", node=node.uuid)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, _STATUS_RECONNECT_MAX_DELAY)
+
+    async def _follow_nodes(
+            self,
+            watch_node: Callable[[entities.TaskWorkerManagerNode, asyncio.Event], Awaitable[None]],
+            subject: str
+    ):
+        """
+        keep one watch per manager node, watches start for added nodes and are stopped for removed ones.
+        a watch gets an event set on stop, as grpc streams may turn cancellation into a connection error
+        """
+        watches: Dict[Any, Tuple[asyncio.Task, asyncio.Event]] = {}
+
+        def stop(node_uuid: Any):
+            watch, stopped = watches.pop(node_uuid)
+            stopped.set()
+            watch.cancel()
+
         try:
-            async for res in rpc.get_queued_status(task_worker_manager_rpc.Empty(), timeout=timeout):
-                status_report = res.status_report
-                yield StatusReport(
-                    task_uuid=cast(entities.TaskUUID, status_report.task_uuid),
-                    worker_uuid=cast(entities.WorkerUUID, status_report.worker_uuid),
-                    status=status_report.task_status or status_report.worker_status,  # type: ignore
-                    content=status_report.serialized_content,
-                    create_timestamp=status_report.create_timestamp
-                )
-        except:
-            yield None
+            async for nodes in self.rpc_chooser.watch_nodes():
+                if not nodes:
+                    logger.error("no task worker manager node to watch {subject} of", subject=subject)
+                current = {node.uuid: node for node in nodes}
+                for node_uuid in [node_uuid for node_uuid in watches if node_uuid not in current]:
+                    stop(node_uuid)
+                for node_uuid, node in current.items():
+                    if node_uuid not in watches:
+                        stopped = asyncio.Event()
+                        watches[node_uuid] = asyncio.create_task(watch_node(node, stopped)), stopped
+        finally:
+            for node_uuid in list(watches):
+                stop(node_uuid)
+
+    async def watch_status(self, buffer_size: int = 1024) -> AsyncIterator[StatusReport]:
+        fan_in = self._status_fan_in = StatusFanIn(buffer_size)
+
+        async def watch_node(node: entities.TaskWorkerManagerNode, stopped: asyncio.Event):
+            fan_in.add_node(node.uuid)
+            await self._watch_node_status(node, fan_in, stopped)
+
+        follower = asyncio.create_task(self._follow_nodes(watch_node, 'statuses'))
+        try:
+            while True:
+                yield await fan_in.get()
+        finally:
+            follower.cancel()
+
+    def get_status_lags(self) -> Dict[Any, interface.StatusStreamLag]:
+        if self._status_fan_in is None:
+            return {}
+        return self._status_fan_in.lags()
+
+    def get_nodes_health(self) -> Dict[Any, interface.NodeHealth]:
+        return self.rpc_chooser.get_nodes_health()
 
     async def get_task_queue_size(self, worker: entities.WorkerUUID) -> int:
-        rpc = await get_rpc(self.rpc_chooser, worker.encode())
-        raise NotImplementedError('get task queue size not impl')
+        node, rpc = await self._worker_rpc(worker)
+        async with self._track(node):
+            res = await rpc.get_workers_load(task_worker_manager_rpc.GetWorkersLoadRequest([worker]))
+        return res.loads[0].queued
+
+    async def _get_workers_load_from_node(
+            self,
+            node: entities.TaskWorkerManagerNode,
+            workers: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, interface.WorkerLoad]:
+        rpc = task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
+        try:
+            async with self._track(node):
+                res = await rpc.get_workers_load(task_worker_manager_rpc.GetWorkersLoadRequest(workers))
+        except Exception as e:
+            logger.opt(exception=e).error("get load of workers {workers} failed", workers=workers)
+            return {}
+        return _rpc_loads2loads(res)
+
+    async def get_workers_load(
+            self,
+            workers: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, interface.WorkerLoad]:
+        nodes: Dict[Any, entities.TaskWorkerManagerNode] = {}
+        node_workers: Dict[Any, List[entities.WorkerUUID]] = {}
+        for worker, node in (await self._worker_nodes(workers)).items():
+            nodes[node.uuid] = node
+            node_workers.setdefault(node.uuid, []).append(worker)
+        loads: Dict[entities.WorkerUUID, interface.WorkerLoad] = {}
+        for node_loads in await asyncio.gather(*(
+                self._get_workers_load_from_node(nodes[node_uuid], each_node_workers)
+                for node_uuid, each_node_workers in node_workers.items()
+        )):
+            loads.update(node_loads)
+        return loads
+
+    async def _watch_node_workers_load(
+            self,
+            node: entities.TaskWorkerManagerNode,
+            interval: float,
+            snapshots: 'asyncio.Queue[Dict[entities.WorkerUUID, interface.WorkerLoad]]',
+            stopped: asyncio.Event
+    ):
+        while not stopped.is_set():
+            try:
+                rpc = task_worker_manager_rpc.TaskWorkerManagerStub(await self.rpc_chooser.get_node_channel(node))
+                async for res in rpc.watch_workers_load(task_worker_manager_rpc.WatchWorkersLoadRequest(interval)):
+                    await snapshots.put(_rpc_loads2loads(res))
+            except Exception as e:
+                logger.opt(exception=e).warning("watch workers load of node {node} failed", node=node.uuid)
+            # reconnect after an interval, stale loads expire on the subscriber side meanwhile
+            await asyncio.sleep(interval)
+
+    async def watch_workers_load(
+            self,
+            interval: float
+    ) -> AsyncIterator[Dict[entities.WorkerUUID, interface.WorkerLoad]]:
+        snapshots: asyncio.Queue[Dict[entities.WorkerUUID, interface.WorkerLoad]] = asyncio.Queue()
+        follower = asyncio.create_task(self._follow_nodes(
+            lambda node, stopped: self._watch_node_workers_load(node, interval, snapshots, stopped),
+            'worker loads'
+        ))
+        try:
+            while True:
+                yield await snapshots.get()
+        finally:
+            follower.cancel()
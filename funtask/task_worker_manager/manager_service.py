@@ -1,4 +1,5 @@
-from typing import AsyncIterator, cast
+import asyncio
+from typing import AsyncIterator, cast, List, Dict
 
 import dill
 from dependency_injector.wiring import Provide, inject
@@ -7,12 +8,34 @@ from loguru import logger
 
 from funtask.common.grpc import load_args, core_status2rpc_status
 from funtask.core.entities import WorkerUUID, TaskUUID
+from funtask.core import interface_and_types as interface
+from funtask.core.interface_and_types import TaskDispatch
 from funtask.core.task_worker_manager import FunTaskManager
-from funtask.generated import Worker, Task, StatusReport, Empty
+from funtask.generated import Worker, Task, StatusReport, Empty, StatusReportTaskStatus
 from funtask.generated.manager import TaskWorkerManagerBase, IncreaseWorkerRequest, \
     IncreaseWorkersRequest, IncreaseWorkerResponse, IncreaseWorkersResponse, DispatchFunTaskResponse, \
     DispatchFunTaskRequest, StopTaskRequest, StopWorkerRequest, \
-    KillWorkerRequest, GetQueuedStatusResponse
+    KillWorkerRequest, GetQueuedStatusResponse, GetWorkersLoadRequest, GetWorkersLoadResponse, WorkerLoad, \
+    WatchWorkersLoadRequest, DispatchFunTasksRequest, DispatchFunTasksResponse, DispatchFunTaskResult, \
+    GetQueuedStatusesRequest, GetQueuedStatusesResponse
+
+# seconds, protects manager from subscribers asking too often
+_MIN_WATCH_INTERVAL = .1
+# statuses per frame of status stream when client asks for none, and the most it can ask for
+_DEFAULT_STATUS_BATCH = 256
+_MAX_STATUS_BATCH = 4096
+# seconds a status may wait in an unfilled frame at most
+_MAX_STATUS_BATCH_DELAY = 1.
+
+
+def _status2rpc_status(status: interface.StatusReport) -> StatusReport:
+    return StatusReport(
+        worker_uuid=status.worker_uuid,
+        task_uuid=status.task_uuid,
+        serialized_content=dill.dumps(status.content),
+        create_timestamp=status.create_timestamp,
+        **core_status2rpc_status(status.status)
+    )
 
 
 class ManagerService(TaskWorkerManagerBase):
@@ -48,7 +71,48 @@ class ManagerService(TaskWorkerManagerBase):
             *args,
             **kwargs
         )
-        return DispatchFunTaskResponse(Task(task_uuid))
+        return DispatchFunTaskResponse(Task(task_uuid), StatusReportTaskStatus.QUEUED)
+
+    async def _dispatch_fun_tasks(self, requests: List[DispatchFunTaskRequest]) -> List[DispatchFunTaskResult]:
+        dispatches: List[TaskDispatch] = []
+        # index of each loadable request in dispatches
+        dispatch_indexes: List[int | None] = []
+        errors: Dict[int, str] = {}
+        for idx, request in enumerate(requests):
+            try:
+                args, kwargs = load_args(request.other_args)
+                dispatches.append(TaskDispatch(
+                    cast(WorkerUUID, request.worker_uuid),
+                    dill.loads(request.serialized_fun_task),
+                    request.change_status,
+                    request.timeout,
+                    args,
+                    kwargs
+                ))
+                dispatch_indexes.append(len(dispatches) - 1)
+            except Exception as e:
+                errors[idx] = f'load task failed: {e!r}'
+                dispatch_indexes.append(None)
+        tasks_uuid = await self.fun_task_manager.dispatch_fun_tasks(dispatches)
+        results = []
+        for idx, dispatch_idx in enumerate(dispatch_indexes):
+            task_uuid = None if dispatch_idx is None else tasks_uuid[dispatch_idx]
+            if task_uuid is None:
+                results.append(DispatchFunTaskResult(error=errors.get(idx, 'worker can not take task')))
+            else:
+                results.append(DispatchFunTaskResult(Task(task_uuid), status=StatusReportTaskStatus.QUEUED))
+        return results
+
+    async def dispatch_fun_tasks(self, dispatch_fun_tasks_request: "DispatchFunTasksRequest") -> "DispatchFunTasksResponse":
+        return DispatchFunTasksResponse(await self._dispatch_fun_tasks(dispatch_fun_tasks_request.requests))
+
+    async def stream_dispatch_fun_tasks(
+            self,
+            dispatch_fun_tasks_request_iterator: AsyncIterator["DispatchFunTasksRequest"]
+    ) -> AsyncIterator["DispatchFunTasksResponse"]:
+        # every batch is dispatched and answered once received, nothing is kept for the rest of stream
+        async for request in dispatch_fun_tasks_request_iterator:
+            yield DispatchFunTasksResponse(await self._dispatch_fun_tasks(request.requests))
 
     async def stop_task(self, stop_task_request: "StopTaskRequest") -> "Empty":
         await self.fun_task_manager.stop_task(
@@ -69,13 +133,37 @@ class ManagerService(TaskWorkerManagerBase):
         while True:
             status = await self.fun_task_manager.get_queued_status()
             assert status is not None, ValueError('status cannot be none')
-            yield GetQueuedStatusResponse(StatusReport(
-                worker_uuid=status.worker_uuid,
-                task_uuid=status.task_uuid,
-                serialized_content=dill.dumps(status.content),
-                create_timestamp=status.create_timestamp,
-                **core_status2rpc_status(status.status)
-            ))
+            yield GetQueuedStatusResponse(_status2rpc_status(status))
+
+    async def get_queued_statuses(
+            self,
+            get_queued_statuses_request: "GetQueuedStatusesRequest"
+    ) -> AsyncIterator["GetQueuedStatusesResponse"]:
+        max_batch = min(get_queued_statuses_request.max_batch or _DEFAULT_STATUS_BATCH, _MAX_STATUS_BATCH)
+        max_delay = min(max(get_queued_statuses_request.max_delay, 0.), _MAX_STATUS_BATCH_DELAY)
+        while True:
+            statuses = await self.fun_task_manager.get_queued_statuses(max_batch, max_delay)
+            yield GetQueuedStatusesResponse([_status2rpc_status(status) for status in statuses])
+
+    async def get_workers_load(self, get_workers_load_request: "GetWorkersLoadRequest") -> "GetWorkersLoadResponse":
+        loads = []
+        for worker_uuid in get_workers_load_request.workers_uuid:
+            load = await self.fun_task_manager.get_worker_load(cast(WorkerUUID, worker_uuid))
+            loads.append(WorkerLoad(worker_uuid, load.queued, load.running, load.throughput))
+        return GetWorkersLoadResponse(loads)
+
+    async def watch_workers_load(
+            self,
+            watch_workers_load_request: "WatchWorkersLoadRequest"
+    ) -> AsyncIterator["GetWorkersLoadResponse"]:
+        interval = max(watch_workers_load_request.interval, _MIN_WATCH_INTERVAL)
+        while True:
+            snapshot = await self.fun_task_manager.get_workers_load_snapshot()
+            yield GetWorkersLoadResponse([
+                WorkerLoad(worker_uuid, load.queued, load.running, load.throughput)
+                for worker_uuid, load in snapshot.items()
+            ])
+            await asyncio.sleep(interval)
 
 
 class ManagerServiceRunner:
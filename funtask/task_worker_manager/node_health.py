@@ -0,0 +1,116 @@
+import time
+from typing import Dict, Any
+
+from funtask.core import interface_and_types as interface
+from funtask.core.interface_and_types import CircuitState
+
+
+class _NodeStats:
+    __slots__ = ('latency', 'error_rate', 'requests', 'failures', 'state', 'opened_at', 'probe_at')
+
+    def __init__(self):
+        self.latency = 0.
+        self.error_rate = 0.
+        self.requests = 0
+        self.failures = 0
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.
+        # start of probe of half open node, None without running probe
+        self.probe_at: float | None = None
+
+
+class NodeHealthTracker:
+    """
+    latency and error rate of rpcs to each node as exponentially weighted moving averages, with a
+    circuit breaker per node. circuit opens once error rate reaches failure threshold after min requests,
+    after open timeout one request probes the node, it closes circuit on success and opens it again on failure
+    """
+
+    def __init__(
+            self,
+            alpha: float = .2,
+            failure_threshold: float = .5,
+            min_requests: int = 5,
+            open_timeout: float = 10.
+    ):
+        # weight of newest rpc in moving averages
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.open_timeout = open_timeout
+        self._nodes: Dict[Any, _NodeStats] = {}
+
+    def _stats(self, node_uuid: Any) -> _NodeStats:
+        stats = self._nodes.get(node_uuid)
+        if stats is None:
+            stats = self._nodes[node_uuid] = _NodeStats()
+        return stats
+
+    def retain(self, nodes_uuid: Any):
+        """
+        forget nodes not in nodes uuid
+        """
+        self._nodes = {node_uuid: stats for node_uuid, stats in self._nodes.items() if node_uuid in nodes_uuid}
+
+    def record(self, node_uuid: Any, latency: float, ok: bool, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        stats = self._stats(node_uuid)
+        stats.latency = latency if not stats.requests else stats.latency + self.alpha * (latency - stats.latency)
+        stats.error_rate += self.alpha * ((0. if ok else 1.) - stats.error_rate)
+        stats.requests += 1
+        if not ok:
+            stats.failures += 1
+        if stats.state is CircuitState.HALF_OPEN:
+            stats.probe_at = None
+            if ok:
+                stats.state = CircuitState.CLOSED
+                stats.error_rate = 0.
+            else:
+                stats.state = CircuitState.OPEN
+                stats.opened_at = now
+        elif (stats.state is CircuitState.CLOSED and stats.requests >= self.min_requests
+              and stats.error_rate >= self.failure_threshold):
+            stats.state = CircuitState.OPEN
+            stats.opened_at = now
+
+    def state(self, node_uuid: Any, now: float | None = None) -> CircuitState:
+        stats = self._nodes.get(node_uuid)
+        if stats is None:
+            return CircuitState.CLOSED
+        now = time.monotonic() if now is None else now
+        if stats.state is CircuitState.OPEN and now - stats.opened_at >= self.open_timeout:
+            stats.state = CircuitState.HALF_OPEN
+        return stats.state
+
+    def allow(self, node_uuid: Any, now: float | None = None) -> bool:
+        """
+        whether new state may be placed on node, a half open node allows one probe at a time,
+        probe without result for open timeout is given up
+        """
+        state = self.state(node_uuid, now)
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.OPEN:
+            return False
+        now = time.monotonic() if now is None else now
+        stats = self._nodes[node_uuid]
+        if stats.probe_at is not None and now - stats.probe_at < self.open_timeout:
+            return False
+        stats.probe_at = now
+        return True
+
+    def latency(self, node_uuid: Any) -> float:
+        stats = self._nodes.get(node_uuid)
+        return 0. if stats is None else stats.latency
+
+    def health(self, now: float | None = None) -> Dict[Any, interface.NodeHealth]:
+        return {
+            node_uuid: interface.NodeHealth(
+                latency=stats.latency,
+                error_rate=stats.error_rate,
+                requests=stats.requests,
+                failures=stats.failures,
+                state=self.state(node_uuid, now)
+            )
+            for node_uuid, stats in self._nodes.items()
+        }
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Deque, Tuple, List, Any
+
+from funtask.core import interface_and_types as interface
+from funtask.core.interface_and_types import StatusReport
+
+
+class _NodeBuffer:
+    __slots__ = ('statuses', 'not_full', 'connected', 'delivered')
+
+    def __init__(self):
+        # status with its monotonic receive time
+        self.statuses: Deque[Tuple[StatusReport, float]] = deque()
+        self.not_full = asyncio.Event()
+        self.not_full.set()
+        self.connected = False
+        self.delivered = 0
+
+
+class StatusFanIn:
+    """
+    merge status streams of manager nodes into one, nodes with buffered statuses are served round robin
+    so a busy node can not starve others. each node buffers at most buffer size statuses, its stream
+    stops reading while the buffer is full
+    """
+
+    def __init__(self, buffer_size: int = 1024):
+        self.buffer_size = max(buffer_size, 1)
+        self._buffers: Dict[Any, _NodeBuffer] = {}
+        self._order: List[Any] = []
+        self._next = 0
+        self._has_status = asyncio.Event()
+
+    def add_node(self, node_uuid: Any):
+        if node_uuid not in self._buffers:
+            self._buffers[node_uuid] = _NodeBuffer()
+            self._order.append(node_uuid)
+
+    def set_connected(self, node_uuid: Any, connected: bool):
+        self._buffers[node_uuid].connected = connected
+
+    async def put(self, node_uuid: Any, status: StatusReport):
+        buffer = self._buffers[node_uuid]
+        while len(buffer.statuses) >= self.buffer_size:
+            buffer.not_full.clear()
+            await buffer.not_full.wait()
+        buffer.statuses.append((status, time.monotonic()))
+        self._has_status.set()
+
+    def get_nowait(self) -> StatusReport | None:
+        """
+        next status in round robin order, None if nothing is buffered
+        """
+        for _ in range(len(self._order)):
+            node_uuid = self._order[self._next % len(self._order)]
+            self._next += 1
+            buffer = self._buffers[node_uuid]
+            if buffer.statuses:
+                status, _ = buffer.statuses.popleft()
+                buffer.delivered += 1
+                buffer.not_full.set()
+                return status
+        return None
+
+    async def get(self) -> StatusReport:
+        while (status := self.get_nowait()) is None:
+            self._has_status.clear()
+            await self._has_status.wait()
+        return status
+
+    def lags(self) -> Dict[Any, interface.StatusStreamLag]:
+        now = time.monotonic()
+        return {
+            node_uuid: interface.StatusStreamLag(
+                buffered=len(buffer.statuses),
+                lag=now - buffer.statuses[0][1] if buffer.statuses else 0.,
+                delivered=buffer.delivered,
+                connected=buffer.connected
+            )
+            for node_uuid, buffer in self._buffers.items()
+        }
@@ -0,0 +1,85 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List
+
+from funtask.core import interface_and_types as interface, entities
+
+
+class WorkerDirectory:
+    """
+    manager node owning each worker, workers live in the manager process that forked them so the
+    location of a worker never changes. locations are cached in memory and loaded in bulk from worker
+    records of repository on miss. unknown workers are cached for unknown ttl seconds only, a worker
+    asked for before its record is committed is found once the entry expires
+    """
+
+    def __init__(
+            self,
+            repository: interface.Repository | None = None,
+            cache_size: int = 100000,
+            unknown_ttl: float = 1.
+    ):
+        self.repository = repository
+        self.cache_size = cache_size
+        self.unknown_ttl = unknown_ttl
+        self._locations: OrderedDict[entities.WorkerUUID, entities.TaskWorkerManagerNodeUUID | None] = OrderedDict()
+        # expire time of cached unknown workers, monotonic
+        self._unknown_expire: Dict[entities.WorkerUUID, float] = {}
+
+    def __len__(self):
+        return len(self._locations)
+
+    def _cache(self, worker_uuid: entities.WorkerUUID, node_uuid: entities.TaskWorkerManagerNodeUUID | None):
+        self._locations[worker_uuid] = node_uuid
+        self._locations.move_to_end(worker_uuid)
+        if node_uuid is None:
+            self._unknown_expire[worker_uuid] = time.monotonic() + self.unknown_ttl
+        else:
+            self._unknown_expire.pop(worker_uuid, None)
+        while len(self._locations) > self.cache_size:
+            evicted, _ = self._locations.popitem(last=False)
+            self._unknown_expire.pop(evicted, None)
+
+    def set(self, worker_uuid: entities.WorkerUUID, node_uuid: entities.TaskWorkerManagerNodeUUID):
+        self._cache(worker_uuid, node_uuid)
+
+    def invalidate(self, worker_uuid: entities.WorkerUUID):
+        self._locations.pop(worker_uuid, None)
+        self._unknown_expire.pop(worker_uuid, None)
+
+    def invalidate_node(self, node_uuid: entities.TaskWorkerManagerNodeUUID):
+        """
+        forget workers of node, e.g. node is gone with its workers
+        """
+        for worker_uuid in [w for w, n in self._locations.items() if n == node_uuid]:
+            del self._locations[worker_uuid]
+
+    async def get_many(
+            self,
+            workers_uuid: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, entities.TaskWorkerManagerNodeUUID]:
+        """
+        :return: node of each worker, unknown workers are missing
+        """
+        nodes: Dict[entities.WorkerUUID, entities.TaskWorkerManagerNodeUUID] = {}
+        misses = []
+        now = time.monotonic()
+        for worker_uuid in workers_uuid:
+            if worker_uuid in self._unknown_expire and self._unknown_expire[worker_uuid] <= now:
+                misses.append(worker_uuid)
+            elif worker_uuid in self._locations:
+                self._locations.move_to_end(worker_uuid)
+                node_uuid = self._locations[worker_uuid]
+                if node_uuid is not None:
+                    nodes[worker_uuid] = node_uuid
+            else:
+                misses.append(worker_uuid)
+        if misses and self.repository is not None:
+            loaded = await self.repository.get_workers_manager_node(misses)
+            for worker_uuid in misses:
+                self._cache(worker_uuid, loaded.get(worker_uuid))
+            nodes.update(loaded)
+        return nodes
+
+    async def get(self, worker_uuid: entities.WorkerUUID) -> entities.TaskWorkerManagerNodeUUID | None:
+        return (await self.get_many([worker_uuid])).get(worker_uuid)
@@ -0,0 +1,55 @@
+from bisect import bisect
+from hashlib import blake2b
+from typing import Sequence, List
+
+
+def stable_hash(data: bytes | str) -> int:
+    """
+    64 bit hash which is identical across processes, unlike builtin hash()
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'big')
+
+
+def stable_fraction(data: bytes | str) -> float:
+    """
+    deterministic value in [0, 1) from data
+    """
+    return stable_hash(data) / 2 ** 64
+
+
+def rendezvous_choose(key: bytes | str, nodes: Sequence[str]) -> str:
+    """
+    highest random weight owner of key among nodes, adding or removing a node
+    only moves keys owned by that node
+    """
+    if isinstance(key, str):
+        key = key.encode()
+    return max(nodes, key=lambda node: stable_hash(node.encode() + b'/' + key))
+
+
+class HashRing:
+    """
+    consistent hash ring with virtual nodes, adding or removing a node only moves keys
+    from or to that node and every process maps a key to the same node
+    """
+
+    def __init__(self, nodes: Sequence[str], vnodes: int = 64):
+        self.vnodes = max(vnodes, 1)
+        points = sorted(
+            (stable_hash(f'{node}#{i}'), node)
+            for node in set(nodes)
+            for i in range(self.vnodes)
+        )
+        self._points: List[int] = [point for point, _ in points]
+        self._nodes: List[str] = [node for _, node in points]
+
+    def get(self, key: bytes | str) -> str:
+        """
+        first node clockwise from hash of key
+        """
+        if not self._nodes:
+            raise KeyError('empty hash ring')
+        idx = bisect(self._points, stable_hash(key))
+        return self._nodes[idx % len(self._nodes)]
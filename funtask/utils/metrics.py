@@ -0,0 +1,96 @@
+from bisect import bisect_left
+from typing import Sequence, List, Dict
+
+
+class Histogram:
+    """
+    fixed bucket histogram, bounds are bucket upper bounds in ascending order,
+    values greater than the last bound are counted in an overflow bucket
+    """
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds: List[float] = list(bounds)
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.
+        self.max = 0.
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.
+
+    def quantile(self, q: float) -> float:
+        """
+        upper bound of the bucket containing quantile q, overflow bucket reports max value
+        """
+        if not self.count:
+            return 0.
+        rank = q * self.count
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.bounds[idx] if idx < len(self.bounds) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'max': self.max,
+            'p50': self.quantile(.5),
+            'p99': self.quantile(.99)
+        }
+
+
+def exponential_bounds(start: float, factor: float, count: int) -> List[float]:
+    return [start * factor ** i for i in range(count)]
+
+
+class SlidingWindowCounter:
+    """
+    event counts in fixed size time slots over a sliding window of recent slots
+    """
+
+    def __init__(self, slot: float = 1., slots: int = 60):
+        self.slot = slot
+        self.slots = slots
+        self._counts: List[int] = [0] * slots
+        self._slot_ids: List[int] = [-1] * slots
+
+    def add(self, t: float, n: int = 1):
+        slot_id = int(t // self.slot)
+        idx = slot_id % self.slots
+        if self._slot_ids[idx] != slot_id:
+            self._slot_ids[idx] = slot_id
+            self._counts[idx] = 0
+        self._counts[idx] += n
+
+    def counts(self, t: float) -> List[int]:
+        """
+        counts of slots in window ending at t, oldest first
+        """
+        current = int(t // self.slot)
+        res = []
+        for slot_id in range(current - self.slots + 1, current + 1):
+            idx = slot_id % self.slots
+            res.append(self._counts[idx] if self._slot_ids[idx] == slot_id else 0)
+        return res
+
+    def snapshot(self, t: float) -> Dict[str, float | List[int]]:
+        counts = self.counts(t)
+        mean = sum(counts) / len(counts)
+        peak = max(counts)
+        return {
+            'counts': counts,
+            'mean': mean,
+            'peak': peak,
+            'peak_to_mean': peak / mean if mean else 0.
+        }
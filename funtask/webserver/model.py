@@ -10,6 +10,12 @@ class IncreaseWorkerReq:
     tags: List[str]
 
 
+@dataclass
+class SetWorkerTagsReq:
+    worker_uuid: str
+    tags: List[str]
+
+
 @dataclass
 class BatchQueryReq:
     cursor: int | None
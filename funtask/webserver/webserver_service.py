@@ -1,11 +1,11 @@
-from typing import List, Tuple
+from typing import List, Tuple, cast
 from grpclib.client import Channel
 from funtask.core import interface_and_types as interface, entities
 from dependency_injector.wiring import inject, Provide
 from fastapi import FastAPI, APIRouter
 import uvicorn
 
-from funtask.webserver.model import IncreaseWorkerReq, BatchQueryReq, WorkersWithCursor
+from funtask.webserver.model import IncreaseWorkerReq, BatchQueryReq, WorkersWithCursor, SetWorkerTagsReq
 from funtask.webserver.utils import self_wrapper, SelfPointer
 
 api = APIRouter(prefix='/api', tags=['api'])
@@ -40,11 +40,17 @@ class Webserver:
             uuid=worker_uuid,
             status=entities.WorkerStatus.RUNNING,
             name=req.name,
-            tags=req.tags
+            tags=req.tags,
+            manager_node_uuid=await self.task_worker_manager_rpc.get_worker_node(worker_uuid)
         )
         await self.repository.add_worker(worker)
         return worker
 
+    @api.post('/set_worker_tags')
+    @self_wrapper(webserver_pointer)
+    async def set_worker_tags(self, req: SetWorkerTagsReq):
+        await self.repository.set_worker_tags(cast(entities.WorkerUUID, req.worker_uuid), req.tags)
+
     @api.post('/get_workers', response_model=WorkersWithCursor)
     @self_wrapper(webserver_pointer)
     async def get_workers(self, req: BatchQueryReq):
@@ -159,10 +159,9 @@ class TestMultiprocessing:
         await asyncio.sleep(.5)
         task_status_map: Dict[str, TaskStatus] = {}
         await get_status(manager, task_status_map)
-        assert task1_uuid in task_status_map
-        assert task2_uuid in task_status_map
         assert task_status_map[task1_uuid] == TaskStatus.RUNNING
-        assert task_status_map[task2_uuid] == TaskStatus.QUEUED
+        # QUEUED is acknowledged by dispatch, task has no status until it runs
+        assert task2_uuid not in task_status_map
         await asyncio.sleep(1)
         await get_status(manager, task_status_map)
         assert task_status_map[task1_uuid] == TaskStatus.SUCCESS
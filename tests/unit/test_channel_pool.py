@@ -0,0 +1,42 @@
+from typing import cast
+
+import pytest
+
+from funtask.core import entities
+from funtask.task_worker_manager.channel_pool import ChannelPool
+
+
+def _node(uuid: str, port: int) -> entities.TaskWorkerManagerNode:
+    return entities.TaskWorkerManagerNode(
+        uuid=cast(entities.TaskWorkerManagerNodeUUID, uuid),
+        host='127.0.0.1',
+        port=port
+    )
+
+
+@pytest.mark.asyncio
+class TestChannelPool:
+    async def test_reuse_channel_of_node(self):
+        pool = ChannelPool()
+        node = _node('n0', 1)
+        assert pool.get(node) is pool.get(_node('n0', 1))
+        # node moved to another address
+        moved = pool.get(_node('n0', 2))
+        assert moved is not pool.get(node)
+        assert len(pool) == 2
+
+    async def test_retain_closes_removed_nodes(self):
+        pool = ChannelPool()
+        kept = pool.get(_node('n0', 1))
+        pool.get(_node('n1', 1))
+        pool.retain([_node('n0', 1)])
+        assert len(pool) == 1
+        assert pool.get(_node('n0', 1)) is kept
+
+    async def test_sweep_idle(self):
+        pool = ChannelPool(idle_timeout=0.)
+        channel = pool.get(_node('n0', 1))
+        pool.sweep()
+        assert len(pool) == 0
+        assert pool.get(_node('n0', 1)) is not channel
+
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from funtask.utils.hashing import HashRing
+
+_NODES = [f'node{i}' for i in range(5)]
+_KEYS = [f'worker{i}'.encode() for i in range(5000)]
+
+
+class TestHashRing:
+    def test_same_routing_across_processes(self):
+        ring = HashRing(_NODES)
+        code = (
+            "from funtask.utils.hashing import HashRing;"
+            f"print(','.join(HashRing({_NODES!r}).get(f'worker{{i}}'.encode()) for i in range(100)))"
+        )
+        other = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                               cwd=Path(__file__).parents[2])
+        assert other.stdout.strip().split(',') == [ring.get(key) for key in _KEYS[:100]]
+
+    def test_node_change_moves_few_keys(self):
+        ring = HashRing(_NODES)
+        before = {key: ring.get(key) for key in _KEYS}
+        grown = HashRing(_NODES + ['node5'])
+        moved = [key for key in _KEYS if grown.get(key) != before[key]]
+        # only keys of the new node move, about 1/6 of them
+        assert all(grown.get(key) == 'node5' for key in moved)
+        assert len(moved) < len(_KEYS) / 4
+        shrunk = HashRing(_NODES[1:])
+        assert all(shrunk.get(key) == before[key] for key in _KEYS if before[key] != 'node0')
+
+    def test_balance(self):
+        ring = HashRing(_NODES, vnodes=128)
+        counts = Counter(ring.get(key) for key in _KEYS)
+        assert set(counts) == set(_NODES)
+        assert max(counts.values()) < 2 * min(counts.values())
+
+    def test_empty(self):
+        with pytest.raises(KeyError):
+            HashRing([]).get(b'key')
@@ -0,0 +1,183 @@
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from funtask.core.entities import TimeUnit
+from funtask.providers.cron import heap_cron
+from funtask.providers.cron.heap_cron import HeapCron, _first_run_time, _Job, _MsBucket
+
+
+@pytest.mark.timeout(10)
+@pytest.mark.asyncio
+class TestHeapCron:
+    async def test_millisecond_fires_in_loop(self):
+        cron = HeapCron()
+        fired = []
+        await cron.every_n_millisecond('ms', 10, lambda tag: fired.append(tag), 'ms')
+        await asyncio.sleep(.205)
+        await cron.cancel('ms')
+        assert 15 <= len(fired) <= 21
+        assert set(fired) == {'ms'}
+
+    async def test_async_job_and_cancel(self):
+        cron = HeapCron()
+        fired = []
+
+        async def job(n: int):
+            fired.append(n)
+
+        await cron.every_n_millisecond('job', 20, job, 1)
+        await asyncio.sleep(.05)
+        await cron.cancel('job')
+        count = len(fired)
+        assert count >= 1
+        await asyncio.sleep(.05)
+        assert len(fired) == count
+        assert await cron.get_all() == []
+
+    async def test_many_schedules(self):
+        cron = HeapCron()
+        start = time.perf_counter()
+        for i in range(100000):
+            await cron.every_n_minutes(str(i), 1 + i % 60, lambda: None)
+        for i in range(0, 100000, 2):
+            await cron.cancel(str(i))
+        assert time.perf_counter() - start < 5
+        assert len(await cron.get_all()) == 50000
+        for name in await cron.get_all():
+            await cron.cancel(name)
+        assert cron._timer is None
+
+    async def test_cancel_while_firing_not_stale(self):
+        cron = HeapCron()
+
+        def cancel_self(name: str):
+            # cancel does not await, so a job can run it to the end synchronously
+            with pytest.raises(StopIteration):
+                cron.cancel(name).send(None)
+
+        for i in range(10):
+            await cron.every_n_minutes(str(i), 1, lambda: None)
+        await cron.every_n_millisecond('ms', 5, cancel_self, 'ms')
+        await cron.every_n_seconds('s', 1, cancel_self, None, 's', offset=-.99)
+        await asyncio.sleep(.05)
+        assert len(await cron.get_all()) == 10
+        # fired entries left heap already, nothing is counted for compaction
+        assert cron._stale == 0 and len(cron._heap) == 10
+
+
+class TestFirstRunTime:
+    def test_at_alignment(self):
+        now = datetime(2022, 1, 1, 10, 30, 15)
+        assert _first_run_time(TimeUnit.MINUTE, 1, ':20', now) == datetime(2022, 1, 1, 10, 30, 20)
+        assert _first_run_time(TimeUnit.MINUTE, 1, ':10', now) == datetime(2022, 1, 1, 10, 31, 10)
+        assert _first_run_time(TimeUnit.HOUR, 1, ':45', now) == datetime(2022, 1, 1, 10, 45)
+        assert _first_run_time(TimeUnit.HOUR, 1, '10:00', now) == datetime(2022, 1, 1, 11, 10)
+        assert _first_run_time(TimeUnit.DAY, 1, '08:00', now) == datetime(2022, 1, 2, 8)
+        assert _first_run_time(TimeUnit.DAY, 1, '12:00:30', now) == datetime(2022, 1, 1, 12, 0, 30)
+        # weekday of week runs is kept
+        assert _first_run_time(TimeUnit.WEEK, 1, '08:00', now) == datetime(2022, 1, 8, 8)
+        assert _first_run_time(TimeUnit.WEEK, 1, '12:00', now) == datetime(2022, 1, 1, 12)
+
+    def test_without_at(self):
+        now = datetime(2022, 1, 1, 10, 30, 15)
+        assert _first_run_time(TimeUnit.SECOND, 5, None, now) == datetime(2022, 1, 1, 10, 30, 20)
+
+    def test_invalid_at(self):
+        with pytest.raises(ValueError):
+            _first_run_time(TimeUnit.MINUTE, 1, '10:00', datetime.now())
+
+
+@pytest.mark.timeout(10)
+@pytest.mark.asyncio
+class TestMillisecondBuckets:
+    async def test_same_period_and_phase_share_bucket(self):
+        cron = HeapCron()
+        fired = []
+        for i in range(1000):
+            await cron.every_n_millisecond(f'ms{i}', 10, fired.append, i)
+        # at most one bucket per phase of the period
+        assert len(cron._ms_buckets) <= 10
+        assert len(cron._heap) <= 10
+        await asyncio.sleep(.1)
+        for i in range(1000):
+            await cron.cancel(f'ms{i}')
+        assert not cron._ms_buckets
+        assert len(fired) >= 5000
+
+    async def test_fire_stats(self):
+        cron = HeapCron()
+        await cron.every_n_millisecond('a', 1, lambda: None)
+        await cron.every_n_millisecond('b', 3, lambda: None)
+        await asyncio.sleep(.1)
+        await cron.cancel('a')
+        await cron.cancel('b')
+        stats = cron.get_fire_stats()
+        assert stats['count'] >= 50
+        assert stats['p50'] < .01
+
+
+@pytest.mark.timeout(10)
+@pytest.mark.asyncio
+class TestSpreading:
+    async def test_offset_shifts_millisecond_phase(self):
+        cron = HeapCron()
+        await cron.every_n_millisecond('a', 10, lambda: None)
+        await cron.every_n_millisecond('b', 10, lambda: None, offset=.005)
+        (_, phase_a), (_, phase_b) = cron._ms_buckets.keys()
+        assert (phase_b - phase_a) % 10 in (4, 5, 6)
+        await cron.cancel('a')
+        await cron.cancel('b')
+
+    async def test_offset_delays_first_fire(self):
+        cron = HeapCron()
+        fired = []
+        await cron.every_n_seconds('a', 1, fired.append, None, 'a', offset=-.9)
+        await asyncio.sleep(.2)
+        await cron.cancel('a')
+        assert fired == ['a']
+        profile = cron.get_load_profile()
+        assert profile['peak'] == 1
+        assert len(profile['counts']) == 60
+
+
+def _fixed_now(monkeypatch, now: datetime):
+    class _Datetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    monkeypatch.setattr(heap_cron, 'datetime', _Datetime)
+
+
+class TestAdvance:
+    def test_early_fire_moves_one_period(self):
+        cron = HeapCron()
+        job = _Job('a', 10., 100., lambda: None, (), {})
+        cron._advance_job(job, 99.999)
+        assert job.deadline == 110.
+        cron._advance_job(job, 135.)
+        assert job.deadline == 140.
+
+    def test_early_bucket_moves_one_period(self):
+        cron = HeapCron()
+        cron._ms_anchor = 0.
+        bucket = _MsBucket((10, 0), 10, 10, .01)
+        cron._advance_bucket(bucket, .0099)
+        assert bucket.tick == 20
+
+    def test_day_runs_follow_wall_clock(self, monkeypatch):
+        cron = HeapCron()
+        run_time = datetime(2022, 3, 26, 8)
+        job = _Job('a', 24 * 60 * 60., 1000., lambda: None, (), {}, run_time=run_time, offset=1.)
+        _fixed_now(monkeypatch, run_time)
+        cron._advance_job(job, 1000.)
+        assert job.run_time == datetime(2022, 3, 27, 8)
+        assert job.deadline == 1000. + 24 * 60 * 60 + 1
+        # wall clock is an hour ahead at next fire, e.g. dst started, next run keeps 08:00
+        _fixed_now(monkeypatch, datetime(2022, 3, 27, 9))
+        cron._advance_job(job, job.deadline)
+        assert job.run_time == datetime(2022, 3, 28, 8)
+        assert job.deadline == 1000. + 24 * 60 * 60 + 1 + 23 * 60 * 60 + 1
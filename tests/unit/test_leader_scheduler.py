@@ -0,0 +1,210 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List, Dict, cast
+
+import pytest
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.core.placement import PlacementMode
+from funtask.core.scheduler import LeaderScheduler
+
+
+def _node(uuid: str) -> entities.SchedulerNode:
+    return entities.SchedulerNode(uuid=cast(entities.SchedulerNodeUUID, uuid), host='localhost', port=0)
+
+
+class FakeLeaderControl:
+    def __init__(self, nodes: List[entities.SchedulerNode]):
+        self.nodes = nodes
+
+    async def get_all_nodes(self) -> List[entities.SchedulerNode]:
+        return self.nodes
+
+
+class FakeLeaderSchedulerRPC:
+    def __init__(self, node_tasks: Dict[entities.SchedulerNode, List[entities.CronTaskUUID]]):
+        self.node_tasks = node_tasks
+        self.calls: List[str] = []
+        self.task_loads: Dict[entities.CronTaskUUID, float] = {}
+        # latency of each rpc, nodes in hang never answer
+        self.latency = 0.
+        self.hang: List[entities.SchedulerNode] = []
+
+    async def _rpc(self, node: entities.SchedulerNode):
+        await asyncio.sleep(3600 if node in self.hang else self.latency)
+
+    async def get_node_load(self, node: entities.SchedulerNode) -> interface.SchedulerNodeLoad:
+        return interface.SchedulerNodeLoad(
+            task_loads={task: self.task_loads.get(task, 0.) for task in self.node_tasks.get(node, [])},
+            capacity=1.
+        )
+
+    async def get_node_task_list(self, node: entities.SchedulerNode) -> List[entities.CronTaskUUID]:
+        await self._rpc(node)
+        return list(self.node_tasks.get(node, []))
+
+    async def assign_tasks_to_node(self, node, cron_tasks_uuid, start_time=None):
+        await self._rpc(node)
+        self.calls.append('assign')
+        self.node_tasks.setdefault(node, []).extend(cron_tasks_uuid)
+
+    async def remove_tasks_from_node(self, node, cron_tasks_uuid, start_time=None):
+        self.calls.append('remove')
+        self.node_tasks[node] = [task for task in self.node_tasks[node] if task not in cron_tasks_uuid]
+
+    async def invalidate_task_on_node(self, node, cron_task_uuid, version):
+        await self._rpc(node)
+        self.calls.append(f'invalidate {cron_task_uuid} {version}')
+
+
+class FakeRepository:
+    def __init__(self, tasks: List[entities.CronTaskUUID]):
+        self.tasks = tasks
+
+    async def get_all_cron_task(self):
+        return [SimpleNamespace(uuid=task) for task in self.tasks]
+
+    async def update_cron_task(self, task_uuid, value):
+        return 2
+
+
+def _tasks(n: int) -> List[entities.CronTaskUUID]:
+    return [cast(entities.CronTaskUUID, f'task-{i}') for i in range(n)]
+
+
+def make_leader(
+        nodes,
+        node_tasks,
+        placement: PlacementMode = PlacementMode.HASH
+) -> tuple[LeaderScheduler, FakeLeaderSchedulerRPC]:
+    rpc = FakeLeaderSchedulerRPC(node_tasks)
+    leader = LeaderScheduler(
+        leader_control=cast(interface.LeaderSchedulerControl, FakeLeaderControl(nodes)),
+        worker_scheduler_rpc=cast(interface.LeaderSchedulerRPC, rpc),
+        repository=cast(interface.Repository, None),
+        placement=placement,
+        node_rpc_timeout=timedelta(seconds=.5)
+    )
+    return leader, rpc
+
+
+@pytest.mark.asyncio
+class TestRebalance:
+    async def test_converges_and_stays(self):
+        nodes = [_node(f'n{i}') for i in range(3)]
+        leader, rpc = make_leader(nodes, {nodes[0]: _tasks(300)})
+        await leader.rebalance(datetime.now())
+        # one batched call per touched node
+        assert sorted(rpc.calls) == ['assign', 'assign', 'remove']
+        assert all(50 < len(rpc.node_tasks[node]) < 150 for node in nodes)
+        assert leader.node_responsible_tasks_dict == rpc.node_tasks
+        rpc.calls.clear()
+        await leader.rebalance(datetime.now())
+        assert not rpc.calls
+
+    async def test_new_node_moves_its_share(self):
+        nodes = [_node(f'n{i}') for i in range(4)]
+        leader, rpc = make_leader(nodes[:3], {nodes[0]: _tasks(400)})
+        await leader.rebalance(datetime.now())
+        before = {task: node for node, tasks in rpc.node_tasks.items() for task in tasks}
+        leader.nodes = nodes
+        leader.node_responsible_tasks_dict[nodes[3]] = []
+        await leader.rebalance(datetime.now())
+        after = {task: node for node, tasks in rpc.node_tasks.items() for task in tasks}
+        moved = [task for task in before if before[task] != after[task]]
+        # only tasks now owned by the new node move
+        assert all(after[task] == nodes[3] for task in moved)
+        assert 50 < len(moved) < 150
+
+    async def test_failed_assign_not_lost(self):
+        nodes = [_node(f'n{i}') for i in range(2)]
+        tasks = _tasks(100)
+        leader, rpc = make_leader(nodes, {nodes[0]: list(tasks)})
+        original_assign = rpc.assign_tasks_to_node
+        failing = {nodes[1]}
+
+        async def assign_tasks_to_node(node, cron_tasks_uuid, start_time=None):
+            if node in failing:
+                raise ConnectionError()
+            await original_assign(node, cron_tasks_uuid, start_time)
+        rpc.assign_tasks_to_node = assign_tasks_to_node
+        # tasks go back to node they were removed from
+        await leader.rebalance(datetime.now())
+        assert sorted(rpc.node_tasks[nodes[0]]) == sorted(tasks)
+        # source fails too, orphans are placed on next rebalance
+        failing.add(nodes[0])
+        await leader.rebalance(datetime.now())
+        assert len(rpc.node_tasks[nodes[0]]) < 100
+        failing.clear()
+        await leader.rebalance(datetime.now())
+        assert sorted(sum(rpc.node_tasks.values(), [])) == sorted(tasks)
+        assert leader.node_responsible_tasks_dict == rpc.node_tasks
+
+    async def test_cost_placement(self):
+        nodes = [_node(f'n{i}') for i in range(2)]
+        tasks = _tasks(10)
+        leader, rpc = make_leader(nodes, {nodes[0]: list(tasks)}, PlacementMode.COST)
+        # one 10ms task outweighs nine weekly ones
+        rpc.task_loads = {task: .001 for task in tasks}
+        rpc.task_loads[tasks[0]] = .999
+        await leader.rebalance(datetime.now())
+        assert rpc.node_tasks[nodes[1]] == [tasks[0]]
+        assert leader.node_loads[nodes[0]].utilization > 1.
+        rpc.calls.clear()
+        await leader.rebalance(datetime.now())
+        assert not rpc.calls
+
+
+@pytest.mark.asyncio
+class TestNodeChange:
+    async def test_concurrent_failover(self):
+        nodes = [_node(f'n{i}') for i in range(8)]
+        tasks = _tasks(80)
+        node_tasks = {node: tasks[i * 10:(i + 1) * 10] for i, node in enumerate(nodes)}
+        leader, rpc = make_leader(nodes, {node: list(node_tasks[node]) for node in nodes})
+        leader.repository = cast(interface.Repository, FakeRepository(tasks))
+        leader.node_responsible_tasks_dict = {node: list(node_tasks[node]) for node in nodes}
+        # n0 is down, n1 hangs
+        del rpc.node_tasks[nodes[0]]
+        rpc.hang = [nodes[1]]
+        rpc.latency = .1
+        start = time.perf_counter()
+        await leader.scheduler_node_change(nodes[1:])
+        # nodes are asked concurrently, hanging one costs one deadline
+        assert time.perf_counter() - start < 1.2
+        assert leader.get_failover_stats()['count'] == 1
+        # orphans of n0 go to answered nodes in one batch per node, n1 keeps its tasks
+        reassigned = [task for node in nodes[2:] for task in rpc.node_tasks[node] if task not in node_tasks[node]]
+        assert sorted(reassigned) == sorted(node_tasks[nodes[0]])
+        assert len(rpc.calls) <= 6
+        assert leader.node_responsible_tasks_dict[nodes[1]] == node_tasks[nodes[1]]
+
+    async def test_failed_assign_placed_again(self):
+        nodes = [_node(f'n{i}') for i in range(2)]
+        tasks = _tasks(10)
+        leader, rpc = make_leader(nodes, {nodes[0]: [], nodes[1]: []})
+        leader.repository = cast(interface.Repository, FakeRepository(tasks))
+        original_assign = rpc.assign_tasks_to_node
+
+        async def assign_tasks_to_node(node, cron_tasks_uuid, start_time=None):
+            if node == nodes[0]:
+                raise ConnectionError()
+            await original_assign(node, cron_tasks_uuid, start_time)
+        rpc.assign_tasks_to_node = assign_tasks_to_node
+        await leader.scheduler_node_change(nodes)
+        assert sorted(rpc.node_tasks[nodes[1]]) == sorted(tasks)
+
+
+@pytest.mark.asyncio
+class TestCronTaskEdit:
+    async def test_edit_pushed_to_nodes(self):
+        nodes = [_node(f'n{i}') for i in range(3)]
+        leader, rpc = make_leader(nodes, {})
+        leader.repository = cast(interface.Repository, FakeRepository([]))
+        # nodes which do not answer pick the edit up on their next refresh
+        rpc.hang = [nodes[2]]
+        version = await leader.update_cron_task(cast(entities.CronTaskUUID, 'task-0'), {'timeout': 2.})
+        assert version == 2
+        assert rpc.calls == ['invalidate task-0 2'] * 2
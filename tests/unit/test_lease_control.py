@@ -0,0 +1,59 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import cast
+
+import pytest
+import pytest_asyncio
+
+from funtask.core import entities
+from funtask.providers.db.sql.infrastructure import Repository
+from funtask.providers.leader_scheduler_control.sql_lease_control import SQLLeaseSchedulerControl
+
+LEASE_TTL = timedelta(seconds=.5)
+
+
+def _node(uuid: str) -> entities.SchedulerNode:
+    return entities.SchedulerNode(uuid=cast(entities.SchedulerNodeUUID, uuid), host='localhost', port=0)
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    repository = Repository(f'sqlite+aiosqlite:///{tmp_path / "lease.db"}')
+    await repository.create_model_schema()
+    yield repository
+    await repository.engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestLeaseControl:
+    async def test_single_leader_and_members(self, repository):
+        controls = [SQLLeaseSchedulerControl(repository, _node(f'n{i}'), lease_ttl=LEASE_TTL) for i in range(3)]
+        elected = [await control.elect_leader(control.node.uuid) for control in controls]
+        assert elected == [True, False, False]
+        for control in controls:
+            assert (await control.get_leader()).uuid == 'n0'
+        await asyncio.sleep(LEASE_TTL.total_seconds() / 2)
+        assert [node.uuid for node in await controls[1].get_all_nodes()] == ['n0', 'n1', 'n2']
+        # renewals keep leader past ttl
+        await asyncio.sleep(LEASE_TTL.total_seconds())
+        assert await controls[1].is_he_leader(cast(entities.SchedulerNodeUUID, 'n0'))
+        for control in controls:
+            await control.stop()
+
+    async def test_failover_within_ttl(self, repository):
+        leader = SQLLeaseSchedulerControl(repository, _node('leader'), lease_ttl=LEASE_TTL)
+        follower = SQLLeaseSchedulerControl(repository, _node('follower'), lease_ttl=LEASE_TTL)
+        assert await leader.elect_leader(leader.node.uuid)
+        watch = follower.watch_leader()
+        assert (await watch.__anext__()).uuid == 'leader'
+        # leader crashes, follower takes over once lease expires without polling for it
+        await leader.stop()
+        crashed = time.perf_counter()
+        new_leader = await asyncio.wait_for(watch.__anext__(), LEASE_TTL.total_seconds() * 3)
+        failover = time.perf_counter() - crashed
+        assert new_leader.uuid == 'follower' and follower.term == leader.term + 1
+        assert failover <= LEASE_TTL.total_seconds() + .2
+        assert not await leader.is_he_leader(leader.node.uuid)
+        await watch.aclose()
+        await follower.stop()
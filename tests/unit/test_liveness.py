@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from typing import cast
+
+from funtask.core.entities import WorkerUUID
+from funtask.core.liveness import WorkerLivenessTable
+
+WORKER_A = cast(WorkerUUID, 'a')
+WORKER_B = cast(WorkerUUID, 'b')
+
+
+class TestWorkerLivenessTable:
+    def test_heart_beats_coalesced(self):
+        table = WorkerLivenessTable(timedelta(seconds=15))
+        t = datetime(2022, 1, 1)
+        for i in range(10):
+            table.beat(WORKER_A, t + timedelta(seconds=i))
+        table.beat(WORKER_B, t)
+        assert table.drain() == {WORKER_A: t + timedelta(seconds=9), WORKER_B: t}
+        assert table.drain() == {}
+
+    def test_stale_heart_beat_ignored(self):
+        table = WorkerLivenessTable()
+        t = datetime(2022, 1, 1)
+        table.beat(WORKER_A, t)
+        table.drain()
+        table.beat(WORKER_A, t - timedelta(seconds=1))
+        assert table.drain() == {}
+
+    def test_liveness_from_memory(self):
+        table = WorkerLivenessTable(timedelta(seconds=15))
+        t = datetime(2022, 1, 1)
+        table.beat(WORKER_A, t)
+        table.beat(WORKER_B, t - timedelta(seconds=20))
+        assert table.is_alive(WORKER_A, t)
+        assert not table.is_alive(WORKER_B, t)
+        assert table.alive_workers(t) == [WORKER_A]
+        table.forget(WORKER_A)
+        assert not table.is_alive(WORKER_A, t)
+
+    def test_stale_only_if_seen(self):
+        table = WorkerLivenessTable(timedelta(seconds=15))
+        t = datetime(2022, 1, 1)
+        table.beat(WORKER_A, t - timedelta(seconds=20))
+        assert table.is_stale(WORKER_A, t)
+        assert not table.is_stale(WORKER_B, t)
+        table.retain({WORKER_B})
+        assert not table.is_stale(WORKER_A, t)
+
+    def test_restore_after_failed_flush(self):
+        table = WorkerLivenessTable()
+        table.beat(WORKER_A, datetime(2022, 1, 1))
+        heart_beats = table.drain()
+        table.restore(heart_beats)
+        assert table.drain() == heart_beats
@@ -0,0 +1,337 @@
+import asyncio
+from typing import cast, List, Tuple
+
+import dill
+
+import pytest
+from grpclib.server import Server
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.task_worker_manager.manager_rpc_client import ManagerRPCClient, HashRPChooser
+from funtask.task_worker_manager.manager_service import ManagerService
+
+
+class FakeFunTaskManager:
+    def __init__(self):
+        self.statuses: asyncio.Queue[interface.StatusReport] = asyncio.Queue()
+        self.fail_next = False
+        self.broken = False
+        self.workers = []
+        self.killed = []
+        self.dispatch_batches = []
+        self.batches = []
+
+    async def increase_worker(self) -> entities.WorkerUUID:
+        if self.broken:
+            raise ConnectionError()
+        worker_uuid = cast(entities.WorkerUUID, f'worker{len(self.workers)}@{id(self)}')
+        self.workers.append(worker_uuid)
+        return worker_uuid
+
+    async def kill_worker(self, worker_uuid: entities.WorkerUUID):
+        self.killed.append(worker_uuid)
+
+    async def dispatch_fun_tasks(self, dispatches: List[interface.TaskDispatch]) -> List[entities.TaskUUID | None]:
+        self.dispatch_batches.append(len(dispatches))
+        return [
+            None if dispatch.worker_uuid == 'broken' else cast(entities.TaskUUID, f'{dispatch.worker_uuid}:{i}')
+            for i, dispatch in enumerate(dispatches)
+        ]
+
+    async def get_queued_status(self, timeout: float | None = None) -> interface.StatusReport:
+        status = await self.statuses.get()
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError()
+        return status
+
+    async def get_queued_statuses(self, max_size: int, max_delay: float) -> List[interface.StatusReport]:
+        statuses = [await self.get_queued_status()]
+        while len(statuses) < max_size and not self.statuses.empty():
+            statuses.append(await self.get_queued_status())
+        self.batches.append(len(statuses))
+        return statuses
+
+    def report(
+            self,
+            task_uuid: str | None,
+            status: entities.TaskStatus | entities.WorkerStatus | None = entities.TaskStatus.RUNNING
+    ):
+        self.statuses.put_nowait(interface.StatusReport(
+            worker_uuid=cast(entities.WorkerUUID, 'worker'),
+            task_uuid=cast(entities.TaskUUID, task_uuid),
+            status=status,
+            content=None,
+            create_timestamp=0.
+        ))
+
+
+async def _serve(manager: FakeFunTaskManager, port: int = 0) -> Tuple[Server, int]:
+    server = Server([ManagerService(manager)])
+    await server.start('127.0.0.1', port)
+    return server, server._server.sockets[0].getsockname()[1]
+
+
+async def _close(server: Server):
+    server.close()
+    await server.wait_closed()
+
+
+def _node(uuid: str, port: int) -> entities.TaskWorkerManagerNode:
+    return entities.TaskWorkerManagerNode(
+        uuid=cast(entities.TaskWorkerManagerNodeUUID, uuid),
+        host='127.0.0.1',
+        port=port
+    )
+
+
+async def _take(statuses, n: int) -> List[interface.StatusReport]:
+    return [await asyncio.wait_for(statuses.__anext__(), 5) for _ in range(n)]
+
+
+@pytest.mark.asyncio
+class TestWatchStatus:
+    async def test_statuses_of_all_nodes_as_they_arrive(self):
+        managers = [FakeFunTaskManager(), FakeFunTaskManager()]
+        servers = [await _serve(manager) for manager in managers]
+        client = ManagerRPCClient(HashRPChooser([_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]))
+        statuses = client.watch_status(buffer_size=4)
+        managers[0].report('a0')
+        managers[1].report('b0', entities.TaskStatus.QUEUED)
+        received = await _take(statuses, 2)
+        assert {(report.task_uuid, report.status) for report in received} == {
+            ('a0', entities.TaskStatus.RUNNING), ('b0', entities.TaskStatus.QUEUED)
+        }
+        # same stream keeps delivering
+        managers[1].report('b1', entities.TaskStatus.SUCCESS)
+        assert [report.task_uuid for report in await _take(statuses, 1)] == ['b1']
+        lags = client.get_status_lags()
+        assert set(lags) == {'n0', 'n1'}
+        assert lags['n0'].delivered == 1 and lags['n1'].delivered == 2
+        assert all(lag.connected and lag.buffered == 0 for lag in lags.values())
+        await statuses.aclose()
+        for server, _ in servers:
+            await _close(server)
+
+    async def test_worker_statuses(self):
+        manager = FakeFunTaskManager()
+        server, port = await _serve(manager)
+        client = ManagerRPCClient(HashRPChooser([_node('n0', port)]))
+        statuses = client.watch_status()
+        manager.report(None, entities.WorkerStatus.DIED)
+        manager.report(None, None)
+        assert [report.status for report in await _take(statuses, 2)] == [entities.WorkerStatus.DIED, None]
+        await statuses.aclose()
+        await _close(server)
+
+    async def test_follows_node_changes(self):
+        managers = [FakeFunTaskManager(), FakeFunTaskManager()]
+        servers = [await _serve(manager) for manager in managers]
+        nodes = [_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]
+        chooser = HashRPChooser([])
+        client = ManagerRPCClient(chooser)
+        # subscription starts before any node is known
+        statuses = client.watch_status()
+        managers[0].report('a0')
+        chooser.channel_node_changes(nodes[:1])
+        assert [report.task_uuid for report in await _take(statuses, 1)] == ['a0']
+        chooser.channel_node_changes(nodes[1:])
+        managers[1].report('b0')
+        assert [report.task_uuid for report in await _take(statuses, 1)] == ['b0']
+        # stream of removed node is closed
+        await asyncio.sleep(.1)
+        assert not client.get_status_lags()['n0'].connected
+        await statuses.aclose()
+        for server, _ in servers:
+            await _close(server)
+
+    async def test_reconnect(self):
+        manager = FakeFunTaskManager()
+        server, port = await _serve(manager)
+        client = ManagerRPCClient(HashRPChooser([_node('n0', port)]))
+        statuses = client.watch_status()
+        manager.report('t0')
+        assert [report.task_uuid for report in await _take(statuses, 1)] == ['t0']
+        # stream breaks on manager side, status it held is lost with it
+        manager.fail_next = True
+        manager.report('lost')
+        manager.report('t1')
+        assert [report.task_uuid for report in await _take(statuses, 1)] == ['t1']
+        await statuses.aclose()
+        await _close(server)
+
+
+@pytest.mark.asyncio
+class TestGetQueuedStatus:
+    async def test_polls_all_nodes(self):
+        managers = [FakeFunTaskManager(), FakeFunTaskManager()]
+        servers = [await _serve(manager) for manager in managers]
+        client = ManagerRPCClient(HashRPChooser([_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]))
+        managers[0].report('a0')
+        managers[1].report('b0')
+        managers[1].report('b1')
+        received = [report async for report in client.get_queued_status(timeout=.5)]
+        assert received[-1] is None
+        assert {report.task_uuid for report in received[:-1]} == {'a0', 'b0', 'b1'}
+        for server, _ in servers:
+            await _close(server)
+
+
+@pytest.mark.asyncio
+class TestChannelPool:
+    async def test_rpcs_share_channel(self):
+        manager = FakeFunTaskManager()
+        server, port = await _serve(manager)
+        chooser = HashRPChooser([_node('n0', port)])
+        client = ManagerRPCClient(chooser)
+        channel = await chooser.get_channel(b'key')
+        manager.report('t0')
+        manager.report('t1')
+        received = [report async for report in client.get_queued_status(timeout=.2)]
+        assert [report.task_uuid for report in received[:-1]] == ['t0', 't1']
+        assert await chooser.get_channel(b'other') is channel
+        chooser.channel_node_changes([])
+        assert len(chooser.channel_pool) == 0
+        await _close(server)
+
+    async def test_idle_sweep_keeps_channel_with_open_stream(self):
+        manager = FakeFunTaskManager()
+        server, port = await _serve(manager)
+        chooser = HashRPChooser([_node('n0', port)], idle_timeout=0.)
+        statuses = ManagerRPCClient(chooser).watch_status()
+        manager.report('t0')
+        await _take(statuses, 1)
+        chooser.channel_pool.sweep()
+        assert len(chooser.channel_pool) == 1
+        await statuses.aclose()
+        # cancelled stream is released by the next loop iterations
+        await asyncio.sleep(.05)
+        chooser.channel_pool.sweep()
+        assert len(chooser.channel_pool) == 0
+        await _close(server)
+
+
+@pytest.mark.asyncio
+class TestWorkerLocation:
+    async def test_rpcs_go_to_owning_node(self):
+        managers = [FakeFunTaskManager() for _ in range(3)]
+        servers = [await _serve(manager) for manager in managers]
+        client = ManagerRPCClient(HashRPChooser([_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]))
+        workers = [await client.increase_worker() for _ in range(12)]
+        for worker in workers:
+            owner = next(i for i, manager in enumerate(managers) if worker in manager.workers)
+            assert await client.get_worker_node(worker) == f'n{owner}'
+            await client.kill_worker(worker)
+            assert managers[owner].killed[-1] == worker
+        assert sum(len(manager.killed) for manager in managers) == len(workers)
+        # killed workers are forgotten
+        assert len(client.worker_directory) == 0
+        for server, _ in servers:
+            await _close(server)
+
+
+@pytest.mark.asyncio
+class TestNodeHealth:
+    async def test_placement_avoids_failing_node(self):
+        managers = [FakeFunTaskManager(), FakeFunTaskManager()]
+        managers[0].broken = True
+        servers = [await _serve(manager) for manager in managers]
+        client = ManagerRPCClient(HashRPChooser([_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]))
+        failures = 0
+        for _ in range(40):
+            try:
+                await client.increase_worker()
+            except Exception:
+                failures += 1
+        health = client.get_nodes_health()
+        assert failures == health['n0'].failures
+        # failing node is left once it failed, at latest when its circuit opens after min requests
+        assert failures <= 5
+        assert len(managers[1].workers) == 40 - failures
+        assert health['n1'].state is interface.CircuitState.CLOSED
+        for server, _ in servers:
+            await _close(server)
+
+    async def test_shed_when_all_nodes_open(self):
+        manager = FakeFunTaskManager()
+        manager.broken = True
+        server, port = await _serve(manager)
+        client = ManagerRPCClient(HashRPChooser([_node('n0', port)]))
+        for _ in range(5):
+            with pytest.raises(Exception):
+                await client.increase_worker()
+        assert client.get_nodes_health()['n0'].state is interface.CircuitState.OPEN
+        with pytest.raises(interface.NoNodeException):
+            await client.increase_worker()
+        await _close(server)
+
+
+def _dispatch(worker_uuid: str) -> interface.FunTaskDispatch:
+    return interface.FunTaskDispatch(cast(entities.WorkerUUID, worker_uuid), dill.dumps(None), [], False, 1., None)
+
+
+@pytest.mark.asyncio
+class TestDispatchBatch:
+    async def _client(self):
+        managers = [FakeFunTaskManager(), FakeFunTaskManager()]
+        servers = [await _serve(manager) for manager in managers]
+        client = ManagerRPCClient(HashRPChooser([_node(f'n{i}', port) for i, (_, port) in enumerate(servers)]))
+        for worker in ('a', 'broken'):
+            client.worker_directory.set(cast(entities.WorkerUUID, worker), 'n0')
+        client.worker_directory.set(cast(entities.WorkerUUID, 'b'), 'n1')
+        return managers, servers, client
+
+    async def test_one_request_per_node(self):
+        managers, servers, client = await self._client()
+        tasks_uuid = await client.dispatch_fun_tasks([_dispatch(w) for w in ('a', 'b', 'broken', 'a')])
+        # uuids are numbered by position in the batch of each node
+        assert tasks_uuid == ['a:0', 'b:0', None, 'a:2']
+        assert [manager.dispatch_batches for manager in managers] == [[3], [1]]
+        for server, _ in servers:
+            await _close(server)
+
+    async def test_stream(self):
+        managers, servers, client = await self._client()
+
+        async def batches():
+            yield [_dispatch('a'), _dispatch('b')]
+            yield [_dispatch('b'), _dispatch('broken')]
+            yield [_dispatch('a')]
+
+        tasks_uuid = await client.stream_dispatch_fun_tasks(batches())
+        assert tasks_uuid == ['a:0', 'b:0', 'b:0', None, 'a:0']
+        assert [manager.dispatch_batches for manager in managers] == [[1, 1, 1], [1, 1]]
+        for server, _ in servers:
+            await _close(server)
+
+    async def test_stream_batches_fail(self):
+        managers, servers, client = await self._client()
+
+        async def batches():
+            yield [_dispatch('a'), _dispatch('b')]
+            raise RuntimeError('batches failed')
+
+        with pytest.raises(RuntimeError):
+            await client.stream_dispatch_fun_tasks(batches())
+        # node streams are finished with the failed call instead of left running
+        assert not [
+            task for task in asyncio.all_tasks()
+            if task.get_coro().__qualname__.endswith('_stream_dispatch_to_node')
+        ]
+        for server, _ in servers:
+            await _close(server)
+
+
+@pytest.mark.asyncio
+class TestStatusBatch:
+    async def test_unbatch(self):
+        manager = FakeFunTaskManager()
+        server, port = await _serve(manager)
+        client = ManagerRPCClient(HashRPChooser([_node('n0', port)]), status_batch_size=4)
+        for i in range(10):
+            manager.report(f't{i}')
+        statuses = client.watch_status()
+        assert [report.task_uuid for report in await _take(statuses, 10)] == [f't{i}' for i in range(10)]
+        assert manager.batches == [4, 4, 2]
+        await statuses.aclose()
+        await _close(server)
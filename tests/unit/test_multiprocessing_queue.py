@@ -0,0 +1,94 @@
+import asyncio
+import multiprocessing
+import time
+
+import pytest
+
+from funtask.core.interface_and_types import BreakRef
+from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueue
+
+
+class _Flag(BreakRef):
+    def __init__(self):
+        self.stopped = False
+
+    def if_break_now(self) -> bool:
+        return self.stopped
+
+
+def _report_qsize(q: MultiprocessingQueue, sizes):
+    sizes.put(asyncio.run(q.qsize()))
+
+
+@pytest.mark.asyncio
+class TestMultiprocessingQueue:
+    async def test_get_waits_off_event_loop(self):
+        q = MultiprocessingQueue()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(.001)
+
+        ticker = asyncio.create_task(tick())
+        assert await q.get(.2) is None
+        ticker.cancel()
+        # loop kept running while get waited, polling get blocks it for most of the wait
+        assert ticks > 50
+
+    async def test_get_returns_item_put_while_waiting(self):
+        q = MultiprocessingQueue()
+        get = asyncio.create_task(q.get(5))
+        await asyncio.sleep(.05)
+        await q.put('item')
+        assert await get == 'item'
+
+    async def test_break_stops_get(self):
+        q = MultiprocessingQueue()
+        flag = _Flag()
+        get = asyncio.create_task(q.watch_and_get(flag))
+        await asyncio.sleep(.05)
+        flag.stopped = True
+        start = time.monotonic()
+        assert await asyncio.wait_for(get, 2) is None
+        assert time.monotonic() - start < 1
+
+    async def test_cancelled_get_does_not_lose_item(self):
+        q = MultiprocessingQueue()
+        get = asyncio.create_task(q.get())
+        await asyncio.sleep(.05)
+        await q.put('item')
+        get.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await get
+        assert await q.get(1) == 'item'
+
+    async def test_get_batch_drains_queue(self):
+        q = MultiprocessingQueue()
+        for i in range(5):
+            await q.put(i)
+        await asyncio.sleep(.05)
+        assert await q.get_batch(3, 1) == [0, 1, 2]
+        assert await q.get_batch(10, 1) == [3, 4]
+        assert await q.get_batch(10, .05) == []
+
+    async def test_stash_not_inherited_by_fork(self):
+        q = MultiprocessingQueue()
+        get = asyncio.create_task(q.get())
+        await asyncio.sleep(.05)
+        await q.put('item')
+        get.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await get
+        await asyncio.sleep(.1)
+        assert await q.qsize() == 1
+        ctx = multiprocessing.get_context('fork')
+        sizes = ctx.Queue()
+        child = ctx.Process(target=_report_qsize, args=(q, sizes))
+        child.start()
+        # stashed item belongs to parent only, child would otherwise serve it a second time
+        assert sizes.get(timeout=5) == 0
+        child.join(5)
+        assert await q.get(1) == 'item'
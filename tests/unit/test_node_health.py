@@ -0,0 +1,52 @@
+from funtask.core.interface_and_types import CircuitState
+from funtask.task_worker_manager.node_health import NodeHealthTracker
+
+
+class TestNodeHealthTracker:
+    def test_latency_ewma(self):
+        tracker = NodeHealthTracker(alpha=.5)
+        tracker.record('n', 1., True, now=0.)
+        tracker.record('n', 3., True, now=0.)
+        assert tracker.latency('n') == 2.
+        assert tracker.latency('unknown') == 0.
+
+    def test_opens_after_min_requests(self):
+        tracker = NodeHealthTracker(min_requests=5)
+        for _ in range(4):
+            tracker.record('n', .1, False, now=0.)
+        assert tracker.allow('n', now=0.)
+        tracker.record('n', .1, False, now=0.)
+        assert tracker.state('n', now=0.) is CircuitState.OPEN
+        assert not tracker.allow('n', now=1.)
+
+    def test_recovers_after_successful_probe(self):
+        tracker = NodeHealthTracker(alpha=1., min_requests=1, open_timeout=10.)
+        tracker.record('n', .1, False, now=0.)
+        assert tracker.state('n', now=10.) is CircuitState.HALF_OPEN
+        assert tracker.allow('n', now=10.)
+        # one probe at a time
+        assert not tracker.allow('n', now=11.)
+        tracker.record('n', .1, True, now=12.)
+        assert tracker.state('n', now=12.) is CircuitState.CLOSED
+        assert tracker.health(now=12.)['n'].error_rate == 0.
+
+    def test_failed_probe_opens_again(self):
+        tracker = NodeHealthTracker(alpha=1., min_requests=1, open_timeout=10.)
+        tracker.record('n', .1, False, now=0.)
+        assert tracker.allow('n', now=10.)
+        tracker.record('n', .1, False, now=11.)
+        assert tracker.state('n', now=20.) is CircuitState.OPEN
+        assert tracker.state('n', now=21.) is CircuitState.HALF_OPEN
+
+    def test_lost_probe_is_given_up(self):
+        tracker = NodeHealthTracker(alpha=1., min_requests=1, open_timeout=10.)
+        tracker.record('n', .1, False, now=0.)
+        assert tracker.allow('n', now=10.)
+        assert tracker.allow('n', now=20.)
+
+    def test_retain(self):
+        tracker = NodeHealthTracker()
+        tracker.record('a', .1, True)
+        tracker.record('b', .1, True)
+        tracker.retain({'a'})
+        assert list(tracker.health()) == ['a']
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from typing import cast
+
+from funtask.core import entities
+from funtask.core.placement import TaskCostTable, bin_pack, fire_rate
+
+
+def _uuid(uuid: str) -> entities.CronTaskUUID:
+    return cast(entities.CronTaskUUID, uuid)
+
+
+class TestTaskCost:
+    def test_fire_rate(self):
+        cron_task = SimpleNamespace(timepoints=[
+            entities.TimePoint(unit=entities.TimeUnit.MILLISECOND, n=10, at=None),
+            entities.TimePoint(unit=entities.TimeUnit.SECOND, n=2, at=None)
+        ])
+        assert fire_rate(cast(entities.CronTask, cron_task)) == 100.5
+
+    def test_moving_average(self):
+        costs = TaskCostTable(alpha=.5, default_cost=.01)
+        assert costs.cost(_uuid('a')) == .01
+        costs.observe_udf(_uuid('a'), .002)
+        costs.observe_udf(_uuid('a'), .004)
+        costs.observe_dispatch(_uuid('a'), .001)
+        assert costs.cost(_uuid('a')) == .004
+        costs.forget(_uuid('a'))
+        assert costs.cost(_uuid('a')) == .01
+
+
+class TestBinPack:
+    def test_no_move_under_capacity(self):
+        removes, assigns = bin_pack(
+            {'n0': [_uuid('a'), _uuid('b')], 'n1': []},
+            {_uuid('a'): .3, _uuid('b'): .3},
+            {'n0': 1., 'n1': 1.}
+        )
+        assert not removes and not assigns
+
+    def test_heavy_task_leaves_overloaded_node(self):
+        removes, assigns = bin_pack(
+            {'n0': [_uuid('heavy'), _uuid('light0'), _uuid('light1')], 'n1': [_uuid('light2')]},
+            {_uuid('heavy'): .8, _uuid('light0'): .1, _uuid('light1'): .1, _uuid('light2'): .1},
+            {'n0': .9, 'n1': .9}
+        )
+        # moving one heavy task beats moving many light ones
+        assert removes == {'n0': [_uuid('heavy')]} and assigns == {'n1': [_uuid('heavy')]}
+
+    def test_gone_node_tasks_spread(self):
+        removes, assigns = bin_pack(
+            {'gone': [_uuid(f't{i}') for i in range(4)], 'n0': [], 'n1': []},
+            {_uuid(f't{i}'): .1 for i in range(4)},
+            {'n0': 1., 'n1': 1.}
+        )
+        assert not removes
+        assert sorted(len(task_uuids) for task_uuids in assigns.values()) == [2, 2]
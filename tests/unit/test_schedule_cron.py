@@ -0,0 +1,16 @@
+import pytest
+
+from funtask.providers.cron.schedule_cron import SchedulerCron
+
+
+@pytest.mark.asyncio
+class TestOffset:
+    async def test_offset_rejected(self):
+        # no scheduler process is started, offset is checked before the job is touched
+        cron = SchedulerCron.__new__(SchedulerCron)
+        for schedule in (cron.every_n_seconds, cron.every_n_minutes, cron.every_n_hours, cron.every_n_days,
+                         cron.every_n_weeks):
+            with pytest.raises(ValueError):
+                await schedule('job', 1, lambda: None, offset=.5)
+        with pytest.raises(ValueError):
+            await cron.every_n_millisecond('job', 1, lambda: None, offset=.5)
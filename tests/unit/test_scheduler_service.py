@@ -0,0 +1,34 @@
+from typing import cast, List, Tuple
+
+import pytest
+from grpclib.server import Server
+
+from funtask.core import entities
+from funtask.providers.leader_scheduler.grpc_leader_scheduler import GRPCLeaderScheduler, _gen_stub
+from funtask.scheduler.scheduler_service import SchedulerRPCService
+
+
+class FakeWorkerScheduler:
+    def __init__(self):
+        self.invalidated: List[Tuple[entities.CronTaskUUID, int]] = []
+
+    async def invalidate_cron_task(self, task_uuid: entities.CronTaskUUID, version: int):
+        self.invalidated.append((task_uuid, version))
+
+
+@pytest.mark.asyncio
+class TestSchedulerRPCService:
+    async def test_invalidate_task(self):
+        worker_scheduler = FakeWorkerScheduler()
+        server = Server([SchedulerRPCService(worker_scheduler)])
+        await server.start('127.0.0.1', 0)
+        node = entities.SchedulerNode(
+            uuid=cast(entities.SchedulerNodeUUID, 'n0'),
+            host='127.0.0.1',
+            port=server._server.sockets[0].getsockname()[1]
+        )
+        await GRPCLeaderScheduler().invalidate_task_on_node(node, cast(entities.CronTaskUUID, 'a'), 3)
+        assert worker_scheduler.invalidated == [('a', 3)]
+        _gen_stub(node).channel.close()
+        server.close()
+        await server.wait_closed()
@@ -0,0 +1,58 @@
+from typing import cast
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.core.status_compaction import compact_statuses
+
+TaskStatus = entities.TaskStatus
+
+
+def _status(
+        task_uuid: str | None,
+        status: entities.TaskStatus | entities.WorkerStatus | None,
+        worker_uuid: str = 'w0',
+        content=None
+) -> interface.StatusReport:
+    return interface.StatusReport(
+        worker_uuid=cast(entities.WorkerUUID, worker_uuid),
+        task_uuid=cast(entities.TaskUUID, task_uuid),
+        status=status,
+        content=content,
+        create_timestamp=0.
+    )
+
+
+def _keys(statuses):
+    return [(status.task_uuid or status.worker_uuid, status.status) for status in statuses]
+
+
+class TestCompactStatuses:
+    def test_collapse_intermediate_task_statuses(self):
+        statuses = [
+            _status('t0', TaskStatus.QUEUED),
+            _status('t1', TaskStatus.QUEUED),
+            _status('t0', TaskStatus.RUNNING),
+            _status('t0', TaskStatus.SUCCESS, content='result'),
+            _status('t1', TaskStatus.RUNNING)
+        ]
+        compacted = compact_statuses(statuses)
+        assert _keys(compacted) == [('t0', TaskStatus.SUCCESS), ('t1', TaskStatus.RUNNING)]
+        assert compacted[0].content == 'result'
+
+    def test_final_statuses_are_kept(self):
+        statuses = [
+            _status('t0', TaskStatus.ERROR, content='first'),
+            _status('t0', TaskStatus.SUCCESS, content='second')
+        ]
+        assert compact_statuses(statuses) == statuses
+
+    def test_dedupe_heart_beats_per_worker(self):
+        statuses = [
+            _status(None, None, 'w0'),
+            _status(None, None, 'w1'),
+            _status(None, None, 'w0'),
+            _status(None, entities.WorkerStatus.STOPPING, 'w1'),
+            _status(None, entities.WorkerStatus.STOPPED, 'w1')
+        ]
+        assert _keys(compact_statuses(statuses)) == [
+            ('w0', None), ('w1', entities.WorkerStatus.STOPPING), ('w1', entities.WorkerStatus.STOPPED)
+        ]
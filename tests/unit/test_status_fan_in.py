@@ -0,0 +1,60 @@
+import asyncio
+from typing import cast
+
+import pytest
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.task_worker_manager.status_fan_in import StatusFanIn
+
+
+def _status(task_uuid: str) -> interface.StatusReport:
+    return interface.StatusReport(
+        worker_uuid=cast(entities.WorkerUUID, 'worker'),
+        task_uuid=cast(entities.TaskUUID, task_uuid),
+        status=entities.TaskStatus.RUNNING,
+        content=None,
+        create_timestamp=0.
+    )
+
+
+@pytest.mark.asyncio
+class TestStatusFanIn:
+    async def test_busy_node_does_not_starve_others(self):
+        fan_in = StatusFanIn(buffer_size=100)
+        fan_in.add_node('busy')
+        fan_in.add_node('quiet')
+        for i in range(10):
+            await fan_in.put('busy', _status(f'b{i}'))
+        await fan_in.put('quiet', _status('q0'))
+        received = [(await fan_in.get()).task_uuid for _ in range(3)]
+        assert 'q0' in received[:2]
+        assert received.count('b0') == 1
+
+    async def test_full_buffer_blocks_only_its_node(self):
+        fan_in = StatusFanIn(buffer_size=2)
+        fan_in.add_node('a')
+        fan_in.add_node('b')
+        await fan_in.put('a', _status('a0'))
+        await fan_in.put('a', _status('a1'))
+        blocked = asyncio.create_task(fan_in.put('a', _status('a2')))
+        await asyncio.sleep(.01)
+        assert not blocked.done()
+        await asyncio.wait_for(fan_in.put('b', _status('b0')), 1)
+        assert (await fan_in.get()).task_uuid == 'a0'
+        await asyncio.wait_for(blocked, 1)
+        assert [(await fan_in.get()).task_uuid for _ in range(3)] == ['b0', 'a1', 'a2']
+        assert fan_in.get_nowait() is None
+
+    async def test_lags(self):
+        fan_in = StatusFanIn()
+        fan_in.add_node('a')
+        fan_in.add_node('b')
+        fan_in.set_connected('a', True)
+        await fan_in.put('a', _status('a0'))
+        await fan_in.put('a', _status('a1'))
+        await asyncio.sleep(.02)
+        await fan_in.get()
+        lags = fan_in.lags()
+        assert lags['a'].buffered == 1 and lags['a'].delivered == 1 and lags['a'].connected
+        assert lags['a'].lag >= .02
+        assert lags['b'] == interface.StatusStreamLag(buffered=0, lag=0., delivered=0, connected=False)
@@ -0,0 +1,43 @@
+from typing import cast, List
+
+from funtask.core import entities
+from funtask.core.tag_index import WorkerTagIndex, parse_tag_expression
+
+
+def _worker(uuid: str, tags: List[str], status: entities.WorkerStatus = entities.WorkerStatus.RUNNING):
+    return entities.Worker(uuid=cast(entities.WorkerUUID, uuid), status=status, tags=tags)
+
+
+class TestWorkerTagIndex:
+    def test_parse_expression(self):
+        assert parse_tag_expression(['gpu & large', 'cpu', '']) == [frozenset({'gpu', 'large'}), frozenset({'cpu'})]
+
+    def test_match_and_or(self):
+        index = WorkerTagIndex()
+        index.replace_all([
+            _worker('a', ['gpu', 'large']),
+            _worker('b', ['gpu']),
+            _worker('c', ['cpu']),
+            _worker('d', ['gpu', 'large'], entities.WorkerStatus.STOPPED)
+        ])
+        assert index.loaded
+        assert index.match(['gpu']) == {'a', 'b'}
+        assert index.match(['gpu&large']) == {'a'}
+        assert index.match(['gpu&large', 'cpu']) == {'a', 'c'}
+        assert index.match(['unknown']) == set()
+
+    def test_incremental_updates(self):
+        index = WorkerTagIndex()
+        index.add_worker(_worker('a', ['gpu']))
+        index.add_worker(_worker('b', ['gpu'], entities.WorkerStatus.STOPPED))
+        assert index.match(['gpu']) == {'a'}
+        index.set_status(cast(entities.WorkerUUID, 'b'), entities.WorkerStatus.RUNNING)
+        index.set_status(cast(entities.WorkerUUID, 'a'), entities.WorkerStatus.DIED)
+        assert index.match(['gpu']) == {'b'}
+        index.set_tags(cast(entities.WorkerUUID, 'b'), ['cpu'])
+        assert index.match(['gpu']) == set() and index.match(['cpu']) == {'b'}
+        index.remove_worker(cast(entities.WorkerUUID, 'b'))
+        assert index.match(['cpu']) == set() and len(index) == 1
+        # status of unknown workers is ignored
+        index.set_status(cast(entities.WorkerUUID, 'c'), entities.WorkerStatus.RUNNING)
+        assert 'c' not in index
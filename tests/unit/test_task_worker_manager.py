@@ -0,0 +1,134 @@
+from typing import cast
+
+import pytest
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.core.task_worker_manager import FunTaskManager
+from funtask.providers.loggers.std import StdLogger
+from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueue, MultiprocessingQueueFactory
+from funtask.providers.worker_manager.multiprocessing_manager import MultiprocessingManager
+
+WORKER = cast(entities.WorkerUUID, 'worker')
+
+
+def _task(_):
+    return None
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.asyncio
+class TestWorkerLoad:
+    async def test_queued_and_running(self):
+        task_status_queue = MultiprocessingQueue()
+        worker_manager = MultiprocessingManager(
+            StdLogger(),
+            task_queue_factory=MultiprocessingQueueFactory().factory,
+            control_queue_factory=MultiprocessingQueueFactory().factory,
+            task_status_queue=task_status_queue
+        )
+        manager = FunTaskManager(worker_manager=worker_manager, task_status_queue=task_status_queue)
+        tasks_uuid = [await manager.dispatch_fun_task(WORKER, _task) for _ in range(3)]
+        assert await manager.get_worker_load(WORKER) == interface.WorkerLoad(queued=3, running=0)
+        # worker takes two tasks and finishes one of them
+        task_queue = await worker_manager.get_task_queue(WORKER)
+        await task_queue.get()
+        await task_queue.get()
+        await task_status_queue.put(interface.StatusQueueMessage(
+            WORKER, tasks_uuid[0], entities.TaskStatus.SUCCESS, None
+        ))
+        while await manager.get_queued_status(.1) is not None:
+            ...
+        # one finished task in throughput window
+        assert await manager.get_worker_load(WORKER) == interface.WorkerLoad(queued=1, running=1, throughput=.1)
+        assert await manager.get_worker_load(cast(entities.WorkerUUID, 'idle')) == interface.WorkerLoad(0, 0)
+        assert list(await manager.get_workers_load_snapshot()) == [WORKER]
+
+    async def test_gone_worker_forgotten(self):
+        task_status_queue = MultiprocessingQueue()
+        worker_manager = MultiprocessingManager(
+            StdLogger(),
+            task_queue_factory=MultiprocessingQueueFactory().factory,
+            control_queue_factory=MultiprocessingQueueFactory().factory,
+            task_status_queue=task_status_queue
+        )
+        manager = FunTaskManager(worker_manager=worker_manager, task_status_queue=task_status_queue)
+        tasks_uuid = [await manager.dispatch_fun_task(WORKER, _task) for _ in range(2)]
+        # worker stop signal is reported without task, unfinished tasks are lost
+        for message in (
+                interface.StatusQueueMessage(WORKER, None, entities.TaskStatus.ERROR, None),
+                interface.StatusQueueMessage(WORKER, tasks_uuid[0], entities.TaskStatus.SUCCESS, None)
+        ):
+            await task_status_queue.put(message)
+        while await manager.get_queued_status(.1) is not None:
+            ...
+        assert not await manager.get_workers_load_snapshot()
+        assert not manager._finished_counters
+
+
+@pytest.mark.timeout(5)
+@pytest.mark.asyncio
+class TestDispatchBatch:
+    async def test_dispatch_fun_tasks(self):
+        task_status_queue = MultiprocessingQueue()
+        queue_factory = MultiprocessingQueueFactory()
+        worker_manager = MultiprocessingManager(
+            StdLogger(),
+            task_queue_factory=queue_factory.factory,
+            control_queue_factory=MultiprocessingQueueFactory().factory,
+            task_status_queue=task_status_queue
+        )
+        manager = FunTaskManager(worker_manager=worker_manager, task_status_queue=task_status_queue)
+        other = cast(entities.WorkerUUID, 'other')
+        tasks_uuid = await manager.dispatch_fun_tasks([
+            interface.TaskDispatch(WORKER, _task, arguments=(1,)),
+            interface.TaskDispatch(other, _task),
+            interface.TaskDispatch(WORKER, _task, timeout=3.)
+        ])
+        assert len(set(tasks_uuid)) == 3 and None not in tasks_uuid
+        task_queue = await worker_manager.get_task_queue(WORKER)
+        messages = [await task_queue.get(), await task_queue.get()]
+        assert [message.task_meta.arguments for message in messages] == [(1,), ()]
+        assert messages[1].task_meta.timeout == 3.
+        assert await (await worker_manager.get_task_queue(other)).qsize() == 1
+        # queued is acknowledged by dispatch only
+        assert await manager.get_queued_status(.05) is None
+
+    async def test_get_queued_statuses(self):
+        task_status_queue = MultiprocessingQueue()
+        worker_manager = MultiprocessingManager(
+            StdLogger(),
+            task_queue_factory=MultiprocessingQueueFactory().factory,
+            control_queue_factory=MultiprocessingQueueFactory().factory,
+            task_status_queue=task_status_queue
+        )
+        manager = FunTaskManager(worker_manager=worker_manager, task_status_queue=task_status_queue)
+        tasks_uuid = [cast(entities.TaskUUID, f'task{i}') for i in range(5)]
+        await task_status_queue.put_batch([
+            interface.StatusQueueMessage(WORKER, task_uuid, entities.TaskStatus.RUNNING, None) for task_uuid in tasks_uuid
+        ])
+        first = await manager.get_queued_statuses(3, .2)
+        assert [report.task_uuid for report in first] == tasks_uuid[:3]
+        # batch is sent unfilled once delay passed
+        rest = await manager.get_queued_statuses(10, .05)
+        assert [report.task_uuid for report in rest] == tasks_uuid[3:]
+
+    async def test_status_compaction_window(self):
+        task_status_queue = MultiprocessingQueue()
+        worker_manager = MultiprocessingManager(
+            StdLogger(),
+            task_queue_factory=MultiprocessingQueueFactory().factory,
+            control_queue_factory=MultiprocessingQueueFactory().factory,
+            task_status_queue=task_status_queue
+        )
+        manager = FunTaskManager(
+            worker_manager=worker_manager,
+            task_status_queue=task_status_queue,
+            status_compaction_window=.1
+        )
+        task_uuid = await manager.dispatch_fun_task(WORKER, _task)
+        await task_status_queue.put(interface.StatusQueueMessage(WORKER, task_uuid, entities.TaskStatus.RUNNING, None))
+        await task_status_queue.put(interface.StatusQueueMessage(WORKER, task_uuid, entities.TaskStatus.SUCCESS, 1))
+        # client asks for no delay, window still collects both
+        statuses = await manager.get_queued_statuses(10, 0.)
+        assert [(report.status, report.content) for report in statuses] == [(entities.TaskStatus.SUCCESS, 1)]
+        assert await manager.get_worker_load(WORKER) == interface.WorkerLoad(queued=1, running=0, throughput=.1)
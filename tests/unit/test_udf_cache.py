@@ -0,0 +1,57 @@
+from typing import cast
+
+import dill
+
+from funtask.core import entities
+from funtask.core.udf_cache import UDFCache
+
+
+def _udf(value: int):
+    def udf(info_dict):
+        return value
+
+    return udf
+
+
+def _func(uuid: str, value: int) -> entities.Func:
+    return entities.Func(
+        uuid=cast(entities.FuncUUID, uuid),
+        func=dill.dumps(_udf(value)),
+        dependencies=[],
+        parameter_schema=None,
+        description=''
+    )
+
+
+class TestUDFCache:
+    def test_loaded_once(self):
+        cache = UDFCache()
+        func = _func('a', 1)
+        assert cache.get(func) is cache.get(func)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_reload_on_content_change(self):
+        cache = UDFCache()
+        assert cache.get(_func('a', 1))({}) == 1
+        assert cache.get(_func('a', 2))({}) == 2
+        assert cache.misses == 2
+
+    def test_lru_eviction(self):
+        cache = UDFCache(max_size=2)
+        a, b, c = _func('a', 1), _func('b', 2), _func('c', 3)
+        cache.get(a)
+        cache.get(b)
+        cache.get(a)
+        cache.get(c)
+        assert len(cache) == 2
+        cache.get(a)
+        assert cache.hits == 2
+        cache.get(b)
+        assert cache.misses == 4
+
+    def test_disabled(self):
+        cache = UDFCache(max_size=0)
+        func = _func('a', 1)
+        cache.get(func)
+        cache.get(func)
+        assert len(cache) == 0 and cache.misses == 2
@@ -0,0 +1,84 @@
+import asyncio
+from typing import cast
+
+import pytest
+import pytest_asyncio
+
+from funtask.core import entities
+from funtask.providers.db.sql.infrastructure import Repository
+from funtask.task_worker_manager.worker_directory import WorkerDirectory
+
+
+def _worker(uuid: str, node_uuid: str | None) -> entities.Worker:
+    return entities.Worker(
+        uuid=cast(entities.WorkerUUID, uuid),
+        status=entities.WorkerStatus.RUNNING,
+        manager_node_uuid=cast(entities.TaskWorkerManagerNodeUUID, node_uuid)
+    )
+
+
+class CountingRepository(Repository):
+    def __init__(self, uri: str):
+        super().__init__(uri)
+        self.lookups = 0
+
+    async def get_workers_manager_node(self, workers_uuid, session=None):
+        self.lookups += 1
+        return await super().get_workers_manager_node(workers_uuid, session)
+
+
+@pytest_asyncio.fixture
+async def repository(tmp_path):
+    repository = CountingRepository(f'sqlite+aiosqlite:///{tmp_path / "directory.db"}')
+    await repository.create_model_schema()
+    yield repository
+    await repository.engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestWorkerDirectory:
+    async def test_load_from_repository_once(self, repository):
+        await repository.add_worker(_worker('w0', 'n0'))
+        await repository.add_worker(_worker('w1', 'n1'))
+        await repository.add_worker(_worker('legacy', None))
+        directory = WorkerDirectory(repository)
+        assert await directory.get_many(['w0', 'w1', 'legacy', 'unknown']) == {'w0': 'n0', 'w1': 'n1'}
+        assert repository.lookups == 1
+        # hits and misses are both cached
+        assert await directory.get('w1') == 'n1'
+        assert await directory.get('unknown') is None
+        assert repository.lookups == 1
+        assert (await repository.get_workers_from_cursor(10))[0][0].manager_node_uuid == 'n0'
+
+    async def test_unknown_expires(self, repository):
+        directory = WorkerDirectory(repository, unknown_ttl=.05)
+        assert await directory.get('w0') is None
+        # asked for before the worker record is committed
+        await repository.add_worker(_worker('w0', 'n0'))
+        assert await directory.get('w0') is None
+        assert repository.lookups == 1
+        await asyncio.sleep(.06)
+        assert await directory.get('w0') == 'n0'
+        assert repository.lookups == 2
+        assert await directory.get('w0') == 'n0'
+        assert repository.lookups == 2
+
+    async def test_set_and_invalidate(self, repository):
+        directory = WorkerDirectory(repository)
+        directory.set('w0', 'n0')
+        directory.set('w1', 'n1')
+        assert await directory.get('w0') == 'n0'
+        assert repository.lookups == 0
+        directory.invalidate('w0')
+        assert await directory.get('w0') is None
+        assert repository.lookups == 1
+        directory.invalidate_node('n1')
+        assert len(directory) == 1
+
+    async def test_cache_size(self):
+        directory = WorkerDirectory(cache_size=2)
+        for i in range(3):
+            directory.set(f'w{i}', 'n0')
+        assert len(directory) == 2
+        assert await directory.get('w0') is None
+        assert await directory.get('w2') == 'n0'
@@ -0,0 +1,28 @@
+from typing import cast
+
+from funtask.core.entities import WorkerUUID
+from funtask.core.interface_and_types import WorkerLoad
+from funtask.core.worker_load import WorkerLoadTable
+
+WORKER_A = cast(WorkerUUID, 'a')
+WORKER_B = cast(WorkerUUID, 'b')
+
+
+class TestWorkerLoadTable:
+    def test_stale_snapshot_unknown(self):
+        table = WorkerLoadTable(max_age=5.)
+        table.update({WORKER_A: WorkerLoad(queued=2, running=1)}, t=100.)
+        assert table.get(WORKER_A, now=104.) == WorkerLoad(queued=2, running=1)
+        assert table.get(WORKER_A, now=106.) is None
+        assert table.get(WORKER_B, now=100.) is None
+
+    def test_pending_until_next_snapshot(self):
+        table = WorkerLoadTable()
+        table.update({WORKER_A: WorkerLoad(queued=2, running=1, throughput=3.)}, t=100.)
+        table.add_pending(WORKER_A, 2)
+        # unknown workers are not tracked
+        table.add_pending(WORKER_B)
+        assert table.get(WORKER_A, now=100.) == WorkerLoad(queued=4, running=1, throughput=3.)
+        assert table.get(WORKER_B, now=100.) is None
+        table.update({WORKER_A: WorkerLoad(queued=3, running=1)}, t=101.)
+        assert table.get(WORKER_A, now=101.) == WorkerLoad(queued=3, running=1)
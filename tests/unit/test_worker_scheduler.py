@@ -0,0 +1,628 @@
+import asyncio
+import math
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, AsyncIterator, cast
+
+import dill
+import pytest
+import pytest_asyncio
+from loguru import logger
+
+from funtask.core import entities, interface_and_types as interface
+from funtask.core.scheduler import WorkerScheduler, Scheduler, SchedulerConfig, LeaderSchedulerConfig, \
+    WorkerSchedulerConfig
+from funtask.providers.db.sql.infrastructure import Repository
+from funtask.providers.lock.multiprocessing_lock import MultiprocessingLock
+from funtask.providers.queue.multiprocessing_queue import MultiprocessingQueueFactory
+
+
+def _func(uuid: str = 'func', func: Any = None) -> entities.Func:
+    return entities.Func(
+        uuid=cast(entities.FuncUUID, uuid),
+        func=dill.dumps(func),
+        dependencies=[],
+        parameter_schema=None,
+        description=''
+    )
+
+
+def make_cron_task(
+        uuid: str,
+        worker: str | List[str] = 'worker',
+        argument_strategy: entities.ArgumentGenerateStrategy = entities.ArgumentGenerateStrategy.STATIC,
+        queue_full_strategy: entities.QueueFullStrategy = entities.QueueFullStrategy.SKIP,
+        max_queue_size: float = math.inf,
+        worker_strategy: entities.WorkerChooseStrategy = entities.WorkerChooseStrategy.STATIC
+) -> entities.CronTask:
+    cron_task = entities.CronTask(
+        uuid=cast(entities.CronTaskUUID, uuid),
+        timepoints=[],
+        func=_func(),
+        argument_generate_strategy=entities.ArgumentStrategy(
+            strategy=argument_strategy,
+            static_value=None,
+            argument_queue=None,
+            udf=_func(),
+            udf_extra=None
+        ),
+        worker_choose_strategy=entities.WorkerStrategy(
+            strategy=worker_strategy,
+            static_worker=cast(entities.WorkerUUID, worker) if isinstance(worker, str) else None,
+            workers=None if isinstance(worker, str) else cast(List[entities.WorkerUUID], worker),
+            worker_tags=None,
+            udf=_func(),
+            udf_extra=None
+        ),
+        task_queue_strategy=entities.QueueStrategy(
+            full_strategy=queue_full_strategy,
+            udf=_func(),
+            udf_extra=None
+        ),
+        result_as_state=False,
+        timeout=1.,
+        description='',
+        disabled=False
+    )
+    cron_task.task_queue_strategy.max_size = max_queue_size
+    return cron_task
+
+
+class FakeRepository:
+    def __init__(self):
+        self.tasks: Dict[entities.TaskUUID, entities.Task] = {}
+        self.cron_tasks: Dict[entities.CronTaskUUID, entities.CronTask] = {}
+        self.add_calls = 0
+        self.update_calls = 0
+        self.cron_task_reads = 0
+        self.workers: List[entities.Worker] = []
+        self.worker_update_times: Dict[entities.WorkerUUID, datetime] = {}
+        self.tag_queries = 0
+
+    async def get_cron_task_from_uuid(self, task_uuid: entities.CronTaskUUID, session=None) -> entities.CronTask:
+        self.cron_task_reads += 1
+        return self.cron_tasks[task_uuid]
+
+    async def get_cron_tasks_changed_since(self, since: datetime, session=None) -> List[entities.CronTask]:
+        self.cron_task_reads += 1
+        return list(self.cron_tasks.values())
+
+    async def add_tasks(self, tasks: List[entities.Task], session=None):
+        self.add_calls += 1
+        self.tasks.update({task.uuid: task for task in tasks})
+
+    async def update_tasks(
+            self,
+            values: Dict[entities.TaskUUID, Dict[str, Any]],
+            only_status: List[entities.TaskStatus] | None = None,
+            session=None
+    ):
+        self.update_calls += 1
+        for task_uuid, value in values.items():
+            if only_status is not None and self.tasks[task_uuid].status not in only_status:
+                continue
+            for k, v in value.items():
+                setattr(self.tasks[task_uuid], k, v)
+
+    async def get_workers_from_cursor(self, limit: int, cursor: int | None = None, session=None):
+        start = cursor or 0
+        if start >= len(self.workers):
+            return None
+        return self.workers[start:start + limit], start + limit
+
+    async def get_workers_changed_since(self, since: datetime, session=None) -> List[entities.Worker]:
+        return [worker for worker in self.workers if self.worker_update_times.get(worker.uuid, datetime.min) >= since]
+
+    async def change_worker_status(self, worker_uuid: entities.WorkerUUID, status: entities.WorkerStatus, session=None):
+        for worker in self.workers:
+            if worker.uuid == worker_uuid:
+                worker.status = status
+                self.worker_update_times[worker_uuid] = datetime.now()
+
+    async def get_workers_from_tags(self, tags: List[str], match_all: bool = False, session=None):
+        self.tag_queries += 1
+        match = all if match_all else any
+        return [
+            worker for worker in self.workers
+            if worker.status is entities.WorkerStatus.RUNNING and match(tag in worker.tags for tag in tags)
+        ]
+
+
+class FakeManagerRPC:
+    def __init__(self, queue_sizes: Dict[str, int] | None = None):
+        self.queue_sizes = queue_sizes or {}
+        self.unreachable: List[str] = []
+        self.load_queries: List[List[entities.WorkerUUID]] = []
+        self.batches: List[List[interface.FunTaskDispatch]] = []
+
+    async def dispatch_fun_tasks(self, dispatches: List[interface.FunTaskDispatch]) -> List[entities.TaskUUID]:
+        self.batches.append(dispatches)
+        return [cast(entities.TaskUUID, f'manager-{i}') for i in range(len(dispatches))]
+
+    async def get_task_queue_size(self, worker: entities.WorkerUUID) -> int:
+        return self.queue_sizes.get(worker, 0)
+
+    async def get_workers_load(
+            self,
+            workers: List[entities.WorkerUUID]
+    ) -> Dict[entities.WorkerUUID, interface.WorkerLoad]:
+        self.load_queries.append(workers)
+        return {
+            worker: interface.WorkerLoad(queued=self.queue_sizes.get(worker, 0), running=0)
+            for worker in workers if worker not in self.unreachable
+        }
+
+
+class FakeCron:
+    def __init__(self):
+        self.jobs: Dict[str, Any] = {}
+
+    async def get_all(self) -> List[str]:
+        return list(self.jobs)
+
+    async def every_n_minutes(self, name: str, n: int, task: Any, at: str | None = None, *args, offset=0., **kwargs):
+        self.jobs[name] = args
+
+    async def cancel(self, name: str):
+        self.jobs.pop(name, None)
+
+
+def make_scheduler(
+        repository: FakeRepository,
+        manager_rpc: FakeManagerRPC,
+        cron: FakeCron | None = None
+) -> WorkerScheduler:
+    return WorkerScheduler(
+        funtask_manager_rpc=cast(interface.FunTaskManagerRPC, manager_rpc),
+        repository=cast(interface.Repository, repository),
+        cron=cast(interface.Cron, cron),
+        argument_queue_factory=MultiprocessingQueueFactory().factory,
+        lock=MultiprocessingLock()
+    )
+
+
+@pytest.mark.asyncio
+class TestCronSubTaskBatch:
+    async def test_fires_of_tick_batched(self):
+        repository, manager_rpc = FakeRepository(), FakeManagerRPC()
+        scheduler = make_scheduler(repository, manager_rpc)
+        for i in range(10):
+            cron_task = make_cron_task(f'cron{i}', worker=f'worker{i % 3}')
+            scheduler.task_map[cron_task.uuid] = cron_task
+        await asyncio.gather(*(scheduler._create_cron_sub_task(task_uuid) for task_uuid in scheduler.task_map))
+        assert repository.add_calls == 1
+        # manager uuids and queued status
+        assert repository.update_calls == 2
+        assert len(manager_rpc.batches) == 1 and len(manager_rpc.batches[0]) == 10
+        assert all(task.status is entities.TaskStatus.QUEUED for task in repository.tasks.values())
+        assert {task.worker_uuid for task in repository.tasks.values()} == {'worker0', 'worker1', 'worker2'}
+
+    async def test_failed_batch_logged_with_every_task(self):
+        repository, manager_rpc = FakeRepository(), FakeManagerRPC()
+        scheduler = make_scheduler(repository, manager_rpc)
+
+        async def add_tasks(tasks: List[entities.Task], session=None):
+            raise ConnectionError('db unavailable')
+
+        repository.add_tasks = add_tasks
+        for i in range(3):
+            cron_task = make_cron_task(f'cron{i}')
+            scheduler.task_map[cron_task.uuid] = cron_task
+        messages: List[str] = []
+        sink = logger.add(messages.append, level='ERROR')
+        try:
+            await asyncio.gather(*(scheduler._create_cron_sub_task(task_uuid) for task_uuid in scheduler.task_map))
+        finally:
+            logger.remove(sink)
+        assert len(messages) == 1
+        assert all(f'cron{i}' in messages[0] for i in range(3))
+
+    async def test_strategies_per_fire(self):
+        repository, manager_rpc = FakeRepository(), FakeManagerRPC({'full': 1})
+        scheduler = make_scheduler(repository, manager_rpc)
+        await scheduler._create_cron_sub_tasks([
+            make_cron_task('skip', argument_strategy=entities.ArgumentGenerateStrategy.SKIP),
+            make_cron_task('drop', argument_strategy=entities.ArgumentGenerateStrategy.DROP),
+            make_cron_task('queue_full_skip', worker='full', max_queue_size=1),
+            make_cron_task(
+                'queue_full_seize',
+                worker='full',
+                queue_full_strategy=entities.QueueFullStrategy.SEIZE,
+                max_queue_size=1
+            ),
+            make_cron_task('assign')
+        ])
+        status = {task.parent_task_uuid: task.status for task in repository.tasks.values()}
+        assert status == {
+            'skip': entities.TaskStatus.SKIP,
+            'queue_full_skip': entities.TaskStatus.SKIP,
+            'queue_full_seize': entities.TaskStatus.QUEUED,
+            'assign': entities.TaskStatus.QUEUED,
+        }
+        assert len(manager_rpc.batches) == 1 and len(manager_rpc.batches[0]) == 2
+
+    async def test_reported_status_kept(self):
+        repository, manager_rpc = FakeRepository(), FakeManagerRPC()
+        scheduler = make_scheduler(repository, manager_rpc)
+        dispatch = manager_rpc.dispatch_fun_tasks
+
+        async def dispatch_and_report(dispatches: List[interface.FunTaskDispatch]) -> List[entities.TaskUUID]:
+            # worker reports a task finished before scheduler marks it queued
+            next(iter(repository.tasks.values())).status = entities.TaskStatus.SUCCESS
+            return await dispatch(dispatches)
+
+        manager_rpc.dispatch_fun_tasks = dispatch_and_report
+        await scheduler._create_cron_sub_tasks([make_cron_task('done'), make_cron_task('queued')])
+        status = {task.parent_task_uuid: task.status for task in repository.tasks.values()}
+        assert status == {'done': entities.TaskStatus.SUCCESS, 'queued': entities.TaskStatus.QUEUED}
+        assert all(task.uuid_in_manager is not None for task in repository.tasks.values())
+
+
+async def _static_argument_udf(info_dict: Dict[str, Any]) -> entities.ArgumentStrategy:
+    return entities.ArgumentStrategy(
+        strategy=entities.ArgumentGenerateStrategy.STATIC,
+        static_value=None,
+        argument_queue=None,
+        udf=_func(),
+        udf_extra=None
+    )
+
+
+@pytest.mark.asyncio
+class TestStrategyUDF:
+    async def test_udf_loaded_once(self):
+        repository, manager_rpc = FakeRepository(), FakeManagerRPC()
+        scheduler = make_scheduler(repository, manager_rpc)
+        cron_task = make_cron_task('udf', argument_strategy=entities.ArgumentGenerateStrategy.UDF)
+        cron_task.argument_generate_strategy.udf = _func('argument_udf', _static_argument_udf)
+        for _ in range(3):
+            await scheduler._create_cron_sub_tasks([cron_task])
+        assert [task.status for task in repository.tasks.values()] == [entities.TaskStatus.QUEUED] * 3
+        assert (scheduler.udf_cache.hits, scheduler.udf_cache.misses) == (2, 1)
+
+
+def _edited(cron_task: entities.CronTask, **changes) -> entities.CronTask:
+    return replace(cron_task, version=cron_task.version + 1, **changes)
+
+
+@pytest.mark.asyncio
+class TestCronTaskCache:
+    async def _assigned(self) -> tuple[FakeRepository, FakeCron, WorkerScheduler]:
+        repository, cron = FakeRepository(), FakeCron()
+        scheduler = make_scheduler(repository, FakeManagerRPC(), cron)
+        repository.cron_tasks['a'] = replace(
+            make_cron_task('a'),
+            timepoints=[entities.TimePoint(unit=entities.TimeUnit.MINUTE, n=1, at=None)]
+        )
+        await scheduler.assign_cron_task(cast(entities.CronTaskUUID, 'a'))
+        return repository, cron, scheduler
+
+    async def test_fire_reads_cache(self):
+        repository, cron, scheduler = await self._assigned()
+        assert list(cron.jobs.values()) == [('a',)]
+        reads = repository.cron_task_reads
+        for _ in range(3):
+            await scheduler._create_cron_sub_task(cast(entities.CronTaskUUID, 'a'))
+        assert repository.cron_task_reads == reads
+        assert len(repository.tasks) == 3
+
+    async def test_invalidate_only_newer(self):
+        repository, cron, scheduler = await self._assigned()
+        reads = repository.cron_task_reads
+        await scheduler.invalidate_cron_task(cast(entities.CronTaskUUID, 'a'), 0)
+        await scheduler.invalidate_cron_task(cast(entities.CronTaskUUID, 'b'), 1)
+        assert repository.cron_task_reads == reads
+        repository.cron_tasks['a'] = _edited(repository.cron_tasks['a'], disabled=True)
+        await scheduler.invalidate_cron_task(cast(entities.CronTaskUUID, 'a'), 1)
+        assert scheduler.task_map['a'].disabled and not cron.jobs
+        await scheduler._create_cron_sub_task(cast(entities.CronTaskUUID, 'a'))
+        assert not repository.tasks
+
+    async def test_refresh_reschedules_changed(self):
+        repository, cron, scheduler = await self._assigned()
+        # strategy edit keeps schedule
+        repository.cron_tasks['a'] = _edited(repository.cron_tasks['a'], timeout=2.)
+        await scheduler.refresh_cron_tasks()
+        assert scheduler.task_map['a'].timeout == 2. and len(cron.jobs) == 1
+        time_point = entities.TimePoint(unit=entities.TimeUnit.MINUTE, n=5, at=None)
+        repository.cron_tasks['a'] = _edited(repository.cron_tasks['a'], timepoints=[time_point])
+        await scheduler.refresh_cron_tasks()
+        assert list(cron.jobs) == [f'a/{time_point}']
+        # not responsible for removed ones
+        await scheduler.remove_cron_task(cast(entities.CronTaskUUID, 'a'))
+        repository.cron_tasks['a'] = _edited(repository.cron_tasks['a'], timeout=3.)
+        await scheduler.refresh_cron_tasks()
+        assert not cron.jobs and 'a' not in scheduler.task_map
+
+
+@pytest_asyncio.fixture
+async def sql_repository(tmp_path):
+    repository = Repository(f'sqlite+aiosqlite:///{tmp_path / "scheduler.db"}')
+    await repository.create_model_schema()
+    yield repository
+    await repository.engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestCronTaskCacheSQL:
+    async def test_refresh_and_invalidate(self, sql_repository):
+        await sql_repository.add_func(_func())
+        await sql_repository.add_worker(
+            entities.Worker(uuid=cast(entities.WorkerUUID, 'worker'), status=entities.WorkerStatus.RUNNING)
+        )
+        cron_task = replace(
+            make_cron_task('a'),
+            timepoints=[entities.TimePoint(unit=entities.TimeUnit.MINUTE, n=1, at=None)],
+            tags=['nightly']
+        )
+        await sql_repository.add_cron_task(cron_task)
+        cron = FakeCron()
+        scheduler = make_scheduler(sql_repository, FakeManagerRPC(), cron)
+        await scheduler.assign_cron_task(cast(entities.CronTaskUUID, 'a'))
+        # row maps back to the same cron task
+        assert scheduler.task_map['a'] == cron_task
+        time_point = entities.TimePoint(unit=entities.TimeUnit.MINUTE, n=5, at=':30')
+        await sql_repository.update_cron_task(cast(entities.CronTaskUUID, 'a'), {'timepoints': [time_point]})
+        await scheduler.refresh_cron_tasks()
+        assert list(cron.jobs) == [f'a/{time_point}']
+        version = await sql_repository.update_cron_task(cast(entities.CronTaskUUID, 'a'), {'disabled': True})
+        await scheduler.invalidate_cron_task(cast(entities.CronTaskUUID, 'a'), version)
+        assert scheduler.task_map['a'].version == 2 and not cron.jobs
+
+
+@pytest.mark.asyncio
+class TestLoadAwareStrategy:
+    async def test_least_queued_balances_batch(self):
+        manager_rpc = FakeManagerRPC({'a': 3, 'b': 0, 'c': 1})
+        manager_rpc.unreachable = ['d']
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, manager_rpc)
+        await scheduler._create_cron_sub_tasks([
+            make_cron_task(f'cron{i}', worker=['a', 'b', 'c', 'd'],
+                           worker_strategy=entities.WorkerChooseStrategy.LEAST_QUEUED) for i in range(4)
+        ])
+        chosen = [task.worker_uuid for task in repository.tasks.values()]
+        loads = {worker: load + chosen.count(worker) for worker, load in manager_rpc.queue_sizes.items()}
+        assert 'd' not in chosen and max(loads.values()) - min(loads.values()) <= 1
+        # loads fetched once per batch
+        assert len(manager_rpc.load_queries) == 1
+
+    async def test_power_of_two(self):
+        manager_rpc = FakeManagerRPC({'a': 5, 'b': 1})
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, manager_rpc)
+        await scheduler._create_cron_sub_tasks([
+            make_cron_task('cron', worker=['a', 'b'], worker_strategy=entities.WorkerChooseStrategy.POWER_OF_TWO)
+        ])
+        assert [task.worker_uuid for task in repository.tasks.values()] == ['b']
+
+    async def test_no_reachable_worker_skips(self):
+        manager_rpc = FakeManagerRPC()
+        manager_rpc.unreachable = ['a']
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, manager_rpc)
+        await scheduler._create_cron_sub_tasks([
+            make_cron_task('cron', worker=['a'], worker_strategy=entities.WorkerChooseStrategy.LEAST_QUEUED)
+        ])
+        assert [task.status for task in repository.tasks.values()] == [entities.TaskStatus.SKIP]
+
+
+@pytest.mark.asyncio
+class TestWorkerLoadFeed:
+    async def test_fire_reads_load_table(self):
+        manager_rpc = FakeManagerRPC({'a': 0, 'b': 0})
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, manager_rpc)
+        scheduler.worker_load_table.update({
+            cast(entities.WorkerUUID, 'a'): interface.WorkerLoad(queued=0, running=3),
+            cast(entities.WorkerUUID, 'b'): interface.WorkerLoad(queued=1, running=0)
+        })
+        await scheduler._create_cron_sub_tasks([
+            make_cron_task(f'cron{i}', worker=['a', 'b'], worker_strategy=entities.WorkerChooseStrategy.LEAST_QUEUED,
+                           max_queue_size=3) for i in range(2)
+        ])
+        # no rpc for loads, queue sizes or placement
+        assert not manager_rpc.load_queries
+        assert sorted(task.worker_uuid for task in repository.tasks.values()) == ['b', 'b']
+        # dispatched tasks count as queued until next snapshot
+        assert scheduler.worker_load_table.get(cast(entities.WorkerUUID, 'b')) == interface.WorkerLoad(3, 0)
+
+    async def test_load_subscription_restarted(self):
+        class FlakyManagerRPC(FakeManagerRPC):
+            subscriptions = 0
+
+            async def watch_workers_load(self, interval: float):
+                self.subscriptions += 1
+                if self.subscriptions == 1:
+                    raise ConnectionError()
+                yield {cast(entities.WorkerUUID, 'a'): interface.WorkerLoad(queued=2, running=0)}
+                await asyncio.Event().wait()
+
+        manager_rpc = FlakyManagerRPC()
+        scheduler = make_scheduler(FakeRepository(), manager_rpc)
+        watcher = asyncio.create_task(scheduler.watch_worker_loads(timedelta(seconds=.01)))
+        try:
+            await asyncio.sleep(.1)
+        finally:
+            watcher.cancel()
+        assert manager_rpc.subscriptions == 2
+        assert scheduler.worker_load_table.get(cast(entities.WorkerUUID, 'a')) == interface.WorkerLoad(2, 0)
+
+    async def test_status_subscription_restarted(self):
+        class FlakyManagerRPC(FakeManagerRPC):
+            subscriptions = 0
+
+            async def watch_status(self, buffer_size: int):
+                self.subscriptions += 1
+                if self.subscriptions == 1:
+                    raise ConnectionError()
+                yield interface.StatusReport(
+                    task_uuid=None,
+                    worker_uuid=cast(entities.WorkerUUID, 'a'),
+                    status=entities.WorkerStatus.DIED,
+                    content=None,
+                    create_timestamp=0.
+                )
+
+        manager_rpc = FlakyManagerRPC()
+        scheduler = Scheduler(
+            self_node=entities.SchedulerNode(uuid=cast(entities.SchedulerNodeUUID, 'n0'), host='localhost', port=0),
+            manager_rpc=cast(interface.FunTaskManagerRPC, manager_rpc),
+            repository=cast(interface.Repository, FakeRepository()),
+            cron=cast(interface.Cron, FakeCron()),
+            argument_queue_factory=MultiprocessingQueueFactory().factory,
+            lock=MultiprocessingLock(),
+            leader_scheduler_rpc=cast(interface.LeaderSchedulerRPC, None),
+            leader_control=cast(interface.LeaderSchedulerControl, None),
+            scheduler_config=SchedulerConfig(
+                leader_scheduler=LeaderSchedulerConfig(rebalanced_frequency=timedelta(seconds=1)),
+                worker_scheduler=WorkerSchedulerConfig(status_resubscribe_interval=timedelta(seconds=.01))
+            )
+        )
+        processed: List[interface.StatusReport] = []
+
+        async def process_new_status(status_report: interface.StatusReport):
+            processed.append(status_report)
+
+        scheduler.worker_scheduler.process_new_status = process_new_status
+        watcher = asyncio.create_task(scheduler._process_statuses())
+        try:
+            await asyncio.sleep(.1)
+        finally:
+            watcher.cancel()
+        # failed subscription and every ended one are opened again
+        assert manager_rpc.subscriptions > 2
+        assert processed and processed[0].worker_uuid == 'a'
+
+    async def test_locks_released_before_dispatch(self):
+        held: List[str] = []
+
+        class RecordingLock(MultiprocessingLock):
+            @asynccontextmanager
+            async def lock(self, name: str, timeout: float | None = None) -> AsyncIterator[None]:
+                held.append(name)
+                yield
+                held.remove(name)
+
+        class FailingManagerRPC(FakeManagerRPC):
+            async def dispatch_fun_tasks(self, dispatches: List[interface.FunTaskDispatch]) -> List[entities.TaskUUID]:
+                assert not held
+                await super().dispatch_fun_tasks(dispatches)
+                return [cast(entities.TaskUUID, 'manager-0'), None]
+
+        repository, manager_rpc = FakeRepository(), FailingManagerRPC()
+        scheduler = make_scheduler(repository, manager_rpc)
+        scheduler.lock = RecordingLock()
+        scheduler.worker_load_table.update({cast(entities.WorkerUUID, 'a'): interface.WorkerLoad(queued=0, running=0)})
+        await scheduler._create_cron_sub_tasks([make_cron_task(f'cron{i}', worker='a') for i in range(2)])
+        assert len(manager_rpc.batches) == 1
+        # slot of the failed dispatch is given back
+        assert scheduler.worker_load_table.get(cast(entities.WorkerUUID, 'a')) == interface.WorkerLoad(1, 0)
+
+
+@pytest.mark.asyncio
+class TestWorkerTagChoice:
+    async def test_choice_from_index(self):
+        repository = FakeRepository()
+        repository.workers = [
+            entities.Worker(uuid=cast(entities.WorkerUUID, f'w{i}'), status=entities.WorkerStatus.RUNNING,
+                            tags=['gpu', 'large'] if i % 2 else ['gpu'])
+            for i in range(5)
+        ]
+        scheduler = make_scheduler(repository, FakeManagerRPC())
+        strategy = make_cron_task('cron', worker_strategy=entities.WorkerChooseStrategy.RANDOM_FROM_WORKER_TAGS) \
+            .worker_choose_strategy
+        strategy.worker_tags = ['gpu&large']
+        # falls back to repository before index is loaded
+        assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) in ('w1', 'w3')
+        assert repository.tag_queries == 1
+        await scheduler.refresh_worker_tag_index(page_size=2)
+        for _ in range(10):
+            assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) in ('w1', 'w3')
+        assert repository.tag_queries == 1
+        # status reports keep the index current
+        await scheduler.process_new_status(interface.StatusReport(
+            task_uuid=None,
+            worker_uuid=cast(entities.WorkerUUID, 'w1'),
+            status=entities.WorkerStatus.STOPPED,
+            content=None,
+            create_timestamp=0.
+        ))
+        assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) == 'w3'
+        assert repository.workers[1].status is entities.WorkerStatus.STOPPED
+
+    async def test_sync_changed_workers(self):
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, FakeManagerRPC())
+        await scheduler.refresh_worker_tag_index()
+        strategy = make_cron_task('cron', worker_strategy=entities.WorkerChooseStrategy.RANDOM_FROM_WORKER_TAGS) \
+            .worker_choose_strategy
+        strategy.worker_tags = ['gpu']
+        # added by webserver, status changed by status report consumed on another node
+        repository.workers = [
+            entities.Worker(uuid=cast(entities.WorkerUUID, f'w{i}'), status=entities.WorkerStatus.RUNNING, tags=['gpu'])
+            for i in range(2)
+        ]
+        repository.worker_update_times = {worker.uuid: datetime.now() for worker in repository.workers}
+        await scheduler.sync_worker_tag_index()
+        assert scheduler.worker_tag_index.match(['gpu']) == {'w0', 'w1'}
+        await repository.change_worker_status(cast(entities.WorkerUUID, 'w0'), entities.WorkerStatus.DIED)
+        await scheduler.sync_worker_tag_index()
+        assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) == 'w1'
+        assert repository.tag_queries == 0
+
+
+@pytest.mark.asyncio
+class TestWorkerLiveness:
+    async def test_stale_workers_not_chosen(self):
+        scheduler = make_scheduler(FakeRepository(), FakeManagerRPC())
+        strategy = make_cron_task('cron', worker=['a', 'b', 'c'],
+                                  worker_strategy=entities.WorkerChooseStrategy.RANDOM_FROM_LIST) \
+            .worker_choose_strategy
+        scheduler.worker_liveness.beat(cast(entities.WorkerUUID, 'a'), datetime(2022, 1, 1))
+        scheduler.worker_liveness.beat(cast(entities.WorkerUUID, 'b'))
+        # a stopped beating, c is unknown to this node
+        for _ in range(10):
+            assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) in ('b', 'c')
+        # nothing is left out when every candidate looks stale
+        strategy.workers = [cast(entities.WorkerUUID, 'a')]
+        assert await scheduler._choose_worker_from_worker_choose_strategy(strategy) == 'a'
+
+    async def test_failed_flush_kept(self):
+        repository = FakeRepository()
+        scheduler = make_scheduler(repository, FakeManagerRPC())
+        written: List[Dict[entities.WorkerUUID, datetime]] = []
+
+        async def update_workers_last_heart_beat_time(heart_beats, session=None):
+            if not written:
+                written.append({})
+                raise ConnectionError('db unavailable')
+            written.append(heart_beats)
+
+        repository.update_workers_last_heart_beat_time = update_workers_last_heart_beat_time
+        scheduler.worker_liveness.beat(cast(entities.WorkerUUID, 'a'), datetime(2022, 1, 1))
+        # failure is logged instead of stopping scheduler loop
+        await scheduler.flush_heart_beats()
+        await scheduler.flush_heart_beats()
+        assert written[1] == {'a': datetime(2022, 1, 1)}
+
+    async def test_died_and_removed_workers_forgotten(self):
+        repository = FakeRepository()
+        repository.workers = [
+            entities.Worker(uuid=cast(entities.WorkerUUID, 'a'), status=entities.WorkerStatus.RUNNING, tags=[])
+        ]
+        scheduler = make_scheduler(repository, FakeManagerRPC())
+        for worker in ('a', 'b', 'c'):
+            scheduler.worker_liveness.beat(cast(entities.WorkerUUID, worker))
+        await scheduler.process_new_status(interface.StatusReport(
+            task_uuid=None,
+            worker_uuid=cast(entities.WorkerUUID, 'b'),
+            status=entities.WorkerStatus.DIED,
+            content=None,
+            create_timestamp=0.
+        ))
+        assert sorted(scheduler.get_alive_workers()) == ['a', 'c']
+        # c is not in repository anymore
+        await scheduler.refresh_worker_tag_index()
+        assert scheduler.get_alive_workers() == ['a']